@@ -0,0 +1,97 @@
+# name: $Id: attendance.py 1 23:04:26 19-Oct-2026 s01rz $
+"""
+use: Minimum attendance. A trail with a minimumAttendance in trails.txt
+     only runs if at least that many hashers are awarded it; otherwise it
+     is cancelled, and its hashers are allocated again to the other trails
+     of the time slot
+usage: Called by TimeSlot.runBid() for a time slot with any trail having a
+       minimum attendance
+imp: The bids of the time slot are sorted once, as by Bids.runBid(), and
+     allocated in that order, noting the position of each successful bid.
+     While any trail falls short of its minimum, the worst, the trail with
+     the smallest fraction of its minimum, is cancelled. No decision made
+     before the first successful bid on the cancelled trail depended on
+     it: up to there, the cancelled trail only turned away bids of hashers
+     who already had a trail, as it would once cancelled. So only the
+     successful bids from that position on are undone, most recent first,
+     and allocation carries on from there, skipping cancelled trails. The
+     sort key of a bid depends only on the time slots allocated before
+     this one, so the order stays valid throughout. As under-filled trails
+     fill last, re-allocation usually starts near the end of the order,
+     and the whole loop costs little more than a single allocation
+"""
+import bid   as bid_module
+import group as group_module
+
+from resource import *
+from setting  import *
+
+###########################################################################
+###########################################################################
+###########################################################################
+
+def runBid(bids, trails):
+   """
+   use: Process the bids of a time slot, as Bids.runBid() does, cancelling
+        trails short of their minimum attendance
+   usage: bids holds all the bids of a single time slot, and trails its
+          trails
+   post: Return value is a list of the trails cancelled, in the order
+         cancelled
+   """
+   if (any((bid.hasher.group is not None) for bid in bids)):
+      entries = group_module.groupBids(bids.list)
+   else:
+      entries = list(bids.list)
+   entries.sort(key = bid_module.equitableKey)
+
+   cancelled = []
+   awarded   = []               # positions in entries of successful bids,
+                                # in the order awarded
+   start     = 0
+   while (True):
+      for position in range(start, len(entries)):
+         entry = entries[position]
+         trail = entry.trail
+         if (not trail.cancelled):
+            count = trail.successfulBidsCount
+            entry.runBid()
+            if (trail.successfulBidsCount != count):
+               awarded.append(position)
+
+      shortfalls = [trail for trail in trails
+                    if ((not trail.cancelled) and
+                        (trail.successfulBidsCount < trail.minimumAttendance))]
+      if (len(shortfalls) == 0):
+         return(cancelled)
+      worst = min(shortfalls,
+                  key = lambda trail: (trail.successfulBidsCount /
+                                       trail.minimumAttendance,
+                                       trail.id))
+      worst.cancelled = True
+      cancelled.append(worst)
+      print(f"trail {str(worst)} cancelled: "
+            f"{worst.successfulBidsCount}/{worst.minimumAttendance} "
+            f"minimum attendance")
+
+      first = next((index for (index, position) in enumerate(awarded)
+                    if (entries[position].trail is worst)), len(awarded))
+      for position in reversed(awarded[first:]):
+         undo(entries[position])
+      start = awarded[first] if (first < len(awarded)) else len(entries)
+      del awarded[first:]
+
+###########################################################################
+
+def undo(entry):
+   """
+   use: Undo a successful bid or group bid
+   pre: The bid must be the last successful bid of its trail and hasher
+   """
+   for bid in reversed(entry.bids
+                       if isinstance(entry, group_module.GroupBid) else
+                       (entry,)):
+      bid.trail.removeSuccessfulBid(bid)
+      bid.hasher.removeSuccessfulBid(bid)
+
+###########################################################################
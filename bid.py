@@ -1,13 +1,17 @@
 # name: $Id: bid.py 18 16:58:27 04-Mar-2022 s01rz $
 
-import csv
 import sys
 
 import bid      as bid_module
+import bidFile  as bidFile_module
+import compact  as compact_module
+import group    as group_module
 import hasher   as hasher_module
 import timeSlot as timeSlot_module
 import trail    as trail_module
+import validate as validate_module
 
+from ingest   import *
 from param    import *
 from setting  import *
 
@@ -24,8 +28,13 @@ from setting  import *
 class Bid:
    """
    use: A bid is the hub of a hasher, a bid value, and a trail
+   imp: tag marks a bid that was not submitted by the hasher, such as a
+        second-chance award; see secondChance.py. It is None for a
+        submitted bid
    """
-   def __init__(self, hasher, trail, value):
+   __slots__ = ("hasher", "trail", "value", "tag")
+
+   def __init__(self, hasher, trail, value, tag = None):
                                 # Bids.printHashers for outputFOrmat roster,
                                 # a virtualBid is created with a None trail
        assert (isinstance(hasher, hasher_module.Hasher) and
@@ -34,6 +43,7 @@ class Bid:
        self.hasher = hasher
        self.trail  = trail
        self.value  = int(value)
+       self.tag    = tag
 
 ###################################
 
@@ -117,10 +127,12 @@ class Bid:
             bid is unsuccessful, nothing is done
       imp: If the trail is not at capacity and still has vacancies, and
            the hasher has not successfully bid on another trail in this
-           same time slot, then this bid will be successful.
+           same time slot, or in a time slot conflicting with it, then this
+           bid will be successful. The conflict check is a single test of
+           the hasher's occupied conflict groups; see conflict.py
       """
       if ((not self.trail.isAtCapacity()) and
-          (not self.hasher.isAttendingTimeSlot(self.timeSlot.id))):
+          (not (self.hasher.occupied & self.trail.timeSlot.conflicts))):
          self.trail.addSuccessfulBid(self)
          self.hasher.addSuccessfulBid(self)
 
@@ -135,7 +147,17 @@ class Bid:
 ###########################################################################
 
 class Bids:
+   __slots__ = ("list", "hasherBids", "trailBids", "timeSlotBids")
+
    def __init__(self, filespec = None, hashers = None, trails = None):
+      """
+      usage: Optionally pass an event directory name, a bids.txt or
+             bids.bin filespec, or an Ingest object already parsed by
+             parseFile(), along with the hashers and trails to which the
+             bids are linked. For an event directory, bids.bin is read if
+             there is no bids.txt.
+             A list of sources may be passed instead; see readSources()
+      """
       self.list         = []
       self.hasherBids   = {} # dict keyed on bid.hasher.id, containing an
                              # array of bids
@@ -144,49 +166,27 @@ class Bids:
       self.timeSlotBids = {} # dict keyed on bid.timeSlot.id, containing
                              # an array of bids
 
-      if (filespec is not None):
-         if (os.path.isdir(filespec)):
-            filespec = os.path.join(filespec, "bids.txt")
-
-         with open(filespec, "r") as csvfile:
-            lineNumber = 0
-            csvReader  = csv.reader(csvfile)
-            if (csv.Sniffer().has_header(open(csvfile.name).read(1024))):
-               lineNumber += 1
-               next(csvReader)
-            for row in csvReader:
-               lineNumber += 1
-               if (len(row) != 0):
-                  try:
-                     hasher = hashers.getById(row[0])
-                     trail  = trails.getById (row[1])
-                     value  = int(row[2])
-                     if ((hasher is None) or
-                         (trail  is None)):
-                                # carve out for lineNumber 1 where timeSlot
-                                # and trail are both None is probably a
-                                # header that the csv.Sniffer failed to detect
-                        if (not ((lineNumber == 1) and
-                                 (hasher is None ) and
-                                 (trail  is None ))):
-                           printFileReadError(
-                              lineNumber,
-                              f"{str(hasher)} -> {str(trail)}")
-                     else:
-                        bid = Bid(hasher, trail, value)
-                        self.add(bid)
-                        if (settings["verbosity"] >= 3):
-                           print(str(bid))
-                        hasher.addBid(bid)
-                        trail.addBid(bid)
-                  except Exception as exception:
-                     writeFileReadError(filespec, lineNumber, exception,
-                                        f"{str(hasher)} -> {str(trail)}")
-                     printFileReadError(lineNumber,
-                                        f"{str(hasher)} -> {str(trail)}")
-                     raise
-            if (settings["verbosity"] < 3):
-               print(f"{self.count} {plural(self.count, 'bid')}")
+      if (isinstance(filespec, (list, tuple))):
+         self.readSources(filespec, hashers, trails)
+      elif (filespec is not None):
+         if ((not isinstance(filespec, Ingest)) and
+             os.path.isdir(filespec) and
+             (not os.path.isfile(os.path.join(filespec, "bids.txt")))):
+            filespec = os.path.join(filespec, "bids.bin")
+         if ((not isinstance(filespec, Ingest)) and
+             bidFile_module.isBidFile(filespec)):
+            self.readBidFile(filespec, hashers, trails)
+         else:
+            ingest = toIngest(filespec, bidsSchema)
+            self.load(((ingest.filespec, lineNumber,
+                        hashers.getById(hasherId),
+                        trails.getById(trailId), value)
+                       for (lineNumber, (hasherId, trailId, value))
+                       in ingest),
+                      os.path.dirname(ingest.filespec))
+            ingest.check()
+      if ((filespec is not None) and (settings["verbosity"] < 3)):
+         print(f"{self.count} {plural(self.count, 'bid')}")
 
 ###################################
 
@@ -285,8 +285,8 @@ class Bids:
            trail ID
       """
       result = bid_module.Bids()
-      if (trailId in self.trailBids):
-         for bid in self.trailBids[trailId]:
+      if (int(trailId) in self.trailBids):
+         for bid in self.trailBids[int(trailId)]:
             result.add(bid)
       return(result)
 
@@ -339,6 +339,75 @@ class Bids:
          result.addUnique(bid.hasher)
       return(result)
 
+###########################################################################
+
+   def link(self, hasher, trail, value, filespec, lineNumber):
+      """
+      use: Linking stage of loading a bid; add a bid read from a bid file
+           to us, and to its hasher and trail
+      usage: Called by load() for the latest bid of each hasher for each
+             trail
+      """
+      try:
+         bid = Bid(hasher, trail, value)
+         self.add(bid)
+         if (settings["verbosity"] >= 3):
+            print(str(bid))
+         hasher.addBid(bid)
+         trail.addBid(bid)
+      except Exception as exception:
+         writeFileReadError(filespec, lineNumber, exception,
+                            f"{str(hasher)} -> {str(trail)}")
+         printFileReadError(lineNumber,
+                            f"{str(hasher)} -> {str(trail)}")
+         raise
+
+###########################################################################
+
+   def load(self, rows, directory):
+      """
+      use: Validation and linking stages of loading bids
+      usage: rows is an iterator of (filespec, lineNumber, hasher, trail,
+             value) tuples of the bids read, with hasher or trail None if
+             not found, in which case the bid is reported and skipped. The
+             allowance report is written into directory
+      post: A later bid by a hasher for the same trail replaces the
+            earlier one, and a bid of 0 withdraws it, as by compact.py. A
+            second bid for the same trail within one file is reported as
+            a duplicate
+      imp: The rows are collapsed by a compact.BidLog to the latest bid of
+           each hasher for each trail before they are totalled, so a
+           replaced bid does not count against the bidAllowance. Bids over
+           the bidAllowance are dealt with according to the
+           bidAllowancePolicy setting; see validate.py
+      """
+      latest = compact_module.BidLog() # (filespec, lineNumber, value)
+                                       # keyed on (hasher, trail)
+      for (filespec, lineNumber, hasher, trail, value) in rows:
+         if ((hasher is None) or
+             (trail  is None)):
+            printFileReadError(lineNumber,
+                               f"{filespec}: {str(hasher)} -> {str(trail)}")
+            continue
+         earlier = latest.bids.get((hasher, trail))
+         if ((earlier is not None) and (earlier[0] == filespec)):
+            writeFileReadError(filespec, lineNumber,
+                               "duplicate bid for trail; later bid kept",
+                               f"{str(hasher)} -> {str(trail)}")
+            printFileReadError(lineNumber, f"{str(hasher)} -> {str(trail)}")
+         latest.add((hasher, trail), value, (filespec, lineNumber, value))
+
+      check = validate_module.AllowanceCheck()
+      for ((hasher, trail), (filespec, lineNumber, value)) in \
+          latest.bids.items():
+         check.add(hasher, trail, value)
+      for ((hasher, trail), (filespec, lineNumber, value)) in \
+          latest.bids.items():
+         value = check.adjust(hasher, trail, value)
+         if (value is not None):
+            self.link(hasher, trail, value, filespec, lineNumber)
+      check.report(directory or os.curdir)
+
 ###########################################################################
 
    def merge(self, bids):
@@ -349,6 +418,22 @@ class Bids:
          self.add(bid)
       return(self)
 
+###########################################################################
+
+   def pop(self):
+      """
+      use: Remove our most recently added bid
+      post: Return value is the bid removed
+      """
+      bid = self.list.pop()
+      for (bids, key) in ((self.hasherBids  , bid.hasher.id       ),
+                          (self.trailBids   , bid.trail.id        ),
+                          (self.timeSlotBids, bid.trail.timeSlot.id)):
+         bids[key].pop()
+         if (len(bids[key]) == 0):
+            del bids[key]
+      return(bid)
+
 ###########################################################################
 
    def printBids(self, **kwargs):
@@ -431,12 +516,70 @@ class Bids:
       for bid in self.list:
          bid.printTrail(**params())
 
+###########################################################################
+
+   def readBidFile(self, filespec, hashers, trails):
+      """
+      use: Load bids from a binary bid file
+      usage: See bidFile.py for the layout of a bid file. The record
+             number of a bid is reported in place of a line number
+      pre: hashers and trails must have been read from the hashers.txt and
+           trails.txt the bid file was written against
+      """
+      self.load(bidFileRows(filespec, hashers, trails),
+                os.path.dirname(filespec))
+
+###########################################################################
+
+   def readSources(self, sources, hashers, trails):
+      """
+      use: Load bids merged from several sources, eg: an early-bird form
+           export, paper forms keyed in later, and admin corrections
+      usage: sources is a list of bids.txt style CSV files, gzip
+             compressed CSV files ending in .gz, and binary bid files, in
+             order of precedence: a bid for a trail in a later source
+             replaces the hasher's bid for that trail in an earlier one,
+             and a bidAmount of 0 withdraws it
+      imp: Each source is streamed once into load(), which keeps the
+           latest bid of each hasher for each trail, as for a single bid
+           file. No intermediate file is written
+      """
+      self.load((row
+                 for source in sources
+                 for row in sourceRows(source, hashers, trails)),
+                os.path.dirname(sources[0]) if len(sources) != 0 else None)
+
+###########################################################################
+
+   def replace(self, replacements):
+      """
+      use: Replace some of our bids with others
+      usage: replacements is a dictionary of the replacing bid keyed on the
+             bid replaced
+      post: A replacing bid takes the place of the bid it replaces in our
+            list of bids
+      """
+      bids = [replacements.get(bid, bid) for bid in self.list]
+      self.list         = []
+      self.hasherBids   = {}
+      self.trailBids    = {}
+      self.timeSlotBids = {}
+      self.merge(bids)
+
 ###########################################################################
 
    def runBid(self):
       """
       use: Process the bids that belong to us
-      """
+      imp: The bids of hashers in a group are combined into GroupBids,
+           which are sorted among the others; see group.py
+      """
+      if (any((bid.hasher.group is not None) for bid in self.list)):
+         bids = group_module.groupBids(self.list)
+         bids.sort(key = equitableKey)
+         for bid in bids:
+            bid.runBid()
+         return
       self.sortEquitably()
       for bid in self.list:
          bid.runBid()
@@ -487,20 +630,9 @@ class Bids:
                 on the more bidded-on trails
            All these additional sorting attributes only come into play as a
            tie-breaker within all the bids with equal bid values
-      see also: Hashers.sortByRandom()
-      """
-      self.list.sort(key = lambda bid:(
-                        -bid.value                   , # higher bid value 1st
-                        bid.hasher.successfulBidCount, # favor less successful
-                        bid.hasher.bidCount          , # advantage fewer bids
-                        bid.hasher.rank              , # randomized rank
-                        bid.trail.bidCount           , # less bidded-on trails
-                        bid.trail.id)) # bidCount comes into play when the
-                        # trail becomes oversubscribed, so we try to fulfill
-                        # trails with fewer submitted bids first so that we
-                        # we can delay filling up the trail with more bids
-                        # submitted for it, and hopefully will allow us to
-                        # successfully satisfy more bids
+      see also: Hashers.sortByRandom(), equitableKey()
+      """
+      self.list.sort(key = equitableKey)
       return(self)
 
 ###########################################################################
@@ -514,3 +646,71 @@ class Bids:
              if (timeSlotId in self.timeSlotBids) else 0)
 
 ###########################################################################
+###########################################################################
+###########################################################################
+
+def equitableKey(bid):
+   """
+   use: Sort key of a bid for Bids.sortEquitably()
+   """
+   return((-bid.value                   , # higher bid value 1st
+           bid.hasher.successfulBidCount, # favor less successful
+           bid.hasher.bidCount          , # advantage fewer bids
+           bid.hasher.rank              , # randomized rank
+           bid.trail.bidCount           , # less bidded-on trails
+           bid.trail.id)) # bidCount comes into play when the
+           # trail becomes oversubscribed, so we try to fulfill
+           # trails with fewer submitted bids first so that we
+           # we can delay filling up the trail with more bids
+           # submitted for it, and hopefully will allow us to
+           # successfully satisfy more bids
+
+###########################################################################
+
+def bidFileRows(filespec, hashers, trails):
+   """
+   use: Bids of a binary bid file, for Bids.load()
+   post: Yields (filespec, recordNumber, hasher, trail, value) tuples,
+         with hasher or trail None if its index is out of range
+   """
+   hashersByIndex = [None] * hashers.count
+   for hasher in hashers:
+      hashersByIndex[hasher.index] = hasher
+   trailsByIndex  = [None] * trails.count
+   for trail in trails:
+      trailsByIndex[trail.index] = trail
+
+   with bidFile_module.BidFile(filespec) as bidFile:
+      if ((bidFile.hasherCount != hashers.count) or
+          (bidFile.trailCount  != trails.count )):
+         raise IngestError(f"\n"
+                  f"   bid file written for {bidFile.hasherCount} "
+                  f"hashers and {bidFile.trailCount} trails\n"
+                  f"   >>> {filespec}")
+      for (recordNumber, (hasherIndex, trailIndex, value)) in \
+          enumerate(bidFile, 1):
+         yield((filespec, recordNumber,
+                hashersByIndex[hasherIndex]
+                   if hasherIndex < hashers.count else None,
+                trailsByIndex[trailIndex]
+                   if trailIndex  < trails.count  else None,
+                value))
+
+###########################################################################
+
+def sourceRows(filespec, hashers, trails):
+   """
+   use: Bids of one source file of Bids.readSources(), read as a stream
+   post: Yields (filespec, lineNumber, hasher, trail, value) tuples, with
+         hasher or trail None if not found
+   """
+   if (bidFile_module.isBidFile(filespec)):
+      yield from bidFileRows(filespec, hashers, trails)
+   else:
+      ingest = Ingest(filespec, bidsSchema)
+      for (lineNumber, (hasherId, trailId, value)) in ingest:
+         yield((filespec, lineNumber,
+                hashers.getById(hasherId), trails.getById(trailId), value))
+      ingest.check()
+
+###########################################################################
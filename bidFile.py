@@ -0,0 +1,230 @@
+# name: $Id: bidFile.py 1 09:47:52 19-Oct-2026 s01rz $
+"""
+use: Binary bid file, bids.bin, as an alternative to bids.txt. Bids are
+     stored as an array of fixed-width records so that large bid sets can
+     be memory-mapped, and sorted and scanned without materializing Python
+     objects
+imp: Layout of a bid file, all little-endian:
+        header: magic      4 bytes, b"TBID"
+                version    uint16
+                recordSize uint16, bytes per record
+                hashers    uint32, number of hashers indexed
+                trails     uint32, number of trails indexed
+                records    uint64, number of records
+        record: hasherIndex uint32, Hasher.index of the bidding hasher
+                trailIndex  uint32, Trail.index of the bidded-on trail
+                value       int32, bid amount
+     Hasher and trail indexes are the dense load-order indexes assigned
+     while reading hashers.txt and trails.txt, so a bid file is only valid
+     with the hashers.txt and trails.txt it was written against. The
+     header counts are checked against them when the file is read
+usage: The records of a bid file can also be mapped as a numpy structured
+       array with BidFile.asArray() when numpy is installed
+"""
+
+import mmap
+import struct
+
+from ingest   import *
+from resource import *
+
+try:
+   import numpy
+except ImportError:
+   numpy = None
+
+bidFileMagic   = b"TBID"
+bidFileVersion = 1
+headerFormat   = struct.Struct("<4sHHIIQ")
+recordFormat   = struct.Struct("<IIi")
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### b i d    f i l e
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class BidFile:
+   """
+   use: A memory-mapped, read-only bid file
+   usage: Typically:
+             with BidFile(filespec) as bidFile:
+                for (hasherIndex, trailIndex, value) in bidFile:
+                   ...
+   """
+   def __init__(self, filespec):
+      if (os.path.isdir(filespec)):
+         filespec = os.path.join(filespec, "bids.bin")
+      self.filespec = filespec
+      self.file     = open(filespec, "rb")
+      try:
+         header = self.file.read(headerFormat.size)
+         if ((len(header) != headerFormat.size) or
+             (header[:len(bidFileMagic)] != bidFileMagic)):
+            raise IngestError(f"\n"
+                     f"   not a bid file\n"
+                     f"   >>> {filespec}")
+         (magic, version, recordSize,
+          self.hasherCount, self.trailCount, self.count) = \
+            headerFormat.unpack(header)
+         if ((version    != bidFileVersion) or
+             (recordSize != recordFormat.size)):
+            raise IngestError(f"\n"
+                     f"   unsupported bid file version {version}\n"
+                     f"   >>> {filespec}")
+         size = headerFormat.size + self.count * recordFormat.size
+         if (os.path.getsize(filespec) < size):
+            raise IngestError(f"\n"
+                     f"   truncated bid file\n"
+                     f"   >>> {filespec}")
+         self.map = (mmap.mmap(self.file.fileno(), 0,
+                               access = mmap.ACCESS_READ)
+                     if self.count > 0 else None)
+      except:
+         self.file.close()
+         raise
+
+###################################
+
+   def __enter__(self):
+      return(self)
+
+   def __exit__(self, *exception):
+      self.close()
+
+###################################
+
+   def __iter__(self):
+      """
+      post: Yields (hasherIndex, trailIndex, value) tuples
+      """
+      return(self.records())
+
+###################################
+
+   def __len__(self):
+      return(self.count)
+
+###########################################################################
+
+   def asArray(self):
+      """
+      use: Our records as a read-only numpy structured array with fields
+           hasher, trail, and value, mapped from the file rather than
+           read into memory
+      post: Return value is None if numpy is not installed
+      """
+      if (numpy is None):
+         return(None)
+      return(numpy.memmap(self.filespec,
+                          dtype  = numpy.dtype([("hasher", "<u4"),
+                                                ("trail" , "<u4"),
+                                                ("value" , "<i4")]),
+                          mode   = "r",
+                          offset = headerFormat.size,
+                          shape  = (self.count,)))
+
+###########################################################################
+
+   def close(self):
+      """
+      use: Release the memory map and the file
+      """
+      if (self.map is not None):
+         self.map.close()
+         self.map = None
+      self.file.close()
+
+###########################################################################
+
+   def records(self, start = 0, stop = None, chunkSize = 65536):
+      """
+      use: Records start up to, but not including, stop
+      post: Yields (hasherIndex, trailIndex, value) tuples
+      imp: Records are copied out of the memory map chunkSize at a time,
+           so memory use is bounded regardless of the size of the file
+      """
+      if ((stop is None) or (stop > self.count)):
+         stop = self.count
+      for chunkStart in range(start, stop, chunkSize):
+         chunkStop = min(chunkStart + chunkSize, stop)
+         yield from recordFormat.iter_unpack(
+            self.map[headerFormat.size + chunkStart * recordFormat.size:
+                     headerFormat.size + chunkStop  * recordFormat.size])
+
+###########################################################################
+###########################################################################
+###########################################################################
+
+def isBidFile(filespec):
+   """
+   use: Predicate indicating if filespec is a binary bid file
+   """
+   if (not os.path.isfile(filespec)):
+      return(False)
+   with open(filespec, "rb") as file:
+      return(file.read(len(bidFileMagic)) == bidFileMagic)
+
+###########################################################################
+
+def readIndexes(eventDirectory):
+   """
+   use: Hasher and trail indexes of an event directory, for writing a bid
+        file
+   post: Return value is a (hasherIndexes, trailIndexes) tuple of
+         dictionaries of index keyed on hasherID and trailID
+   imp: Indexes are the positions of the hashers and trails in hashers.txt
+        and trails.txt, as assigned by the Hashers() and Trails()
+        constructors when reading those files
+   """
+   hasherIndexes = {}
+   ingest        = Ingest(eventDirectory, hashersSchema)
+   for (lineNumber, (hasherId, sequence, name)) in ingest:
+      hasherIndexes.setdefault(hasherId, len(hasherIndexes))
+   ingest.check()
+   trailIndexes  = {}
+   ingest        = Ingest(eventDirectory, trailsSchema)
+   for (lineNumber, (trailId, *fields)) in ingest:
+      trailIndexes.setdefault(trailId, len(trailIndexes))
+   ingest.check()
+   return((hasherIndexes, trailIndexes))
+
+###########################################################################
+
+def writeBidFile(filespec, records, hasherCount, trailCount,
+                 chunkSize = 65536):
+   """
+   use: Write a binary bid file
+   usage: Pass:
+             filespec   : file to be written
+             records    : iterable of (hasherIndex, trailIndex, value)
+             hasherCount: number of hashers the indexes refer to
+             trailCount : number of trails the indexes refer to
+   post: Return value is the number of records written
+   imp: Records are packed and written chunkSize at a time, and the
+        record count is filled into the header once all are written
+   """
+   count = 0
+   with open(filespec, "wb") as file:
+      file.write(headerFormat.pack(bidFileMagic, bidFileVersion,
+                                   recordFormat.size,
+                                   hasherCount, trailCount, 0))
+      chunk = bytearray()
+      for record in records:
+         chunk += recordFormat.pack(*record)
+         count += 1
+         if (len(chunk) >= chunkSize * recordFormat.size):
+            file.write(chunk)
+            chunk = bytearray()
+      file.write(chunk)
+      file.seek(0)
+      file.write(headerFormat.pack(bidFileMagic, bidFileVersion,
+                                   recordFormat.size,
+                                   hasherCount, trailCount, count))
+   return(count)
+
+###########################################################################
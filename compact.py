@@ -0,0 +1,223 @@
+# name: $Id: compact.py 1 18:02:51 19-Oct-2026 s01rz $
+"""
+use: Bid log compaction. Bids collected as an append-only stream, such as
+     bids.log written by intake.py or an export from a web form, hold
+     every edit a hasher made, so the same hasher and trail can appear
+     many times. Compaction keeps only the latest bid of each hasher for
+     each trail, and writes a clean bids.txt or bids.bin
+usage: For help:
+          python compact.py -h
+       Logs are read in the order passed, and within a log from top to
+       bottom, so a later line replaces an earlier one for the same
+       hasherID and trailID. A bidAmount of 0 withdraws the bid
+imp: Logs are streamed through Ingest, and the current bids are held in a
+     dictionary keyed on (hasherID, trailID), so memory is proportional
+     to the number of distinct hasher and trail pairs rather than to the
+     length of the logs. Bids are not checked against hashers.txt,
+     trails.txt, or the bidAllowance here; that is done when the compacted
+     bids are loaded
+"""
+import getopt
+import sys
+
+from bidFile  import *
+from ingest   import *
+from resource import *
+from setting  import *
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### b i d    l o g
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class BidLog:
+   """
+   use: The latest bid of each hasher for each trail, over one or more
+        bid logs
+   imp: bids is a dictionary of bid value keyed on (hasherID, trailID),
+        in order of first bid. lines counts the bids applied, one per
+        line read, and replaced those that replaced or withdrew an earlier
+        bid. Bids.load()
+        keys its bids on (hasher, trail) instead, and holds the file and
+        line of each along with its value; see add()
+   """
+   def __init__(self, sources = None):
+      """
+      usage: Optionally pass a list of logs to be read; see read()
+      """
+      self.bids     = {}
+      self.lines    = 0
+      self.replaced = 0
+      for source in (sources or []):
+         self.read(source)
+
+###################################
+
+   def __len__(self):
+      return(len(self.bids))
+
+###########################################################################
+
+   def add(self, key, value, entry = None):
+      """
+      use: Apply a bid, replacing any earlier bid of the hasher for the
+           trail; a value of 0 withdraws the earlier bid, and is not
+           itself a bid
+      usage: key identifies the hasher and trail. entry is held for the
+             bid in place of its value, if passed
+      """
+      self.lines += 1
+      if (key in self.bids):
+         self.replaced += 1
+         if (value == 0):
+            del self.bids[key]
+            return
+      if (value != 0):
+         self.bids[key] = value if entry is None else entry
+
+###########################################################################
+
+   def read(self, source, schema = bidLogSchema):
+      """
+      use: Read a bid log, each of its bids replacing any earlier bid of
+           the hasher for the trail
+      usage: source is a log filespec, an event directory for its
+             bids.log, or a parsed Ingest object. Pass bidsSchema as
+             schema for an event directory's bids.txt
+      """
+      ingest = toIngest(source, schema)
+      for (lineNumber, (hasherId, trailId, value)) in ingest:
+         self.add((hasherId, trailId), value)
+      ingest.check()
+
+###########################################################################
+
+   def writeBidFile(self, filespec, eventDirectory):
+      """
+      use: Write our bids as a binary bid file
+      usage: eventDirectory holds the hashers.txt and trails.txt the bid
+             file is written against
+      post: Return value is the number of bids written. Bids of hashers or
+            for trails not in eventDirectory are reported and left out
+      """
+      (hasherIndexes, trailIndexes) = readIndexes(eventDirectory)
+      unknown = [key for key in self.bids
+                 if ((key[0] not in hasherIndexes) or
+                     (key[1] not in trailIndexes))]
+      for (hasherId, trailId) in unknown:
+         sys.stderr.write(f"{selfName}: unknown hasher or trail: "
+                          f"{hasherId}, {trailId}\n")
+      return(writeBidFile(filespec,
+                          ((hasherIndexes[hasherId], trailIndexes[trailId],
+                            value)
+                           for ((hasherId, trailId), value)
+                           in self.bids.items()
+                           if ((hasherId in hasherIndexes) and
+                               (trailId  in trailIndexes))),
+                          len(hasherIndexes), len(trailIndexes)))
+
+###################################
+
+   def writeBids(self, filespec):
+      """
+      use: Write our bids in the format of bids.txt
+      post: Return value is the number of bids written
+      """
+      return(writeBids(filespec, self.bids))
+
+###########################################################################
+###########################################################################
+###########################################################################
+
+def writeBids(filespec, bids):
+   """
+   use: Write a bids.txt file
+   usage: bids is a dictionary of bid value keyed on (hasherID, trailID)
+   post: Return value is the number of bids written
+   """
+   with open(filespec, "w") as bidsFile:
+      bidsFile.write("hasherID,trailID,bidAmount\n")
+      bidsFile.writelines(f"{hasherId}, {trailId}, {value}\n"
+                          for ((hasherId, trailId), value) in bids.items())
+   return(len(bids))
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### m a i n
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+if ( __name__ == "__main__" ):
+   eventDirectory = None
+   outputFilespec = None
+   binaryP        = False
+   logs           = []
+   opts, args     = getopt.getopt(sys.argv[1:], "bo:h")
+
+   for opt in opts:
+      if (opt[0] == "-b"):
+         binaryP = True
+      elif (opt[0] == "-o"):
+         outputFilespec = opt[1]
+      elif (opt[0] == "-h"):
+         print(f"usage: {selfName} [options] [directoryName [logFile ...]]")
+         print( "where options are:")
+         print( "   -b       write bids.bin instead of bids.txt")
+         print( "   -oFile   file to write; if not provided, defaults to "
+                "bids.txt, or")
+         print( "            bids.bin with -b, in the event directory")
+         print( "   -h       help")
+         print( "If directory name is not provided, it defaults to 'event';")
+         print( "if no log files are provided, bids.log in the event "
+                "directory is read.")
+         print( "Logs are applied in the order given, a later bid for the "
+                "same hasher and")
+         print( "trail replacing an earlier one. bids.txt is read in "
+                "preference to bids.bin,")
+         print( "so remove or rename bids.txt when writing bids.bin")
+         exit(0)
+
+   for arg in args:
+      if (eventDirectory is None):
+         eventDirectory = arg
+      else:
+         logs.append(arg)
+   if (eventDirectory is None):
+      eventDirectory = "event"
+
+   if (not os.path.isdir(eventDirectory)):
+      sys.stderr.write(f"{selfName}: no event directory: {eventDirectory}\n")
+      exit(1)
+   if (len(logs) == 0):
+      logs = [os.path.join(eventDirectory, bidLogSchema.filename)]
+   if (outputFilespec is None):
+      outputFilespec = os.path.join(eventDirectory,
+                                    "bids.bin" if binaryP else
+                                    bidsSchema.filename)
+
+   bidLog = BidLog()
+   for log in logs:
+      if (not os.path.isfile(log)):
+         sys.stderr.write(f"{selfName}: no bid log: {log}\n")
+         exit(1)
+      bidLog.read(log)
+   print(f"{bidLog.lines} {plural(bidLog.lines, 'line')} read, "
+         f"{bidLog.replaced} {plural(bidLog.replaced, 'bid')} replaced or "
+         f"withdrawn")
+
+   if (binaryP):
+      count = bidLog.writeBidFile(outputFilespec, eventDirectory)
+   else:
+      count = bidLog.writeBids(outputFilespec)
+   print(f"{outputFilespec}: {count} {plural(count, 'bid')}")
+
+###########################################################################
@@ -0,0 +1,255 @@
+# name: $Id: component.py 1 18:47:09 19-Oct-2026 s01rz $
+"""
+use: Allocation of a time slot split into independent components, for
+     allocating large time slots on several processors
+imp: Within a time slot, two trails only affect each other through the
+     hashers who bid on both. Joining the trails each hasher bid on, with
+     a union-find over the time slot's trails, splits the time slot's bids
+     into components that share no hasher and no trail. Bids.runBid()
+     awards bids in the order of Bids.sortEquitably(), whose sort key for a
+     bid depends only on the bid, its hasher, and its trail, and decides a
+     bid only by its trail's vacancies and whether its hasher already has
+     a trail. Allocating each component on its own, in the same order,
+     therefore awards exactly the same bids as allocating the time slot
+     as a whole.
+     Each component is handed to a worker process as plain tuples of sort
+     key, hasher index, and trail index; the worker sorts and allocates
+     it, and returns the positions of the successful bids, which are then
+     awarded here in the order the worker awarded them, so every trail's
+     and hasher's successful bids are in the same order as from
+     Bids.runBid()
+"""
+import concurrent.futures
+import os
+
+import bid as bid_module
+
+from resource import *
+from setting  import *
+
+parallelBidCount = 20000        # fewest bids in a time slot worth
+                                # allocating in worker processes
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### d i s j o i n t    s e t s
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class DisjointSets:
+   """
+   use: Union-find over the integers 0 to count - 1
+   imp: Path halving in find(), and union by size
+   """
+   def __init__(self, count):
+      self.parent = list(range(count))
+      self.size   = [1] * count
+
+###################################
+
+   def find(self, item):
+      """
+      use: Representative of the set holding item
+      """
+      parent = self.parent
+      while (parent[item] != item):
+         parent[item] = parent[parent[item]]
+         item         = parent[item]
+      return(item)
+
+###################################
+
+   def union(self, first, second):
+      """
+      use: Join the sets holding first and second
+      """
+      first  = self.find(first)
+      second = self.find(second)
+      if (first != second):
+         if (self.size[first] < self.size[second]):
+            (first, second) = (second, first)
+         self.parent[second] = first
+         self.size[first]   += self.size[second]
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### c o m p o n e n t    a l l o c a t o r
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class ComponentAllocator:
+   """
+   use: Allocator of time slots by component, with a process pool shared
+        by all the time slots allocated
+   usage: Typically, by TimeSlots.runBid():
+             with ComponentAllocator() as allocator:
+                for timeSlot in timeSlots:
+                   allocator.runBid(bids of timeSlot)
+          A time slot with fewer than minBidCount bids, or with only one
+          component, or with bids of hashers in a group or for trails in a
+          capacity pool, is allocated by
+          Bids.runBid() in this process, as is every time slot when fewer
+          than two workers are available
+   """
+   def __init__(self, workers = None, minBidCount = None):
+      """
+      usage: workers defaults to the number of processors, and minBidCount
+             to parallelBidCount
+      """
+      self.workers     = workers or os.cpu_count() or 1
+      self.minBidCount = (parallelBidCount if minBidCount is None else
+                          minBidCount)
+      self.pool        = None # created when first needed
+
+###################################
+
+   def __enter__(self):
+      return(self)
+
+###################################
+
+   def __exit__(self, excType, excValue, traceback):
+      self.close()
+
+###########################################################################
+
+   def close(self):
+      """
+      use: Shut down our process pool, if it was started
+      """
+      if (self.pool is not None):
+         self.pool.shutdown()
+         self.pool = None
+
+###########################################################################
+
+   def components(self, bids):
+      """
+      use: Split the bids of a time slot into components
+      post: Return value is a list of lists of positions in bids.list, one
+            list per component, each in the order of bids.list
+      """
+      trailIndexes = {}
+      for bid in bids:
+         trailIndexes.setdefault(bid.trail, len(trailIndexes))
+      sets         = DisjointSets(len(trailIndexes))
+      hasherTrails = {} # trail index of a hasher's first bid
+      for bid in bids:
+         trailIndex = trailIndexes[bid.trail]
+         first      = hasherTrails.setdefault(bid.hasher, trailIndex)
+         if (first != trailIndex):
+            sets.union(first, trailIndex)
+
+      components = {}
+      for (position, bid) in enumerate(bids):
+         components.setdefault(sets.find(trailIndexes[bid.trail]),
+                               []).append(position)
+      return(list(components.values()))
+
+###########################################################################
+
+   def runBid(self, bids):
+      """
+      use: Process the bids of a time slot, as Bids.runBid() does
+      usage: bids holds all the bids of a single time slot
+      """
+      if ((self.workers < 2) or (bids.count < self.minBidCount) or
+          any(((bid.hasher.group is not None) or bid.trail.pools)
+              for bid in bids)):
+         bids.runBid()
+         return
+      components = self.components(bids)
+      if (len(components) < 2):
+         bids.runBid()
+         return
+
+                                # deal the components, largest first, into
+                                # one chunk per worker, evening out sizes
+      chunks     = [[] for worker in range(min(self.workers,
+                                               len(components)))]
+      chunkSizes = [0] * len(chunks)
+      for component in sorted(components, key = len, reverse = True):
+         smallest = chunkSizes.index(min(chunkSizes))
+         chunks[smallest].append(self.records(bids, component))
+         chunkSizes[smallest] += len(component)
+
+      if (self.pool is None):
+         self.pool = concurrent.futures.ProcessPoolExecutor(
+                        max_workers = self.workers)
+      for positions in self.pool.map(allocateComponents, chunks):
+         for position in positions:
+            bid = bids.list[position]
+            bid.trail.addSuccessfulBid(bid)
+            bid.hasher.addSuccessfulBid(bid)
+
+###########################################################################
+
+   def records(self, bids, component):
+      """
+      use: A component's bids as plain tuples for a worker process
+      post: Return value is a (capacities, records) tuple, where
+            capacities is a list of the vacancies of the component's
+            trails, and records is a list of (sortKey, position,
+            hasherIndex, trailIndex) tuples. sortKey is equitableKey(), the
+            key of Bids.sortEquitably(), and position, the bid's position in
+            bids.list, breaks ties as the stable sort of Bids.runBid()
+            would
+      imp: Bids of hashers already attending the time slot, or a time
+           slot conflicting with it, can never be successful, and are left
+           out
+      """
+      hasherIndexes = {}
+      trailIndexes  = {}
+      capacities    = []
+      records       = []
+      for position in component:
+         bid    = bids.list[position]
+         hasher = bid.hasher
+         trail  = bid.trail
+         if (hasher.isConflicting(bid.timeSlot)):
+            continue
+         trailIndex = trailIndexes.get(trail)
+         if (trailIndex is None):
+            trailIndex = trailIndexes[trail] = len(capacities)
+            capacities.append(trail.vacancies)
+         records.append((bid_module.equitableKey(bid),
+                         position,
+                         hasherIndexes.setdefault(hasher,
+                                                  len(hasherIndexes)),
+                         trailIndex))
+      return((capacities, records))
+
+###########################################################################
+###########################################################################
+###########################################################################
+
+def allocateComponents(chunk):
+   """
+   use: Worker process allocation of a chunk of components
+   usage: chunk is a list of (capacities, records) tuples from
+          ComponentAllocator.records()
+   post: Return value is a list of the positions of the successful bids,
+         in the order they were awarded
+   """
+   positions = []
+   for (capacities, records) in chunk:
+      records.sort()
+      vacancies = list(capacities)
+      assigned  = set()
+      for (sortKey, position, hasherIndex, trailIndex) in records:
+         if ((vacancies[trailIndex] > 0) and
+             (hasherIndex not in assigned)):
+            vacancies[trailIndex] -= 1
+            assigned.add(hasherIndex)
+            positions.append(position)
+   return(positions)
+
+###########################################################################
@@ -0,0 +1,63 @@
+# name: $Id: conflict.py 1 23:41:52 19-Oct-2026 s01rz $
+"""
+use: Conflicts between time slots that overlap, such as a Saturday
+     morning time slot and a Saturday all-day time slot. A hasher can be
+     awarded a trail in only one of the time slots of a conflict, just as
+     they can be awarded only one trail within a time slot
+usage: Conflicts are read from conflicts.txt in the event directory, one
+       line per time slot in a conflict of "conflictID, timeSlotID". The
+       time slots listed under the same conflictID overlap each other; a
+       time slot may be listed under several conflicts, eg: an all-day time
+       slot under both a morning and an afternoon conflict, which do not
+       overlap each other
+imp: Each time slot is its own conflict group, and each conflict read
+     here is another; every group is a bit. A time slot's group is the bit
+     of its index, and conflicts are numbered on from the number of time
+     slots, so the bits of an event are dense, and each event loaded
+     starts again from bit 0. A time slot's conflicts attribute is the
+     bitset of the groups it is in, and a hasher's occupied attribute the
+     union of the conflicts of the time slots they have been awarded a
+     trail in. A hasher can be awarded a trail in a time slot only if the
+     two bitsets are disjoint, so the check in Bid.runBid() stays a single
+     bitwise and, however many conflicts there are. Time slots are still
+     allocated one at a time in order, so of two conflicting time slots,
+     the one allocated first has the first claim on its hashers; results
+     are printed by time slot as before
+"""
+from ingest   import *
+from resource import *
+from setting  import *
+
+###########################################################################
+###########################################################################
+###########################################################################
+
+def readConflicts(filespec, timeSlots):
+   """
+   use: Read conflicts.txt, and add each conflict's group to the conflicts
+        of its time slots
+   usage: Pass an event directory name or a conflicts.txt filespec, along
+          with the time slots the conflicts are between
+   post: Return value is the number of conflicts
+   """
+   bits   = {}                  # conflict group bit keyed on conflictID
+   ingest = toIngest(filespec, conflictsSchema)
+   for (lineNumber, (conflictId, timeSlotId)) in ingest:
+      timeSlot = timeSlots.getById(timeSlotId)
+      if (timeSlot is None):
+         writeFileReadError(ingest.filespec, lineNumber,
+                            "unknown time slot ID",
+                            f"{conflictId}, {timeSlotId}")
+         printFileReadError(lineNumber, f"{conflictId}, {timeSlotId}")
+         continue
+      bit = bits.get(int(conflictId))
+      if (bit is None):
+         bit = bits[int(conflictId)] = 1 << (timeSlots.count + len(bits))
+      timeSlot.conflicts |= bit
+      if (settings["verbosity"] != 0):
+         print(f"{conflictId} -> {str(timeSlot)}")
+   ingest.check()
+   print(f"{len(bits)} {plural(len(bits), 'conflict')}")
+   return(len(bits))
+
+###########################################################################
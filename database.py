@@ -0,0 +1,114 @@
+# name: $Id: database.py 1 11:04:17 19-Oct-2026 s01rz $
+"""
+use: Write the loaded event and the outcome of processing its bids into a
+     single SQLite database file, so that questions such as who is on a
+     trail, who got nothing, or what the clearing bid of a trail was can
+     be answered ad hoc with SQL
+imp: Tables, and their fields, are:
+        timeSlots  : timeSlotID, sequence, name
+        trails     : trailID, timeSlotID, sequence, name, capacity
+        hashers    : hasherID, sequence, name, rank
+        bids       : hasherID, trailID, bidAmount
+        awards     : hasherID, trailID, timeSlotID, bidAmount
+        priceCurves: trailID, fill50, fill75, fill100, lowestBid,
+                     highestBid; see Trail.priceCurve
+     All rows are written with executemany() inside one transaction, and
+     the query indexes are created after the rows are loaded
+"""
+
+import sqlite3
+
+from resource import *
+from setting  import *
+
+schema = """
+create table timeSlots (timeSlotID integer primary key,
+                        sequence   integer,
+                        name       text);
+create table trails    (trailID    integer primary key,
+                        timeSlotID integer references timeSlots,
+                        sequence   integer,
+                        name       text,
+                        capacity   integer);
+create table hashers   (hasherID   integer primary key,
+                        sequence   integer,
+                        name       text,
+                        rank       integer);
+create table bids      (hasherID   integer references hashers,
+                        trailID    integer references trails,
+                        bidAmount  integer);
+create table awards    (hasherID   integer references hashers,
+                        trailID    integer references trails,
+                        timeSlotID integer references timeSlots,
+                        bidAmount  integer);
+create table priceCurves (trailID    integer primary key references trails,
+                          fill50     integer,
+                          fill75     integer,
+                          fill100    integer,
+                          lowestBid  integer,
+                          highestBid integer);
+"""
+
+indexes = """
+create index trailsByTimeSlot on trails (timeSlotID);
+create index bidsByHasher     on bids   (hasherID);
+create index bidsByTrail      on bids   (trailID, bidAmount);
+create index awardsByHasher   on awards (hasherID);
+create index awardsByTrail    on awards (trailID, bidAmount);
+create index awardsByTimeSlot on awards (timeSlotID);
+"""
+
+###########################################################################
+
+def writeDatabase(filespec, timeSlots, hashers):
+   """
+   use: Write time slots, trails, hashers, bids, and awards into a new
+        SQLite database file
+   usage: An existing file at filespec is replaced
+   pre: runBid() processing should be completed for the awards table to
+        be populated
+   post: Return value is a dictionary of row counts keyed on table name
+   """
+   if (os.path.isfile(filespec)):
+      os.remove(filespec)
+
+   trails = [trail for timeSlot in timeSlots for trail in timeSlot.trails]
+   counts = {}
+   connection = sqlite3.connect(filespec)
+   try:
+      with connection:
+         connection.executescript(schema)
+         for (table, sql, rows) in (
+                ("timeSlots",
+                 "insert into timeSlots values (?, ?, ?)",
+                 ((timeSlot.id, timeSlot.sequence, timeSlot.name)
+                  for timeSlot in timeSlots)),
+                ("trails",
+                 "insert into trails values (?, ?, ?, ?, ?)",
+                 ((trail.id, trail.timeSlot.id, trail.sequence, trail.name,
+                   trail.capacity)
+                  for trail in trails)),
+                ("hashers",
+                 "insert into hashers values (?, ?, ?, ?)",
+                 ((hasher.id, hasher.sequence, hasher.name, hasher.rank)
+                  for hasher in hashers)),
+                ("bids",
+                 "insert into bids values (?, ?, ?)",
+                 ((bid.hasher.id, bid.trail.id, bid.value)
+                  for trail in trails for bid in trail.bids)),
+                ("awards",
+                 "insert into awards values (?, ?, ?, ?)",
+                 ((bid.hasher.id, bid.trail.id, bid.timeSlot.id, bid.value)
+                  for trail in trails for bid in trail.successfulBids)),
+                ("priceCurves",
+                 "insert into priceCurves values (?, ?, ?, ?, ?, ?)",
+                 ((trail.id,) + trail.priceCurve for trail in trails))):
+            cursor = connection.executemany(sql, rows)
+            counts[table] = cursor.rowcount
+         for statement in indexes.split(";"):
+            connection.execute(statement)
+   finally:
+      connection.close()
+   return(counts)
+
+###########################################################################
@@ -0,0 +1,184 @@
+# name: $Id: export.py 1 10:12:41 19-Oct-2026 s01rz $
+"""
+use: Machine-readable export of bid results. Awards, per-hasher outcomes,
+     and per-trail fill statistics are written as CSV or JSON Lines files
+     into the export subdirectory of the event directory
+imp: Rows are produced by generators walking the allocation results, and
+     are written out in chunks of chunkSize rows, so no whole document is
+     ever built in memory regardless of how many rows are exported
+"""
+
+import csv
+import json
+import sys
+
+from resource import *
+from setting  import *
+from trail    import priceCurveFields
+
+exportFormats = ("csv", "jsonl")
+
+                                # field names for each exported file; the
+                                # row generators yield tuples in this order
+awardFields  = ("timeSlotID", "timeSlotName",
+                "trailID"   , "trailName"   ,
+                "hasherID"  , "hasherName"  , "bidAmount"   ,
+                "tag")
+hasherFields = ("hasherID"   , "hasherName"  ,
+                "bidCount"   , "bidAmount"   ,
+                "trailsWon"  , "outcome"     , "trailIDs")
+trailFields  = ("timeSlotID" , "trailID"     , "trailName",
+                "capacity"   , "attendees"   , "vacancies",
+                "bidCount"   , "bidAmount"   ) + priceCurveFields
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### r o w    g e n e r a t o r s
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+def awardRows(timeSlots):
+   """
+   use: Generate one row per successful bid for every trail within the
+        passed time slots
+   usage: timeSlots can be a TimeSlots object, or any iterable of
+          TimeSlot objects
+   post: Yields tuples ordered as awardFields
+   """
+   for timeSlot in timeSlots:
+      for trail in timeSlot.trails.sortBySequence():
+         for bid in trail.successfulBids:
+            yield((timeSlot.id , timeSlot.name,
+                   trail.id    , trail.name   ,
+                   bid.hasher.id, bid.hasher.name, bid.value,
+                   bid.tag or ""))
+
+###########################################################################
+
+def hasherRows(hashers):
+   """
+   use: Generate one row per hasher with the outcome of their bids
+   post: Yields tuples ordered as hasherFields. outcome is one of
+         "successful", "unsuccessful", or "no bid"
+   """
+   for hasher in hashers:
+      yield((hasher.id      , hasher.name              ,
+             hasher.bidCount, hasher.bidValue          ,
+             hasher.successfulBidCount, hasher.outcome ,
+             " ".join(str(bid.trail.id) for bid in hasher.successfulBids)))
+
+###########################################################################
+
+def trailRows(timeSlots):
+   """
+   use: Generate one row per trail with its fill statistics
+   post: Yields tuples ordered as trailFields, ending with the trail's
+         price curve. vacancies are the seats that can still be filled,
+         within the trail's capacity pools, and none for a cancelled trail
+   """
+   for timeSlot in timeSlots:
+      for trail in timeSlot.trails.sortBySequence():
+         yield((timeSlot.id      , trail.id        , trail.name,
+                trail.capacity   , trail.successfulBidsCount,
+                trail.vacancies  ,
+                trail.bidCount   , trail.bidValue  ) + trail.priceCurve)
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### w r i t e r s
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+def chunked(rows, chunkSize):
+   """
+   use: Regroup a stream of rows into lists of at most chunkSize rows
+   """
+   chunk = []
+   for row in rows:
+      chunk.append(row)
+      if (len(chunk) >= chunkSize):
+         yield(chunk)
+         chunk = []
+   if (len(chunk) != 0):
+      yield(chunk)
+
+###########################################################################
+
+def exportFilespec(name, exportFormat, outputDirectory = None):
+   """
+   use: Filespec of an export file, creating the export directory if
+        needed
+   usage: If outputDirectory is not passed, the export subdirectory of
+          the event directory is used
+   """
+   if (outputDirectory is None):
+      outputDirectory = os.path.join(settings["eventDirectory"], "export")
+   if (not os.path.isdir(outputDirectory)):
+      os.mkdir(outputDirectory)
+   return(os.path.join(outputDirectory, f"{name}.{exportFormat}"))
+
+###########################################################################
+
+def exportRows(filespec, fields, rows, exportFormat,
+               chunkSize = 1000, mode = "w"):
+   """
+   use: Stream rows into a CSV or JSON Lines file
+   usage: Pass:
+             filespec    : file to be written
+             fields      : names of the fields of each row
+             rows        : iterable, usually a generator, of row tuples
+             exportFormat: one of exportFormats
+             chunkSize   : number of rows formatted and flushed together
+             mode        : w: create file, writing a CSV header row
+                           a: append to an existing file without a header
+   post: Return value is the number of rows written
+   """
+   count = 0
+   with open(filespec, mode, newline = "") as outputFile:
+      if (exportFormat == "csv"):
+         csvWriter = csv.writer(outputFile)
+         if (mode == "w"):
+            csvWriter.writerow(fields)
+         for chunk in chunked(rows, chunkSize):
+            csvWriter.writerows(chunk)
+            outputFile.flush()
+            count += len(chunk)
+      elif (exportFormat == "jsonl"):
+         for chunk in chunked(rows, chunkSize):
+            outputFile.write("".join(json.dumps(dict(zip(fields, row))) + "\n"
+                                     for row in chunk))
+            outputFile.flush()
+            count += len(chunk)
+      else:
+         sys.stderr.write(f"{selfName}: exportRows(): "
+                          f"unknown export format: {exportFormat}\n")
+   return(count)
+
+###########################################################################
+
+def exportResult(timeSlots, hashers, exportFormat, outputDirectory = None,
+                 chunkSize = 1000):
+   """
+   use: Export awards, hasher outcomes, and trail fill statistics
+   pre: runBid() processing must be completed
+   post: awards, hashers, and trails files are written in exportFormat
+   """
+   timeSlots.sortBySequence()
+   hashers.sortById()
+   for (name, fields, rows) in (
+          ("awards" , awardFields , awardRows (timeSlots)),
+          ("hashers", hasherFields, hasherRows(hashers  )),
+          ("trails" , trailFields , trailRows (timeSlots))):
+      filespec = exportFilespec(name, exportFormat, outputDirectory)
+      count    = exportRows(filespec, fields, rows, exportFormat, chunkSize)
+      print(f"{filespec}: {count} {plural(count, 'row')}")
+
+###########################################################################
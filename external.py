@@ -0,0 +1,361 @@
+# name: $Id: external.py 1 19:26:40 19-Oct-2026 s01rz $
+"""
+use: External-memory allocation, for simulating bid sets too large to be
+     held in memory as Bid objects. Bids are read from a binary bid file,
+     bids.bin, and the awards are written to another, awards.bin
+usage: For help:
+          python external.py -h
+imp: Time slots are allocated one after the other, as TimeSlots.runBid()
+     does. For each time slot, the bids for its trails are streamed from
+     the memory-mapped bid file, and each is packed into a fixed-width
+     record led by its Bids.sortEquitably() key, packed big-endian so that
+     records sort as bytes. Records are sorted runSize at a time, and the
+     sorted runs spilled to temporary files, which are then k-way merged
+     as a stream into the same acceptance loop as Bids.runBid(). While
+     merging, only the vacancies of the time slot's trails and a bitmap of
+     the hashers already awarded a trail in the time slot are held in
+     memory.
+     The sort key needs each hasher's total bid count and rank, each
+     trail's bid count, and each hasher's successful bid count from the
+     earlier time slots; these are held in arrays indexed by the hasher
+     and trail indexes of the bid file. The bid's record number is the
+     last tie-breaker, giving the same order as the stable sort of
+     Bids.runBid() for a bid file written in the order of bids.txt.
+     Bids are not checked against the bidAllowance, and duplicate bids
+     are not detected, as they are when Bid objects are loaded.
+     Conflicts between time slots are applied by keeping the bitmap of the
+     hashers awarded a trail in each time slot; a time slot's bitmap
+     starts as the union of those of the earlier time slots conflicting
+     with it, see conflict.py. Capacity pools, groups, and minimum
+     attendance are not applied, so external.py refuses to run on an event
+     using any of them
+"""
+import array
+import getopt
+import heapq
+import struct
+import sys
+import tempfile
+
+from pprint import pprint
+
+import bidFile as bidFile_module
+
+from resource import *
+from setting  import *
+
+keyFormat      = struct.Struct(">IIIQIIQ") # inverted value, successful
+                                           # bids, bids, rank, trail bids,
+                                           # trail ID order, record number
+payloadFormat  = struct.Struct(">IIi")     # hasher index, trail index,
+                                           # value
+runSize        = 1000000        # records sorted in memory per run
+readChunkSize  = 4096           # records read at a time from a run
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### e x t e r n a l    a l l o c a t i o n
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class ExternalAllocation:
+   """
+   use: Allocation of the bids of a binary bid file without loading them
+   usage: Typically:
+             allocation = ExternalAllocation(bidFilespec, timeSlots,
+                                             trails, hashers)
+             allocation.runBid(awardsFilespec)
+   pre: trails must be joined to timeSlots, and hashers sorted by
+        Hashers.sortByRandom()
+   imp: Attributes, indexed by hasher or trail index:
+           hasherBids      : number of bids of each hasher
+           hasherRanks     : rank of each hasher
+           hasherSuccesses : number of successful bids of each hasher so
+                             far
+           trailBids       : number of bids for each trail
+           trailOrders     : position of each trail's ID among the trail
+                             IDs, the sort key's last resort
+           trailTimeSlots  : position in timeSlots of each trail's time
+                             slot, or -1
+        slotWinners is a dictionary keyed on time slot of the bitmap, as
+        an int, of the hashers awarded a trail in the time slot
+   """
+   def __init__(self, filespec, timeSlots, trails, hashers,
+                runSize = runSize, temporaryDirectory = None):
+      self.filespec           = filespec
+      self.timeSlots          = timeSlots
+      self.trails             = trails
+      self.hashers            = hashers
+      self.runSize            = runSize
+      self.temporaryDirectory = temporaryDirectory
+      self.recordFormat       = struct.Struct(keyFormat.format +
+                                              payloadFormat.format[1:])
+
+      self.hasherRanks     = array.array("Q", [0]) * hashers.count
+      for hasher in hashers:
+         self.hasherRanks[hasher.index] = hasher.rank
+      self.hasherBids      = array.array("L", [0]) * hashers.count
+      self.hasherSuccesses = array.array("L", [0]) * hashers.count
+      for hasher in hashers:
+         self.hasherSuccesses[hasher.index] = hasher.successfulBidCount
+      self.trailBids       = array.array("L", [0]) * trails.count
+      self.trailOrders     = array.array("L", [0]) * trails.count
+      for (order, trail) in enumerate(sorted(trails,
+                                             key = lambda trail: trail.id)):
+         self.trailOrders[trail.index] = order
+      slotPositions        = {timeSlot: position for (position, timeSlot)
+                              in enumerate(timeSlots)}
+      self.trailTimeSlots  = array.array("l",
+                                         [slotPositions.get(trail.timeSlot,
+                                                            -1)
+                                          for trail in self.trailsByIndex()])
+      self.slotWinners     = {}
+      self.countBids()
+
+###########################################################################
+
+   def allocate(self, runs, timeSlot):
+      """
+      use: Acceptance loop of a time slot over its merged sorted runs
+      post: Yields (hasherIndex, trailIndex, value) of each successful
+            bid, in the order awarded
+      imp: won starts with the hashers awarded a trail in an earlier,
+           conflicting time slot, who are then passed over like those
+           awarded a trail in this one
+      """
+      vacancies  = {trail.index: max(trail.capacity -
+                                     trail.successfulBidsCount, 0)
+                    for trail in timeSlot.trails}
+      openTrails = sum(1 for vacancy in vacancies.values() if vacancy > 0)
+      size       = (self.hashers.count + 7) // 8
+      blocked    = 0
+      for (other, winners) in self.slotWinners.items():
+         if (other.conflicts & timeSlot.conflicts):
+            blocked |= winners
+      won        = bytearray(blocked.to_bytes(size, "little"))
+      payload    = keyFormat.size
+      unpack     = payloadFormat.unpack_from
+      for record in heapq.merge(*runs):
+         if (openTrails == 0):
+            break
+         (hasherIndex, trailIndex, value) = unpack(record, payload)
+         bit = 1 << (hasherIndex & 7)
+         if ((vacancies[trailIndex] > 0) and
+             (not (won[hasherIndex >> 3] & bit))):
+            won[hasherIndex >> 3]             |= bit
+            vacancies[trailIndex]             -= 1
+            self.hasherSuccesses[hasherIndex] += 1
+            if (vacancies[trailIndex] == 0):
+               openTrails -= 1
+            yield((hasherIndex, trailIndex, value))
+      self.slotWinners[timeSlot] = (int.from_bytes(won, "little") &
+                                    ~blocked)
+
+###########################################################################
+
+   def countBids(self):
+      """
+      use: Count the bids of each hasher and for each trail, in one pass
+           over the bid file
+      """
+      with bidFile_module.BidFile(self.filespec) as bidFile:
+         if ((bidFile.hasherCount != self.hashers.count) or
+             (bidFile.trailCount  != self.trails.count )):
+            raise IngestError(f"\n"
+                     f"   bid file written for {bidFile.hasherCount} "
+                     f"hashers and {bidFile.trailCount} trails\n"
+                     f"   >>> {self.filespec}")
+         for (hasherIndex, trailIndex, value) in bidFile:
+            self.hasherBids[hasherIndex] += 1
+            self.trailBids[trailIndex]   += 1
+
+###########################################################################
+
+   def readRun(self, runFile):
+      """
+      use: Stream the records of a sorted run spilled to runFile
+      """
+      size = self.recordFormat.size
+      runFile.seek(0)
+      while (True):
+         chunk = runFile.read(size * readChunkSize)
+         if (len(chunk) == 0):
+            break
+         for offset in range(0, len(chunk), size):
+            yield(chunk[offset:offset + size])
+
+###########################################################################
+
+   def runBid(self, awardsFilespec):
+      """
+      use: Allocate every time slot, writing the successful bids to
+           awardsFilespec as a binary bid file
+      post: Return value is the number of successful bids
+      """
+      with tempfile.TemporaryDirectory(dir = self.temporaryDirectory) \
+           as directory:
+         count = bidFile_module.writeBidFile(
+                    awardsFilespec,
+                    (award
+                     for (position, timeSlot) in enumerate(self.timeSlots)
+                     for award in self.runTimeSlot(position, timeSlot,
+                                                   directory)),
+                    self.hashers.count, self.trails.count)
+      return(count)
+
+###################################
+
+   def runTimeSlot(self, position, timeSlot, directory):
+      """
+      use: Allocate one time slot
+      post: Yields (hasherIndex, trailIndex, value) of each successful
+            bid, in the order awarded
+      """
+      print(timeSlot.pretty())
+      runFiles = []
+      try:
+         runs = self.spill(position, directory, runFiles)
+         yield from self.allocate(runs, timeSlot)
+      finally:
+         for runFile in runFiles:
+            runFile.close()
+
+###########################################################################
+
+   def spill(self, position, directory, runFiles):
+      """
+      use: Sort the bids of the time slot at position in timeSlots into
+           runs
+      post: Return value is a list of iterators over the sorted runs. All
+            runs but the last are spilled to temporary files in
+            directory, which are appended to runFiles for closing
+      """
+      pack        = self.recordFormat.pack
+      slots       = self.trailTimeSlots
+      hasherBids  = self.hasherBids
+      hasherRanks = self.hasherRanks
+      successes   = self.hasherSuccesses
+      trailBids   = self.trailBids
+      trailOrders = self.trailOrders
+      run         = []
+      runs        = []
+      with bidFile_module.BidFile(self.filespec) as bidFile:
+         for (recordNumber, (hasherIndex, trailIndex, value)) in \
+             enumerate(bidFile):
+            if (slots[trailIndex] != position):
+               continue
+            run.append(pack(0x7fffffff - value,
+                            successes[hasherIndex]  ,
+                            hasherBids[hasherIndex] ,
+                            hasherRanks[hasherIndex],
+                            trailBids[trailIndex]   ,
+                            trailOrders[trailIndex] ,
+                            recordNumber,
+                            hasherIndex, trailIndex, value))
+            if (len(run) == self.runSize):
+               run.sort()
+               runFile = tempfile.TemporaryFile(dir = directory)
+               runFiles.append(runFile)
+               runFile.write(b"".join(run))
+               runs.append(self.readRun(runFile))
+               run = []
+      run.sort()
+      runs.append(iter(run))
+      return(runs)
+
+###########################################################################
+
+   def trailsByIndex(self):
+      """
+      use: Our trails in order of their index
+      """
+      return(sorted(self.trails, key = lambda trail: trail.index))
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### m a i n
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+if ( __name__ == "__main__" ):
+   from conflict import readConflicts
+   from ingest   import capacityPoolsSchema, conflictsSchema, groupsSchema
+   from intake   import loadEvent
+
+   eventDirectory     = None
+   temporaryDirectory = None
+   opts, args         = getopt.getopt(sys.argv[1:], "r:t:h")
+
+   for opt in opts:
+      if (opt[0] == "-r"):
+         runSize = int(opt[1])
+      elif (opt[0] == "-t"):
+         temporaryDirectory = opt[1]
+      elif (opt[0] == "-h"):
+         print(f"usage: {selfName} [options] [directoryName]")
+         print( "where options are:")
+         print(f"   -rNumber bids sorted in memory at a time; if not "
+                  f"provided, defaults to")
+         print(f"            {runSize}")
+         print( "   -tDir    directory for temporary files; if not "
+                "provided, defaults to")
+         print( "            the system's temporary directory")
+         print( "   -h       help")
+         print( "If directory name is not provided, it defaults to 'event'.")
+         print( "Bids are read from bids.bin in the event directory, and "
+                "awards written to")
+         print( "awards.bin")
+         exit(0)
+
+   for arg in args:
+      if (eventDirectory is None):
+         eventDirectory = arg
+      else:
+         sys.stderr.write(f"{selfName}: unwanted extra argument: {arg}\n")
+         exit(1)
+   if (eventDirectory is None):
+      eventDirectory = "event"
+
+   bidFilespec = os.path.join(eventDirectory, "bids.bin")
+   if (not bidFile_module.isBidFile(bidFilespec)):
+      sys.stderr.write(f"{selfName}: no bid file: {bidFilespec}\n")
+      exit(1)
+
+   settings["eventDirectory"] = eventDirectory
+   settings.readFile(eventDirectory)
+   settings.setDefault("bidAllowance", 100)
+   pprint(settings.dict)
+
+   print()
+   (timeSlots, trails, hashers) = loadEvent(eventDirectory)
+   if (os.path.isfile(os.path.join(eventDirectory,
+                                   conflictsSchema.filename))):
+      readConflicts(eventDirectory, timeSlots)
+   if (os.path.isfile(os.path.join(eventDirectory,
+                                   capacityPoolsSchema.filename)) or
+       os.path.isfile(os.path.join(eventDirectory,
+                                   groupsSchema.filename)) or
+       any((trail.minimumAttendance > 0) for trail in trails)):
+      sys.stderr.write(f"{selfName}: capacity pools, groups, and minimum "
+                       f"attendance are not supported by external-memory "
+                       f"allocation\n")
+      exit(1)
+   hashers.sortByRandom()
+
+   print()
+   printHeading("/// run bid ///", 0, 1)
+   allocation = ExternalAllocation(bidFilespec, timeSlots, trails, hashers,
+                                   runSize, temporaryDirectory)
+   awardsFilespec = os.path.join(eventDirectory, "awards.bin")
+   count = allocation.runBid(awardsFilespec)
+   print(f"{awardsFilespec}: {count} {plural(count, 'award')}")
+
+###########################################################################
@@ -8,7 +8,6 @@ use: Generate hashers.txt and bids.txt files located in the event
 usage: For help:
           python generate.py -h
 """
-import csv
 import getopt
 import os
 import posixpath
@@ -18,6 +17,8 @@ import sys
 
 from pprint import pprint
 
+from bidFile import *
+from ingest  import *
 from setting import *
 
 selfName = os.path.basename(sys.argv[0])
@@ -187,6 +188,26 @@ def generateBids_random(hashers, trailMin, trailMax, allowance,
 
    file.close()
 
+###########################################################################
+
+def generateBidFile(eventDirectory):
+   """
+   use: Convert the bids.txt file in the event directory into a binary
+        bids.bin file
+   imp: See readIndexes() for the hasher and trail indexes
+   """
+   (hasherIndexes, trailIndexes) = readIndexes(eventDirectory)
+
+   ingest = Ingest(eventDirectory, bidsSchema)
+   count  = writeBidFile(os.path.join(eventDirectory, "bids.bin"),
+                         ((hasherIndexes[hasherId], trailIndexes[trailId],
+                           value)
+                          for (lineNumber, (hasherId, trailId, value))
+                          in ingest),
+                         len(hasherIndexes), len(trailIndexes))
+   ingest.check()
+   print(f"{count} {plural(count, 'bid')} written to bids.bin")
+
 ###########################################################################
 ###########################################################################
 ###########################################################################
@@ -201,17 +222,21 @@ if ( __name__ == "__main__" ):
    hashers        = 2000
    eventDirectory = None
    distribution   = None
-   opts, args     = getopt.getopt(sys.argv[1:], "n:h")
+   binaryP        = False
+   opts, args     = getopt.getopt(sys.argv[1:], "bn:h")
    timeSlots      = {}
 
    for opt in opts:
       if (opt[0] == "-n"):
          hashers = int(opt[1])
+      elif (opt[0] == "-b"):
+         binaryP = True
       elif (opt[0] == "-h"):
          print(f"usage: {selfName} [options] [directoryName [distribution]]")
          print( "where option are:")
          print(f"   -nNumber number of hashers to generate; if not provided,"
                   f" defaults to {hashers}")
+         print( "   -b       write bids as binary bids.bin instead of bids.txt")
          print( "   -h       help")
          print( "If directory name is not provided, it defaults to 'event';")
          print( "directoryName for the generated datafiles must already exist,")
@@ -241,18 +266,12 @@ if ( __name__ == "__main__" ):
    settings.setDefault("bidAllowance", 100)
    bidAllowance = int(settings["bidAllowance"])
 
-   filespec = os.path.join(eventDirectory, "trailTimes.txt")
-   with (open(filespec, "r")) as csvfile:
-      csvReader = csv.reader(csvfile)
-      if (csv.Sniffer().has_header(open(csvfile.name).read(1024))):
-         next(csvReader)
-      for row in csvReader:
-         if (len(row) != 0):
-            timeSlotId = int(row[0])
-            trailId    = int(row[1])
-            if (timeSlotId not in timeSlots):
-               timeSlots[timeSlotId] = []
-            timeSlots[timeSlotId].append(int(trailId))
+   ingest = Ingest(eventDirectory, trailTimesSchema)
+   for (lineNumber, (timeSlotId, trailId)) in ingest:
+      if (timeSlotId not in timeSlots):
+         timeSlots[timeSlotId] = []
+      timeSlots[timeSlotId].append(trailId)
+   ingest.check()
 
    generateHashers(hashers, eventDirectory, "w")
    fileMode = "w"
@@ -270,3 +289,7 @@ if ( __name__ == "__main__" ):
          generateBids_random (hashers, trailMin, trailMax, bidAllowance,
                               eventDirectory, fileMode)
       fileMode = "a"
+
+   if (binaryP):
+      generateBidFile(eventDirectory)
+      os.remove(os.path.join(eventDirectory, "bids.txt"))
@@ -0,0 +1,239 @@
+# name: $Id: group.py 1 21:52:40 19-Oct-2026 s01rz $
+"""
+use: Groups of hashers, such as couples and kennels, who want to run the
+     same trail together. A group's members are awarded a trail all
+     together or not at all
+usage: Groups are read from groups.txt in the event directory, one line
+       per member of "groupID, hasherID"
+imp: In each time slot, the members of a group who bid in the time slot
+     bid together, as a GroupBid, for each trail they all bid on; their
+     bids for other trails in the time slot are dropped. A member who is
+     the only one of their group to bid in a time slot bids alone.
+     A GroupBid is sorted by Bids.sortEquitably() among the other bids at
+     the group's combined priority: the mean of its members' bid values,
+     then the tie-breakers of its most successful member, its member with
+     the most bids, and its best ranked member. It is successful if its
+     trail has a vacancy for every member, and no member already has a
+     trail in the time slot. A group's members are held in a list, so
+     checking and awarding a GroupBid costs one step per member
+"""
+from ingest   import *
+from resource import *
+from setting  import *
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### g r o u p
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class Group:
+   """
+   use: A group of hashers to be awarded the same trail
+   imp: The successfulBidCount, bidCount, and rank properties stand in
+        for a hasher's in the sort key of Bids.sortEquitably(), as
+        GroupBid.hasher is the group
+   """
+   __slots__ = ("id", "hashers")
+
+   def __init__(self, id):
+      self.id      = int(id)
+      self.hashers = []
+
+###################################
+
+   def __str__(self):
+      return(f"group {self.id}: "
+             f"{', '.join(hasher.name for hasher in self.hashers)}")
+
+###################################
+
+   @property
+   def successfulBidCount(self):
+      """use: Most successful bids of any of our members"""
+      return(max(hasher.successfulBidCount for hasher in self.hashers))
+
+###################################
+
+   @property
+   def bidCount(self):
+      """use: Most bids submitted by any of our members"""
+      return(max(hasher.bidCount for hasher in self.hashers))
+
+###################################
+
+   @property
+   def rank(self):
+      """use: Best rank of our members"""
+      return(min(hasher.rank for hasher in self.hashers))
+
+###########################################################################
+
+   def add(self, hasher):
+      """
+      use: Add a hasher to our members
+      post: A hasher already in a group raises a DuplicateError
+      """
+      if (hasher.group is not None):
+         raise DuplicateError(f"\n"
+                  f"   hasher already in a group\n"
+                  f"   >>> {str(hasher)}")
+      hasher.group = self
+      self.hashers.append(hasher)
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### g r o u p    b i d
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class GroupBid:
+   """
+   use: The bids of a group's members for one trail, allocated together
+   imp: hasher is the group, and value the mean of the bids' values, so a
+        GroupBid sorts by Bids.sortEquitably() like a Bid
+   """
+   __slots__ = ("hasher", "trail", "bids", "value")
+
+   def __init__(self, group, trail, bids):
+      self.hasher = group
+      self.trail  = trail
+      self.bids   = bids
+      self.value  = sum(bid.value for bid in bids) / len(bids)
+
+###################################
+
+   def __str__(self):
+      return(f"{self.hasher} -> {self.trail}; {self.value}")
+
+###########################################################################
+
+   def runBid(self):
+      """
+      use: Process this group bid
+      post: If there is a vacancy on the trail for every member, and no
+            member has a trail in the time slot or a conflicting one,
+            every member's bid is successful; otherwise nothing is done
+      """
+      trail    = self.trail
+      timeSlot = trail.timeSlot
+      if ((trail.vacancies >= len(self.bids)) and
+          (not any(bid.hasher.isConflicting(timeSlot)
+                   for bid in self.bids))):
+         for bid in self.bids:
+            trail.addSuccessfulBid(bid)
+            bid.hasher.addSuccessfulBid(bid)
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### g r o u p s
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class Groups:
+   def __init__(self, filespec = None, hashers = None):
+      """
+      usage: Optionally pass an event directory name or a groups.txt
+             filespec, along with the hashers the groups are made of
+      """
+      self.list      = []
+      self.lookupIDs = {} # dict keyed on group.id containing a group
+
+      if (filespec is not None):
+         ingest = toIngest(filespec, groupsSchema)
+         for (lineNumber, (groupId, hasherId)) in ingest:
+            try:
+               hasher = hashers.getById(hasherId)
+               if (hasher is None):
+                  raise IngestError("unknown hasher ID")
+               group = self.getById(groupId)
+               if (group is None):
+                  group = Group(groupId)
+                  self.add(group)
+               group.add(hasher)
+            except (DuplicateError, IngestError) as exception:
+               writeFileReadError(ingest.filespec, lineNumber, exception,
+                                  f"{groupId}, {hasherId}")
+               printFileReadError(lineNumber, f"{groupId}, {hasherId}")
+         ingest.check()
+         print(f"{self.count} {plural(self.count, 'group')}")
+
+###################################
+
+   def __getitem__(self, index):
+      return(self.list[index])
+
+###################################
+
+   @property
+   def count(self):
+      """use: Number of groups belonging to us"""
+      return(len(self.list))
+
+###########################################################################
+
+   def add(self, group):
+      """
+      use: Add a group to us
+      """
+      self.list.append(group)
+      self.lookupIDs[group.id] = group
+
+###########################################################################
+
+   def getById(self, id):
+      """
+      use: The group corresponding to the passed ID
+      post: Return value is None if there is no such group
+      """
+      return(self.lookupIDs.get(int(id)))
+
+###########################################################################
+###########################################################################
+###########################################################################
+
+def groupBids(bids):
+   """
+   use: The bids of a time slot, with the bids of each group's members
+        combined into GroupBids
+   usage: bids holds all the bids of a single time slot
+   post: Return value is a list of the Bids of hashers in no group, and of
+         members bidding alone, and a GroupBid for each trail every member
+         of a group bidding in the time slot bid on
+   """
+   result  = []
+   members = {}                 # dict keyed on group, containing a dict
+                                # keyed on member of the member's bids
+                                # keyed on trail
+   for bid in bids:
+      group = bid.hasher.group
+      if (group is None):
+         result.append(bid)
+      else:
+         members.setdefault(group, {}).setdefault(bid.hasher,
+                                                  {})[bid.trail] = bid
+   for (group, memberBids) in members.items():
+      memberBids = list(memberBids.values())
+      if (len(memberBids) == 1):
+         result.extend(memberBids[0].values())
+         continue
+      for trail in memberBids[0]:
+         if (all((trail in bidsByTrail) for bidsByTrail in memberBids[1:])):
+            result.append(GroupBid(group, trail,
+                                   [bidsByTrail[trail]
+                                    for bidsByTrail in memberBids]))
+   return(result)
+
+###########################################################################
@@ -1,6 +1,7 @@
 # name: $Id: hasher.py 22 16:58:28 04-Mar-2022 s01rz $
 
 import csv
+import json
 import random
 import sys
 
@@ -9,12 +10,73 @@ from setting import *
 import bid   as bid_module
 import trail as trail_module
 
+from ingest   import *
 from param    import *
 from resource import *
 from setting  import *
 
 random.seed()
 
+                                # static page for Hashers.printResultByHasher
+                                # outputFormat json; fetches index.json once
+                                # and then only the shard for the hasher
+hasherLookupPage = """<!DOCTYPE html>
+<html>
+<head>
+ <meta name="viewport" content="width=device-width, initial-scale=1">
+ <title>Trail Bidding Result</title>
+</head>
+
+<body>
+<h1>Cumming on Trail</h1>
+<input id="name" list="hashers" placeholder="Hasher name" autocomplete="off">
+<datalist id="hashers"></datalist>
+<div id="result"></div>
+<script>
+var index = null;
+fetch("hasher-result/index.json").then(r => r.json()).then(data => {
+  index = data;
+  var options = document.getElementById("hashers");
+  for (const [name, id] of data.hashers) {
+    var option = document.createElement("option");
+    option.value = name;
+    options.appendChild(option);
+  }
+});
+document.getElementById("name").addEventListener("change", event => {
+  var entry = index.hashers.find(e => e[0] === event.target.value);
+  var result = document.getElementById("result");
+  if (!entry) { result.textContent = ""; return; }
+  var shard = Math.floor(entry[1] / index.shardSize);
+  fetch("hasher-result/shard-" + shard + ".json").then(r => r.json())
+    .then(data => {
+      var hasher = data[entry[1]];
+      var lines  = [];
+      if (hasher.outcome === "no bid") {
+        lines.push("- No bids submitted -");
+      } else if (hasher.outcome === "unsuccessful") {
+        lines.push("- No successful bids -");
+      } else if (hasher.trails) {
+        for (const [timeSlot, id, name] of hasher.trails) {
+          lines.push(timeSlot + ": " + id + ": " + name);
+        }
+      }
+      result.replaceChildren();
+      var heading = document.createElement("b");
+      heading.textContent = hasher.name;
+      result.appendChild(heading);
+      for (const line of lines) {
+        var div = document.createElement("div");
+        div.textContent = line;
+        result.appendChild(div);
+      }
+    });
+});
+</script>
+</body>
+</html>
+"""
+
 ###########################################################################
 ###########################################################################
 ###########################################################################
@@ -35,8 +97,11 @@ class Hasher:
            sequence       : default sorting order
            name           : name of hasher
         Virtual attributes:
-           bids           : bids submitted by hasher
-           successfulBids : hasher's successful bids
+           index          : dense 0..N-1 index assigned in load order by
+                            Hashers() constructor during file read from
+                            hashers.txt
+           bids           : bids submitted by hasher; created on first use
+           successfulBids : hasher's successful bids; created on first use
            order          : sorting order after sortByRandom()
            rank           : sorting order for Bids.sortEquitably(). This
                             rank is based on the product of sequence and
@@ -44,19 +109,32 @@ class Hasher:
            duplicateNameP : boolean predicate indicating if this hasher's
                             name is unique, or if another hasher has the
                             same name
+           group          : group the hasher is to be awarded trails with,
+                            or None; see group.py
+           occupied       : bitset of the conflict groups of the time
+                            slots the hasher has a successful bid in; see
+                            conflict.py
    """
+   __slots__ = ("id", "sequence", "name", "index", "_bids",
+                "_successfulBids", "order", "rank", "duplicateNameP",
+                "group", "occupied")
+
    def __init__(self, id, sequence, name):
-      self.id             = int(id)
-      self.sequence       = int(sequence)
-      self.name           = name.strip()
+      self.id              = int(id)
+      self.sequence        = int(sequence)
+      self.name            = name.strip()
      ###
-      self.bids           = bid_module.Bids() # bids submitted by this hasher
-      self.successfulBids = bid_module.Bids() # successful bids to go on trail
-      self.order          = self.sequence
+      self.index           = None
+      self._bids           = None # bids submitted by this hasher
+      self._successfulBids = None # successful bids to go on trail
+      self.order           = self.sequence
       self.rank           = self.order
       self.duplicateNameP = False # another hasher has same name. this is set
                                   # by Hashers() constructor during file read
                                   # from hashers.txt
+      self.group          = None  # set by Groups() constructor during file
+                                  # read from groups.txt
+      self.occupied       = 0     # no conflict groups occupied
 
 ###################################
 
@@ -65,12 +143,34 @@ class Hasher:
 
 ###########################################################################
 
+   @property
+   def bids(self):
+      """
+      use: Bids submitted by hasher
+      """
+      if (self._bids is None):
+         self._bids = bid_module.Bids()
+      return(self._bids)
+
+###################################
+
+   @property
+   def successfulBids(self):
+      """
+      use: Hasher's successful bids to go on trail
+      """
+      if (self._successfulBids is None):
+         self._successfulBids = bid_module.Bids()
+      return(self._successfulBids)
+
+###################################
+
    @property
    def bidCount(self):
       """
       use: Number of bids submitted by hasher
       """
-      return(self.bids.count)
+      return(self._bids.count if self._bids is not None else 0)
 
 ###################################
 
@@ -79,7 +179,7 @@ class Hasher:
       """
       use: Sum of values for all bids submitted by hasher
       """
-      return(self.bids.value)
+      return(self._bids.value if self._bids is not None else 0)
 
 ###################################
 
@@ -88,27 +188,39 @@ class Hasher:
       """
       use: Number of bids submitted by hasher that were successful
       """
-      return(self.successfulBids.count)
+      return(self._successfulBids.count
+             if self._successfulBids is not None else 0)
+
+###################################
+
+   @property
+   def outcome(self):
+      """
+      use: Overall outcome of hasher's bids; one of "no bid",
+           "unsuccessful", or "successful"
+      pre: runBid() processing must be completed
+      """
+      if (self.bidCount == 0):
+         return("no bid")
+      elif (self.successfulBidCount == 0):
+         return("unsuccessful")
+      return("successful")
 
 ###########################################################################
 
    def addBid(self, bid):
       """
       use: Add a bid to the list of bids submitted by hasher
-      imp: If the new bid value causes the sum of bid values for the time
-           slot to exceed the bidAllowance, a warning message will be
-           printed but otherwise nothing adverse will occur
+      imp: The bidAllowance is not checked here; bids are validated
+           against it as a whole when they are loaded. See validate.py.
+           A second bid for the same trail is found by looking the trail
+           up in our bids' trailBids dictionary rather than by scanning
+           our list of bids
       """
-      if (bid not in self.bids.list):
+      if (bid.trail.id not in self.bids.trailBids):
          if ((bid.timeSlot    is not None) and
              (bid.timeSlot.id is not None)):
-            oldBidValue = self.bids.valueByTimeSlotId(bid.timeSlot.id)
             self.bids.add(bid)
-            newBidValue  = self.bids.valueByTimeSlotId(bid.timeSlot.id)
-            bidAllowance = int(settings["bidAllowance"])
-            if ((oldBidValue <= bidAllowance) and
-                (newBidValue  > bidAllowance)):
-                print(f"*** {str(self)}: exceeded bid allowance")
          else:
                                 # a bid's timeSlot goes through the bid's
                                 # timeSlot
@@ -129,6 +241,24 @@ class Hasher:
            hasher's list of winning bids
       """
       self.successfulBids.add(bid)
+      self.occupied |= bid.timeSlot.conflicts
+
+###########################################################################
+
+   def removeSuccessfulBid(self, bid):
+      """
+      use: Remove a winning bid, as when its trail is cancelled; see
+           attendance.py
+      pre: bid must be our most recent winning bid
+      imp: Time slots may share conflict groups, so the groups occupied
+           are gathered again from our remaining winning bids
+      """
+      last = self.successfulBids.pop()
+      assert (last is bid), \
+         "Hasher.removeSuccessfulBid() requires the most recent winning bid"
+      self.occupied = 0
+      for bid in self.successfulBids:
+         self.occupied |= bid.timeSlot.conflicts
 
 ###########################################################################
 
@@ -146,17 +276,38 @@ class Hasher:
       """
       use: Print explanation of outcome of bids submitted by hasher
       """
-      print(str(self))
+      print("\n".join(self.explanation()))
+
+###################################
+
+   def explanation(self):
+      """
+      use: Explanation of outcome of bids submitted by hasher
+      post: Return value is a list of lines, without newlines, as printed
+            by explain(). Each bid's line shows the trail's highest and
+            lowest winning bids, the hasher's bid and its outcome, and
+            the trail's cut-offs at 50%, 75%, and full capacity from its
+            price curve. A trail with no winning bids shows "-" for its
+            highest and lowest winning bids, and a trail cancelled for
+            falling short of its minimum attendance is shown as such; see
+            attendance.py
+      """
+      lines = [str(self)]
       self.bids.sortByTrail()
       timeSlot = None
       for bid in self.bids:
          if (bid.timeSlot != timeSlot):
-            print(f"  {bid.timeSlot.name}")
+            lines.append(f"  {bid.timeSlot.name}")
             timeSlot = bid.timeSlot
-         (loBid, hiBid) = bid.trail.successfulBookendValues
+         curve          = bid.trail.priceCurve
+         (loBid, hiBid) = curve[-2:]
          wonTrail       = self.successfulBids.getBidsByTrailId(bid.trail.id)
          if (wonTrail.count > 0):
             outcome = "* WIN *"
+         elif (bid.trail.cancelled):
+            outcome = "Cancelled (min)"
+         elif (loBid is None):
+            outcome = "No winners"
          else:
             if (bid.value == loBid):
                outcome = "Lost tie-breaker"
@@ -166,13 +317,32 @@ class Hasher:
                if (trails.count > 0):
                   trail = trails[0]
                   outcome = f"Adequate: {trail.id}"
+               elif (self.isConflicting(bid.timeSlot)):
+                  outcome = "Conflicting"
                else:
                   outcome = "Loss unexpected"
             else:
                outcome = "Lost"
-         print(f"    {bid.trail.pretty()}"
-               f" {hiBid:>5d}~{loBid:<5d} | {bid.value:>5d}"
-               f" {outcome}")
+         cutoffs = curve[:len(trail_module.priceCurveFills)]
+         winners = (f"{'-':>5}~{'-':<5}" if loBid is None else
+                    f"{hiBid:>5d}~{loBid:<5d}")
+         lines.append(f"    {bid.trail.pretty()}"
+                      f" {winners} | {bid.value:>5d}"
+                      f" {outcome:<16} | " +
+                      "/".join("-" if cutoff is None else str(cutoff)
+                               for cutoff in cutoffs))
+      return(lines)
+
+###########################################################################
+
+   def isConflicting(self, timeSlot):
+      """
+      use: Predicate indicating if hasher has a winning bid for a trail in
+           the passed timeSlot, or in a time slot conflicting with it, and
+           so can not be awarded a trail in it
+      post: Return value is a boolean
+      """
+      return((self.occupied & timeSlot.conflicts) != 0)
 
 ###########################################################################
 
@@ -184,7 +354,9 @@ class Hasher:
            trail within the time slot
       post: Return value is a boolean
       """
-      return(self.successfulBids.getTrailsByTimeSlotId(timeSlotId).count != 0)
+      return((self._successfulBids is not None) and
+             (self.successfulBids.getTrailsByTimeSlotId(timeSlotId).count
+              != 0))
 
 ###########################################################################
 
@@ -229,7 +401,9 @@ class Hasher:
                               detail    =  0)
       params[self.__class__.__name__] = self
 
-      hasherName = self.displayName(params["hasherNameStyle"])
+      bid        = params["Bid"]
+      tag        = f" ({bid.tag})" if ((bid is not None) and bid.tag) else ""
+      hasherName = self.displayName(params["hasherNameStyle"]) + tag
       if (params["outputFormat"] == "roster"):
          params["outputFile"].writelines(
             ["   <td>&nbsp;&EmptySmallSquare;&nbsp;&nbsp;&nbsp;" +
@@ -240,15 +414,13 @@ class Hasher:
          params["outputFile"].write(f"   <td>{hasherName}</td>\n")
       elif (params["outputFormat"] is None):
          bidValue = None
-         if (params["detail"] >= 1):
-            bid = params["Bid"]
-            if (bid is not None):
-               bidValue = bid.value
+         if ((params["detail"] >= 1) and (bid is not None)):
+            bidValue = bid.value
          if (bidValue is None):
-            print(f"{'':>{max(params['indent'], 0)}}{self.pretty()}")
+            print(f"{'':>{max(params['indent'], 0)}}{self.pretty()}{tag}")
          else:
             print(f"{'':>{max(params['indent'], 0)}}"
-                  f"{self.pretty()} ~ {bidValue:>4d}")
+                  f"{self.pretty()} ~ {bidValue:>4d}{tag}")
       else:
          sys.stderr.write(f"{selfName}: Hasher.print(): "
                           f" unknown output format: "
@@ -272,8 +444,8 @@ class Hasher:
       if (not (wantNoBid or wantSuccessfulBid or wantUnsuccessfulBid)):
           wantSuccessfulBid = wantUnsuccessfulBid = wantNoBid = True
 
-      hasBid             = (self.bids.count           != 0)
-      hasSuccessfulBid   = (self.successfulBids.count != 0)
+      hasBid             = (self.bidCount           != 0)
+      hasSuccessfulBid   = (self.successfulBidCount != 0)
       hasUnsuccessfulBid = ((hasBid != 0) and (hasSuccessfulBid == 0))
 
       printNegative = (wantSuccessfulBid or
@@ -300,6 +472,23 @@ class Hasher:
             else:
                self.successfulBids.printTrails(**params())
             params["outputFile"].write("   </td>\n")
+         elif (params["outputFormat"] == "json"):
+                                # the shard is written out by
+                                # Hashers.printResultByHasher()
+            result = {"id": self.id, "name": hasherName}
+            if (not hasBid):
+               if (printNegative):
+                  result["outcome"] = "no bid"
+            elif (hasUnsuccessfulBid):
+               if (printNegative):
+                  result["outcome"] = "unsuccessful"
+            else:
+               self.successfulBids.sortByTrail()
+               result["outcome"] = "successful"
+               result["trails"]  = [[bid.timeSlot.name, bid.trail.id,
+                                     bid.trail.name]
+                                    for bid in self.successfulBids]
+            params["shard"][str(self.id)] = result
          elif (params["outputFormat"] is None):
             self.printHasher(**params())
 
@@ -343,48 +532,51 @@ class Hasher:
 
 class Hashers:
    def __init__(self, filespec = None):
+      """
+      usage: Optionally pass an event directory name, a hashers.txt
+             filespec, or an Ingest object already parsed by parseFile()
+      """
       self.list          = []
       self.lookupIDs     = {}
       self.selfDirectory = None
 
       if (filespec is not None):
-         if (os.path.isdir(filespec)):
+         if (isinstance(filespec, Ingest)):
+            settings["hashersDirectory"] = os.path.dirname(filespec.filespec)
+         elif (os.path.isdir(filespec)):
             settings["hashersDirectory"] = filespec
             filespec = os.path.join(filespec, "hashers.txt")
-
-         with open(filespec, "r") as csvfile:
-            lineNumber = 0
-            csvReader  = csv.reader(csvfile)
-            if (csv.Sniffer().has_header(open(csvfile.name).read(1024))):
-               lineNumber += 1
-               next(csvReader)
-            for row in csv.reader(csvfile):
-               lineNumber += 1
-               if (len(row) != 0):
-                  try:
-                     hasher = Hasher(int(row[0]), row[1], row[2])
-                     self.add(hasher)
-                     if (settings["verbosity"] >= 3):
-                        print(str(hasher))
-                  except DuplicateError as exception:
-                     if isinstance(exception, DuplicateError):
-                        exception = "duplicate hasher ID"
-                     writeFileReadError(filespec, lineNumber, exception,
-                                        f"{row[0]}, {row[1]}")
-                     printFileReadError(lineNumber, f"{row[0]}, {row[1]}")
+         else:
+            settings["hashersDirectory"] = os.path.dirname(filespec)
+
+         ingest = toIngest(filespec, hashersSchema)
+         for (lineNumber, row) in ingest:
+            try:
+               hasher       = Hasher(*row)
+               hasher.index = self.count
+               self.add(hasher)
+               if (settings["verbosity"] >= 3):
+                  print(str(hasher))
+            except DuplicateError as exception:
+               if isinstance(exception, DuplicateError):
+                  exception = "duplicate hasher ID"
+               writeFileReadError(ingest.filespec, lineNumber, exception,
+                                  f"{row[0]}, {row[1]}")
+               printFileReadError(lineNumber, f"{row[0]}, {row[1]}")
+         ingest.check()
                                 # disambiguify names if multiple hashers
                                 # have same names
-            self.sortByName()
-            if (len(self.list) >= 2):
-               lastHasher = self.list[0]
-               for thisHasher in self.list[1:]:
-                  if (lastHasher.name.upper() == thisHasher.name.upper()):
-                     lastHasher.duplicateNameP = True
-                     thisHasher.duplicateNameP = True
-                  lastHasher = thisHasher
-
-            if (settings["verbosity"] < 3):
-               print(f"{self.count} {plural(self.count, 'hasher')}")
+         self.sortByName()
+         if (len(self.list) >= 2):
+            lastHasher = self.list[0]
+            for thisHasher in self.list[1:]:
+               if (lastHasher.name.upper() == thisHasher.name.upper()):
+                  lastHasher.duplicateNameP = True
+                  thisHasher.duplicateNameP = True
+               lastHasher = thisHasher
+
+         if (settings["verbosity"] < 3):
+            print(f"{self.count} {plural(self.count, 'hasher')}")
 
 ###################################
 
@@ -517,6 +709,8 @@ class Hashers:
              "</html>\n"])
          params["outputFile"].close()
          params["outputFile"] = None
+      elif (params["outputFormat"] == "json"):
+         self.printResultByHasherShards(**params())
       elif (params["outputFormat"] is None):
          self.sortByName()
          for hasher in self.list:
@@ -526,6 +720,73 @@ class Hashers:
                           f" unknown output format: "
                           f"{params['outputFormat']}\n")
 
+###########################################################################
+
+   def printResultByHasherShards(self, **kwargs):
+      """
+      use: Write the result of every hasher into small JSON shard files
+           for lookup from the event website, so that a phone only needs
+           to fetch the shard holding the hasher it is looking for
+      usage: Called by printResultByHasher() for outputFormat json.
+             Optionally pass shardSize as the span of hasher IDs per shard
+      imp: Files written into the html/hasher-result directory:
+              index.json       : [[hasherName, hasherID], ...] sorted by
+                                 name, for name lookup
+              shard-N.json     : {hasherID: result} for hashers whose
+                                 ID // shardSize is N
+           The static page hasher-lookup.html, which fetches index.json
+           and then only the shard it needs, is written into the html
+           directory
+           Hashers are visited in ID order so that only one shard is held
+           in memory at a time
+      pre: runBid() processing must be completed
+      """
+      params = Params(kwargs, shardSize = 100)
+      params[self.__class__.__name__] = self
+
+      outputDirectory = os.path.join(settings["eventDirectory"], "html")
+      if (not os.path.isdir(outputDirectory)):
+         os.mkdir(outputDirectory)
+      shardDirectory = os.path.join(outputDirectory, "hasher-result")
+      if (not os.path.isdir(shardDirectory)):
+         os.mkdir(shardDirectory)
+
+      def writeShard(shardNumber, shard):
+         filespec = os.path.join(shardDirectory, f"shard-{shardNumber}.json")
+         with open(filespec, "w") as shardFile:
+            json.dump(shard, shardFile, separators = (",", ":"))
+
+      shardSize   = int(params["shardSize"])
+      shardNumber = None
+      shards      = 0
+      index       = []
+      self.sortById()
+      for hasher in self.list:
+         if (hasher.id // shardSize != shardNumber):
+            if (shardNumber is not None):
+               writeShard(shardNumber, params["shard"])
+               shards += 1
+            shardNumber     = hasher.id // shardSize
+            params["shard"] = {}
+         hasher.printResultByHasher(**params())
+         if (str(hasher.id) in params["shard"]):
+            index.append([params["shard"][str(hasher.id)]["name"],
+                          hasher.id])
+      if (shardNumber is not None):
+         writeShard(shardNumber, params["shard"])
+         shards += 1
+      params["shard"] = None
+
+      index.sort(key = lambda entry:(entry[0].upper(), entry[1]))
+      with open(os.path.join(shardDirectory, "index.json"), "w") as indexFile:
+         json.dump({"shardSize": shardSize, "hashers": index}, indexFile,
+                   separators = (",", ":"))
+
+      with open(os.path.join(outputDirectory, "hasher-lookup.html"),
+                "w") as outputFile:
+         outputFile.write(hasherLookupPage)
+      print(f"{shardDirectory}: {shards} {plural(shards, 'shard')}")
+
 ###########################################################################
 
    def sortById(self):
@@ -611,25 +872,18 @@ class Hashers:
                                 # random.shuffle(). so instead of
                                 # re-randomizing the hashers, we'll just
                                 # read the order back in again
-         with open(filespec, "r") as csvfile:
-            print(f"Restore hasher sort order from {filespec}")
-            lineNumber = 0
-            csvReader  = csv.reader(csvfile)
-            if (csv.Sniffer().has_header(open(csvfile.name).read(1024))):
-               lineNumber += 1
-               next(csvReader)
-            for row in csv.reader(csvfile):
-               lineNumber += 1
-               if (len(row) != 0):
-                  hasherId = int(row[0])
-                  hasher   = self.getById(hasherId)
-                  if (hasher is not None):
-                     hasher.order = int(row[1])
-                     hasher.rank  = (hasher.sequence * hasher.order)
-                  else:
-                     printFileReadError(
-                        lineNumber,
-                        f"{filespec}: hasher not found: {hasherId}")
+         print(f"Restore hasher sort order from {filespec}")
+         ingest = Ingest(filespec, orderSchema)
+         for (lineNumber, (hasherId, order)) in ingest:
+            hasher = self.getById(hasherId)
+            if (hasher is not None):
+               hasher.order = order
+               hasher.rank  = (hasher.sequence * hasher.order)
+            else:
+               printFileReadError(
+                  lineNumber,
+                  f"{filespec}: hasher not found: {hasherId}")
+         ingest.check()
       else:
          print("Sort hasher order randomly")
                                 # we don't have existing data for
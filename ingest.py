@@ -0,0 +1,358 @@
+# name: $Id: ingest.py 1 13:21:05 19-Oct-2026 s01rz $
+"""
+use: Shared reader for the CSV data files in the event directory. Every
+     file has a declared schema of its fields and their types, so rows are
+     converted in batches, a header row is recognized by the schema rather
+     than guessed at by csv.Sniffer, and every malformed row in a file is
+     reported in a single pass instead of stopping at the first one
+usage: Typically:
+          ingest = Ingest(filespec, trailsSchema)
+          for (lineNumber, row) in ingest:
+             ... row is a tuple of converted field values ...
+          ingest.check()
+       For large files, the parse stage can be run in another process by
+       parseFile(), and the parsed Ingest object iterated in the same way
+"""
+
+import array
+import csv
+import gzip
+import itertools
+
+from resource import *
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### f i e l d
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class Field:
+   """
+   use: One column of a CSV data file
+   imp: type is int or str; str values are stripped of whitespace. An
+        optional field (required = False) may be missing or blank, in
+        which case its value is default
+   """
+   def __init__(self, name, type = int, required = True, default = None):
+      self.name     = name
+      self.type     = type
+      self.required = required
+      self.default  = default
+      if (not required):
+         self.convert = self.convertOptional
+      elif (type is str):
+         self.convert = str.strip
+      else:
+         self.convert = type
+
+###################################
+
+   def convertOptional(self, value):
+      """
+      use: Conversion of a value for an optional field
+      """
+      if ((value is None) or (value.strip() == "")):
+         return(self.default)
+      return(value.strip() if self.type is str else self.type(value))
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### s c h e m a
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class Schema:
+   """
+   use: The declared layout of a CSV data file
+   imp: The first non-blank row of a file is a header if none of the
+        schema's int fields in that row hold an integer
+   """
+   def __init__(self, filename, *fields):
+      self.filename = filename
+      self.fields   = fields
+      self.required = sum(1 for field in fields if field.required)
+
+###################################
+
+   def __str__(self):
+      return(f"{self.filename}: "
+             f"{', '.join(field.name for field in self.fields)}")
+
+###########################################################################
+
+   def isHeader(self, row):
+      """
+      use: Predicate indicating if the passed row is a header row
+      """
+      for (field, value) in zip(self.fields, row):
+         if (field.type is int):
+            try:
+               int(value)
+               return(False)
+            except ValueError:
+               pass
+      return(True)
+
+###########################################################################
+
+timeSlotsSchema  = Schema("timeSlots.txt",
+                          Field("timeSlotID"),
+                          Field("sequence"),
+                          Field("trailGroupName", str))
+trailsSchema     = Schema("trails.txt",
+                          Field("trailID"),
+                          Field("sequence"),
+                          Field("trailName", str),
+                          Field("trailCapacity"),
+                          Field("minimumAttendance", required = False,
+                                default = 0))
+trailTimesSchema = Schema("trailTimes.txt",
+                          Field("timeSlotID"),
+                          Field("trailID"))
+hashersSchema    = Schema("hashers.txt",
+                          Field("hasherID"),
+                          Field("sequence"),
+                          Field("hasherName", str))
+bidsSchema       = Schema("bids.txt",
+                          Field("hasherID"),
+                          Field("trailID"),
+                          Field("bidAmount"))
+bidLogSchema     = Schema("bids.log",
+                          Field("hasherID"),
+                          Field("trailID"),
+                          Field("bidAmount"))
+groupsSchema     = Schema("groups.txt",
+                          Field("groupID"),
+                          Field("hasherID"))
+capacityPoolsSchema = Schema("capacityPools.txt",
+                             Field("poolID"),
+                             Field("poolName", str),
+                             Field("capacity"),
+                             Field("parentPoolID", required = False))
+poolTrailsSchema    = Schema("poolTrails.txt",
+                             Field("poolID"),
+                             Field("trailID"))
+conflictsSchema  = Schema("conflicts.txt",
+                          Field("conflictID"),
+                          Field("timeSlotID"))
+orderSchema      = Schema("00-orderOfHashers.txt",
+                          Field("hasherID"),
+                          Field("order"))
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### i n g e s t
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class Ingest:
+   """
+   use: Iterable reader of a CSV data file according to a schema
+   imp: The file is opened once, and read in batches of batchSize rows.
+        Each batch is converted a column at a time; only a column that
+        fails to convert is re-converted value by value to find and
+        record its bad rows. Rows with errors are not yielded, and the
+        errors are kept in our errors list for check().
+        After parse(), the converted rows are held as columns, with int
+        columns packed into arrays, so that a parsed Ingest is cheap to
+        hand back from a worker process and iterating over it no longer
+        reads the file
+   """
+   def __init__(self, filespec, schema, batchSize = 10000):
+      if (os.path.isdir(filespec)):
+         filespec = os.path.join(filespec, schema.filename)
+      self.filespec    = filespec
+      self.schema      = schema
+      self.batchSize   = batchSize
+      self.errors      = [] # list of (lineNumber, message, data) tuples
+      self.columns     = None # converted columns after parse()
+      self.lineNumbers = None # line numbers of the rows after parse()
+
+###################################
+
+   def __iter__(self):
+      """
+      post: Yields (lineNumber, row) tuples, where row is a tuple of
+            converted values in the order of the schema's fields
+      """
+      if (self.columns is not None):
+         yield from zip(self.lineNumbers, zip(*self.columns))
+      else:
+         for (lineNumbers, columns) in self.batches():
+            yield from zip(lineNumbers, zip(*columns))
+
+###################################
+
+   def __len__(self):
+      """
+      use: Number of rows read, once parse() is done
+      """
+      return(len(self.lineNumbers) if self.lineNumbers is not None else 0)
+
+###########################################################################
+
+   def batches(self):
+      """
+      use: Read and convert our file a batch at a time
+      post: Yields (lineNumbers, columns) tuples, where columns is a list
+            of converted values for each of the schema's fields
+      imp: Each CSV row is assumed to be on a line of its own, as it is in
+           all the event directory files, so the line number of a row is
+           its position in its batch. A batch without blank lines, short
+           rows, or a header goes straight to convert()
+      """
+      fieldCount = len(self.schema.fields)
+      headerP    = None # None until the first non-blank row is seen
+      lineNumber = 0    # line number of the last row read
+      with openText(self.filespec) as csvfile:
+         csvReader = csv.reader(csvfile, skipinitialspace = True)
+         while (True):
+            rows = list(itertools.islice(csvReader, self.batchSize))
+            if (len(rows) == 0):
+               break
+            firstLine   = lineNumber + 1
+            lineNumber += len(rows)
+            if ((headerP is not None) and
+                (set(map(len, rows)) == {fieldCount})):
+               yield(self.convert(rows, range(firstLine, lineNumber + 1)))
+               continue
+
+            batch       = []
+            lineNumbers = []
+            for (index, row) in enumerate(rows):
+               if ((len(row) == 0) or
+                   ((len(row) == 1) and (row[0].strip() == ""))):
+                  continue
+               if (headerP is None):
+                  headerP = self.schema.isHeader(row)
+                  if (headerP):
+                     continue
+               if (len(row) < self.schema.required):
+                  self.errors.append((firstLine + index,
+                                      f"expected {self.schema.required} "
+                                      f"fields",
+                                      ", ".join(row)))
+                  continue
+               if (len(row) < fieldCount):
+                  row = row + [None] * (fieldCount - len(row))
+               batch.append(row[:fieldCount])
+               lineNumbers.append(firstLine + index)
+            if (len(batch) != 0):
+               yield(self.convert(batch, lineNumbers))
+
+###########################################################################
+
+   def check(self):
+      """
+      use: Report all errors found while reading the file
+      post: If there were errors, they are all written, and an IngestError
+            is raised
+      """
+      for (lineNumber, message, data) in self.errors:
+         writeFileReadError(self.filespec, lineNumber, message, data)
+         printFileReadError(lineNumber, data)
+      if (len(self.errors) != 0):
+         raise IngestError(f"\n"
+                  f"   {len(self.errors)} "
+                  f"{plural(len(self.errors), 'error')} reading\n"
+                  f"   >>> {self.filespec}")
+
+###########################################################################
+
+   def convert(self, batch, lineNumbers):
+      """
+      use: Convert a batch of raw rows into typed columns
+      post: Return value is a (lineNumbers, columns) tuple with the rows
+            that had errors left out
+      """
+      columns = []
+      badRows = set()
+      for (field, column) in zip(self.schema.fields, zip(*batch)):
+         try:
+            columns.append(list(map(field.convert, column)))
+         except (ValueError, TypeError, AttributeError):
+            values = []
+            for (index, value) in enumerate(column):
+               try:
+                  values.append(field.convert(value))
+               except (ValueError, TypeError, AttributeError):
+                  values.append(None)
+                  badRows.add(index)
+                  self.errors.append((lineNumbers[index],
+                                      f"bad {field.name}: {value}",
+                                      ", ".join(item or ""
+                                                for item in batch[index])))
+            columns.append(values)
+      if (len(badRows) != 0):
+         keep        = [index for index in range(len(lineNumbers))
+                              if index not in badRows]
+         lineNumbers = [lineNumbers[index] for index in keep]
+         columns     = [[column[index] for index in keep]
+                        for column in columns]
+      return((lineNumbers, columns))
+
+###########################################################################
+
+   def parse(self):
+      """
+      use: Read and convert the whole file, holding the rows as columns
+      usage: Typically called by parseFile() in a worker process
+      post: Return value is self, for handing back from a worker
+      """
+      self.lineNumbers = array.array("q")
+      self.columns     = [array.array("q") if ((field.type is int) and
+                                               field.required) else []
+                          for field in self.schema.fields]
+      for (lineNumbers, columns) in self.batches():
+         self.lineNumbers.extend(lineNumbers)
+         for (column, values) in zip(self.columns, columns):
+            column.extend(values)
+      return(self)
+
+###########################################################################
+
+def openText(filespec):
+   """
+   use: Open a data file for reading as text
+   usage: A filespec ending in .gz is read through gzip, so that exports
+          can be loaded without being uncompressed first
+   """
+   if (str(filespec).endswith(".gz")):
+      return(gzip.open(filespec, "rt", newline = ""))
+   return(open(filespec, "r", newline = ""))
+
+###########################################################################
+
+def parseFile(filespec, schema):
+   """
+   use: Parse stage of loading a data file, suitable for submitting to a
+        concurrent.futures process pool
+   post: Return value is a parsed Ingest object
+   """
+   return(Ingest(filespec, schema).parse())
+
+###########################################################################
+
+def toIngest(filespec, schema):
+   """
+   use: The Ingest object for a loader's filespec argument
+   usage: filespec is a data filespec, an event directory, or an Ingest
+          object already parsed by parseFile()
+   """
+   return(filespec if isinstance(filespec, Ingest) else
+          Ingest(filespec, schema))
+
+###########################################################################
@@ -0,0 +1,427 @@
+# name: $Id: intake.py 1 15:12:44 19-Oct-2026 s01rz $
+"""
+use: Bid intake service. Accepts bid submissions while bidding is open,
+     checks them against the event's hashers, trails, and bidAllowance,
+     and appends accepted bids to a log from which bids.txt is exported
+     once bidding closes
+usage: For help:
+          python intake.py -h
+       Submissions are lines of "hasherID, trailID, bidAmount" sent to
+       the intake port on localhost, eg:
+          echo "1234, 51, 400" | nc localhost 8081
+       and each line is answered with an "accepted" or "rejected" line.
+       A later bid by a hasher for the same trail replaces their earlier
+       bid, and a bidAmount of 0 withdraws it.
+       While bids are taken, the provisional cut-off bound of every trail,
+       an upper bound on its clearing bid, is published to
+       html/trail-cutoff.json in the event directory; see standings.py
+imp: Bids are checked against in-memory running totals of bid value per
+     hasher per time slot, so checking a bid does not depend on how many
+     bids have been taken. Accepted bids are appended to bids.log in the
+     event directory in the format of bids.txt. Appends are group
+     committed: a submission is answered only after its line is written
+     and fsync'ed, and while one batch is being written, the submissions
+     arriving in the meantime queue up to be written and fsync'ed together
+     as the next batch. bids.log is replayed on start, so the intake can
+     be restarted without losing bids. A bid is checked and applied to the
+     running totals as it arrives, so later submissions are checked
+     against it; if its batch can not be written, it is reverted, along
+     with every bid accepted after it, and none of them are answered as
+     accepted
+"""
+import asyncio
+import getopt
+import sys
+
+from pprint import pprint
+
+from compact   import *
+from ingest    import *
+from resource  import *
+from setting   import *
+
+from trail     import *
+from timeSlot  import *
+from trailTime import *
+from hasher    import *
+from standings import *
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### b i d    i n t a k e
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class BidIntake:
+   """
+   use: Running state of bidding: the current bid of every hasher for
+        every trail, and the bid log
+   imp: Attributes:
+           bids     : dictionary of current bid values keyed on
+                      (hasherID, trailID)
+           totals   : dictionary of bid value totals keyed on
+                      (hasherID, timeSlotID)
+           listeners: callables notified of every accepted bid as
+                      listener(hasher, trail, oldValue, value)
+           pending  : list of (line, future, change) not yet written to
+                      the log, where change is the (hasherID, trailID,
+                      oldValue, value) to revert if the write fails
+   """
+   def __init__(self, eventDirectory, hashers, trails, logFilespec = None,
+                listeners = None):
+      """
+      usage: Pass the event directory, and the loaded Hashers and Trails,
+             with trails joined to their time slots. listeners are
+             notified of the bids replayed from the log as well as of
+             those taken afterwards
+      """
+      if (logFilespec is None):
+         logFilespec = os.path.join(eventDirectory, bidLogSchema.filename)
+      self.eventDirectory = eventDirectory
+      self.hashers        = hashers
+      self.trails         = trails
+      self.logFilespec    = logFilespec
+      self.bidAllowance   = int(settings["bidAllowance"])
+      self.bids           = {}
+      self.totals         = {}
+      self.listeners      = list(listeners or [])
+      self.pending        = []
+      self.pendingEvent   = None # set when pending becomes non-empty
+      self.writerTask     = None
+      self.closingP       = False
+
+      if (os.path.isfile(logFilespec)):
+         self.replay()
+      self.logFile = open(logFilespec, "a")
+
+###########################################################################
+
+   def accept(self, hasherId, trailId, value):
+      """
+      use: Check a bid, and if it is acceptable, make it the hasher's
+           current bid for the trail
+      post: Return value is None if the bid was accepted, otherwise a
+            message giving the reason it was rejected
+      imp: The bid is not written to the log; see submit(), which
+           reverts the bid if it can not be logged
+      """
+      hasher = self.hashers.getById(hasherId)
+      if (hasher is None):
+         return(f"no hasher {hasherId}")
+      trail = self.trails.getById(trailId)
+      if (trail is None):
+         return(f"no trail {trailId}")
+      if (trail.timeSlot is None):
+         return(f"trail {trailId} has no time slot")
+      if (value < 0):
+         return(f"negative bid {value}")
+
+      key      = (hasher.id, trail.id)
+      totalKey = (hasher.id, trail.timeSlot.id)
+      oldValue = self.bids.get(key, 0)
+      total    = self.totals.get(totalKey, 0) - oldValue + value
+      if ((total > self.bidAllowance) and (value > oldValue)):
+         return(f"{total} exceeds bid allowance of {self.bidAllowance} "
+                f"for {trail.timeSlot.name}")
+
+      if (value == 0):
+         self.bids.pop(key, None)
+      else:
+         self.bids[key] = value
+      self.totals[totalKey] = total
+      for listener in self.listeners:
+         listener(hasher, trail, oldValue, value)
+      return(None)
+
+###########################################################################
+
+   async def close(self):
+      """
+      use: Write any pending bids, and close the log
+      """
+      if (self.writerTask is not None):
+         self.closingP = True
+         self.pendingEvent.set()
+         await self.writerTask
+         self.writerTask = None
+      self.logFile.close()
+
+###########################################################################
+
+   def exportBids(self, filespec = None):
+      """
+      use: Write the current bids in the format of bids.txt
+      usage: If filespec is not passed, bids.txt in the event directory is
+             written
+      post: Return value is the number of bids written
+      """
+      if (filespec is None):
+         filespec = os.path.join(self.eventDirectory, bidsSchema.filename)
+      return(writeBids(filespec, self.bids))
+
+###########################################################################
+
+   async def handleConnection(self, reader, writer):
+      """
+      use: Answer each line of "hasherID, trailID, bidAmount" from a
+           connection until it is closed
+      """
+      try:
+         while (True):
+            line = await reader.readline()
+            if (len(line) == 0):
+               break
+            line = line.decode(errors = "replace").strip()
+            if (line == ""):
+               continue
+            try:
+               (hasherId, trailId, value) = (int(field)
+                                             for field in line.split(","))
+            except ValueError:
+               writer.write(f"rejected: expected hasherID, trailID, "
+                            f"bidAmount: {line}\n".encode())
+            else:
+               message = await self.submit(hasherId, trailId, value)
+               if (message is None):
+                  writer.write(f"accepted: {hasherId}, {trailId}, "
+                               f"{value}\n".encode())
+               else:
+                  writer.write(f"rejected: {message}\n".encode())
+            await writer.drain()
+      finally:
+         writer.close()
+
+###########################################################################
+
+   def replay(self):
+      """
+      use: Restore the current bids from the log
+      imp: Entries that are no longer acceptable, such as after the
+           bidAllowance has been lowered, are reported and skipped
+      """
+      ingest = Ingest(self.logFilespec, bidLogSchema)
+      count  = 0
+      for (lineNumber, (hasherId, trailId, value)) in ingest:
+         message = self.accept(hasherId, trailId, value)
+         if (message is None):
+            count += 1
+         else:
+            printFileReadError(lineNumber, message)
+      ingest.check()
+      print(f"{self.logFilespec}: {count} {plural(count, 'bid')} replayed")
+
+###########################################################################
+
+   def revert(self, hasherId, trailId, oldValue, value):
+      """
+      use: Undo an accepted bid whose log write failed, restoring the
+           hasher's previous bid for the trail
+      pre: Bids accepted after this one must be reverted first
+      """
+      hasher   = self.hashers.getById(hasherId)
+      trail    = self.trails.getById(trailId)
+      key      = (hasher.id, trail.id)
+      totalKey = (hasher.id, trail.timeSlot.id)
+      if (oldValue == 0):
+         self.bids.pop(key, None)
+      else:
+         self.bids[key] = oldValue
+      self.totals[totalKey] -= value - oldValue
+      for listener in self.listeners:
+         listener(hasher, trail, value, oldValue)
+
+###########################################################################
+
+   async def serve(self, port, host = "127.0.0.1"):
+      """
+      use: Take bid submissions on port until cancelled
+      """
+      server = await asyncio.start_server(self.handleConnection, host, port)
+      print(f"taking bids on {host}:{server.sockets[0].getsockname()[1]}")
+      try:
+         async with server:
+            await server.serve_forever()
+      finally:
+         await self.close()
+
+###########################################################################
+
+   async def submit(self, hasherId, trailId, value):
+      """
+      use: Check a bid, and if it is accepted, log it
+      post: Return value is None once the accepted bid is durably in the
+            log, otherwise a message giving the reason it was rejected.
+            If the log can not be written, the bid is reverted and the
+            OSError raised
+      """
+      oldValue = self.bids.get((hasherId, trailId), 0)
+      message  = self.accept(hasherId, trailId, value)
+      if (message is not None):
+         return(message)
+
+      if (self.writerTask is None):
+         self.pendingEvent = asyncio.Event()
+         self.writerTask   = asyncio.create_task(self.write())
+      future = asyncio.get_running_loop().create_future()
+      self.pending.append((f"{hasherId}, {trailId}, {value}\n", future,
+                           (hasherId, trailId, oldValue, value)))
+      self.pendingEvent.set()
+      await future
+      return(None)
+
+###########################################################################
+
+   async def write(self):
+      """
+      use: Write pending bids to the log a batch at a time, until
+           close()
+      imp: The write and fsync of a batch are done in a worker thread so
+           that submissions keep being checked and queued meanwhile. Those
+           were checked against the batch's bids, so when the batch fails
+           they fail with it, and all are reverted, newest first
+      """
+      loop = asyncio.get_running_loop()
+      while (True):
+         await self.pendingEvent.wait()
+         self.pendingEvent.clear()
+         (batch, self.pending) = (self.pending, [])
+         if (len(batch) != 0):
+            try:
+               await loop.run_in_executor(None, self.writeBatch,
+                                          [line
+                                           for (line, future, change)
+                                           in batch])
+            except OSError as exception:
+               (batch, self.pending) = (batch + self.pending, [])
+               for (line, future, change) in reversed(batch):
+                  self.revert(*change)
+               for (line, future, change) in batch:
+                  future.set_exception(exception)
+            else:
+               for (line, future, change) in batch:
+                  future.set_result(None)
+         if (self.closingP and (len(self.pending) == 0)):
+            break
+
+###################################
+
+   def writeBatch(self, lines):
+      """
+      use: Append lines to the log, and fsync it
+      """
+      self.logFile.writelines(lines)
+      self.logFile.flush()
+      os.fsync(self.logFile.fileno())
+
+###########################################################################
+###########################################################################
+###########################################################################
+
+def loadEvent(eventDirectory):
+   """
+   use: Load the time slots, trails, and hashers of an event for taking
+        bids
+   post: Return value is a (timeSlots, trails, hashers) tuple
+   """
+   timeSlots = TimeSlots(eventDirectory)
+   trails    = Trails(eventDirectory)
+   trailTime(eventDirectory, timeSlots, trails)
+   hashers   = Hashers(eventDirectory)
+   return((timeSlots, trails, hashers))
+
+###########################################################################
+
+async def takeBids(intake, port, standings, timeSlots, feedInterval):
+   """
+   use: Take bids on port, publishing the provisional cut-off bound of
+        every trail to html/trail-cutoff.json in the event directory every
+        feedInterval seconds, until cancelled
+   """
+   outputDirectory = os.path.join(intake.eventDirectory, "html")
+   if (not os.path.isdir(outputDirectory)):
+      os.mkdir(outputDirectory)
+   feed = asyncio.create_task(
+             standings.publishFeed(timeSlots,
+                                   os.path.join(outputDirectory,
+                                                "trail-cutoff.json"),
+                                   feedInterval))
+   try:
+      await intake.serve(port)
+   finally:
+      feed.cancel()
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### m a i n
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+if ( __name__ == "__main__" ):
+   eventDirectory = None
+   port           = 8081
+   feedInterval   = 10
+   exportP        = False
+   opts, args     = getopt.getopt(sys.argv[1:], "c:p:xh")
+
+   for opt in opts:
+      if (opt[0] == "-p"):
+         port = int(opt[1])
+      elif (opt[0] == "-c"):
+         feedInterval = float(opt[1])
+      elif (opt[0] == "-x"):
+         exportP = True
+      elif (opt[0] == "-h"):
+         print(f"usage: {selfName} [options] [directoryName]")
+         print( "where options are:")
+         print(f"   -pNumber port on localhost to take bids on; if not "
+                  f"provided, defaults to {port}")
+         print(f"   -cNumber seconds between updates of the trail cut-off "
+                  f"feed; if not")
+         print(f"            provided, defaults to {feedInterval}")
+         print( "   -x       export bids.log as bids.txt, and exit")
+         print( "   -h       help")
+         print( "If directory name is not provided, it defaults to 'event'")
+         exit(0)
+
+   for arg in args:
+      if (eventDirectory is None):
+         eventDirectory = arg
+      else:
+         sys.stderr.write(f"{selfName}: unwanted extra argument: {arg}\n")
+         exit(1)
+   if (eventDirectory is None):
+      eventDirectory = "event"
+
+   if (not os.path.isdir(eventDirectory)):
+      sys.stderr.write(f"{selfName}: no event directory: {eventDirectory}\n")
+      exit(1)
+
+   settings["eventDirectory"] = eventDirectory
+   settings.readFile(eventDirectory)
+   settings.setDefault("bidAllowance", 100)
+   pprint(settings.dict)
+
+   (timeSlots, trails, hashers) = loadEvent(eventDirectory)
+   standings = Standings()
+   intake    = BidIntake(eventDirectory, hashers, trails,
+                         listeners = [standings.update])
+   if (exportP):
+      count = intake.exportBids()
+      print(f"{os.path.join(eventDirectory, bidsSchema.filename)}: "
+            f"{count} {plural(count, 'bid')}")
+   else:
+      try:
+         asyncio.run(takeBids(intake, port, standings, timeSlots,
+                              feedInterval))
+      except KeyboardInterrupt:
+         print()
+
+###########################################################################
@@ -0,0 +1,103 @@
+# name: $Id: joint.py 1 00:18:06 20-Oct-2026 s01rz $
+"""
+use: Joint allocation of every time slot at once. Allocated one time slot
+     at a time, a hasher's successes only count against them in the time
+     slots allocated after; whoever wins on Friday still competes on level
+     terms for Friday's trails with those who will win nothing all weekend.
+     Allocated jointly, the bids of every time slot are processed together
+     in rounds: every hasher's bids are considered before any hasher's
+     bids after a success, and so on, so hashers with fewer wins so far
+     come first across the whole weekend
+usage: Enabled by jointAllocation in settings.txt, which runs runBid() from
+       TimeSlots.runBid() in place of allocating each time slot in turn.
+       It is not used, with a warning, when any trail has a minimum
+       attendance, as cancelling a trail would reopen every time slot; see
+       attendance.py
+imp: All the bids go in a heap keyed on the hasher's successful bid count
+     when the bid was pushed, then the rest of the key of
+     Bids.sortEquitably(): bid value, highest first, then the hasher's bid
+     count and rank, and the trail's bid count and ID. A hasher's
+     successful bid count only grows, so a bid's key only worsens, and is
+     brought up to date lazily: a bid popped with a stale count is pushed
+     back with the current one, unless it can no longer succeed at all,
+     its trail being full or its hasher's time slot taken, when it is
+     dropped. Every bid popped with a current count is the best bid left,
+     and is processed as by Bid.runBid(). Each award thus costs the
+     O(log n) pushes and pops of its hasher's outstanding bids instead of
+     a re-sort of the remaining bids. The bids of groups are combined into
+     GroupBids for each time slot, as by Bids.runBid(); see group.py
+"""
+import heapq
+
+import group as group_module
+
+from resource import *
+from setting  import *
+
+###########################################################################
+###########################################################################
+###########################################################################
+
+def runBid(timeSlots):
+   """
+   use: Process the bids of every time slot jointly
+   usage: timeSlots is a list of time slots
+   post: Return value is the number of rounds: one more than the most
+         successful bids of any hasher when their last bid was processed
+   """
+   entries = []                 # bids and group bids of every time slot
+   for timeSlot in timeSlots:
+      bids = [bid
+              for trail in timeSlot.trails if (trail.bidCount != 0)
+              for bid in trail.bids]
+      if (any((bid.hasher.group is not None) for bid in bids)):
+         bids = group_module.groupBids(bids)
+      entries.extend(bids)
+
+   heap = [key(entry, position) for (position, entry) in enumerate(entries)]
+   heapq.heapify(heap)
+   rounds = 0
+   while (len(heap) != 0):
+      item   = heapq.heappop(heap)
+      entry  = entries[item[-1]]
+      hasher = entry.hasher
+      wins   = hasher.successfulBidCount
+      if (item[0] != wins):
+         if (not ((entry.trail.vacancies == 0) or
+                  isConflicting(entry))):
+            heapq.heappush(heap, key(entry, item[-1]))
+         continue
+      rounds = max(rounds, wins + 1)
+      entry.runBid()
+   return(rounds)
+
+###########################################################################
+
+def isConflicting(entry):
+   """
+   use: Predicate indicating if a bid's hasher, or any member of a group
+        bid's group, can no longer be awarded a trail in its time slot
+   """
+   timeSlot = entry.trail.timeSlot
+   if (isinstance(entry, group_module.GroupBid)):
+      return(any(bid.hasher.isConflicting(timeSlot) for bid in entry.bids))
+   return(entry.hasher.isConflicting(timeSlot))
+
+###########################################################################
+
+def key(entry, position):
+   """
+   use: Heap item of a bid or group bid
+   post: Return value is the bid's key, followed by position, its place in
+         the list of entries, which also settles ties
+   """
+   hasher = entry.hasher
+   return((hasher.successfulBidCount, # fewer wins so far 1st
+           -entry.value             , # higher bid value 1st
+           hasher.bidCount          , # advantage fewer bids
+           hasher.rank              , # randomized rank
+           entry.trail.bidCount     , # less bidded-on trails
+           entry.trail.id           ,
+           position))
+
+###########################################################################
@@ -0,0 +1,287 @@
+# name: $Id: plan.py 1 16:48:10 19-Oct-2026 s01rz $
+"""
+use: Capacity planning. For each time slot, report how many hashers end
+     up with a trail, how many more each extra seat on a trail would
+     satisfy, and the capacity each trail would need for a target
+     percentage of the time slot's hashers to get a trail
+usage: For help:
+          python plan.py -h
+imp: Within a time slot, the order in which bids are processed comes from
+     Bids.sortEquitably(), which does not depend on trail capacities. The
+     order is therefore sorted once per time slot, and kept as arrays of
+     dense hasher and trail indexes, against which runBid() allocation is
+     simulated for any number of capacity vectors without sorting again
+     or touching Bid objects.
+     Time slots are processed in the same order as TimeSlots.runBid(), and
+     each is allocated with its current capacities before the next time
+     slot is planned, because the successful bid counts that break ties in
+     later time slots come from earlier ones. Planning a time slot thus
+     assumes the current capacities of the time slots before it. For the
+     same reason, the bids of hashers already awarded a trail in a
+     conflicting time slot are left out; see conflict.py.
+     Capacity pools, groups, and minimum attendance are not simulated, so
+     plan.py refuses to run on an event using any of them
+"""
+import array
+import getopt
+import sys
+
+from pprint import pprint
+
+import bid as bid_module
+
+from resource import *
+from setting  import *
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### t i m e    s l o t    p l a n
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class TimeSlotPlan:
+   """
+   use: The sorted bid order of a time slot, and allocation of it under
+        alternative trail capacities
+   imp: Attributes:
+           trails     : the time slot's trails in sequence; a trail's
+                        position is its index in capacity vectors
+           capacities : current capacity of each trail
+           hasherCount: number of distinct hashers bidding
+           hasherOrder: array of hasher indexes of the bids in processing
+                        order
+           trailOrder : array of trail indexes of the bids in processing
+                        order
+           demand     : number of bids for each trail, the most seats a
+                        trail could ever fill
+   """
+   def __init__(self, timeSlot):
+      """
+      pre: Hashers must have been sorted by Hashers.sortByRandom(), and
+           earlier time slots allocated
+      """
+      self.timeSlot   = timeSlot
+      self.trails     = sorted(timeSlot.trails,
+                               key = lambda trail: trail.sequence)
+      self.capacities = [trail.capacity for trail in self.trails]
+      self.bids       = bid_module.Bids()
+      for trail in self.trails:
+         for bid in trail.getBids():
+                                # awarded a time slot conflicting with this
+                                # one, so the bid can never be successful
+            if (not bid.hasher.isConflicting(timeSlot)):
+               self.bids.add(bid)
+      self.bids.sortEquitably()
+
+      trailIndexes     = {trail: index
+                          for (index, trail) in enumerate(self.trails)}
+      hasherIndexes    = {}
+      self.hasherOrder = array.array("l")
+      self.trailOrder  = array.array("l")
+      self.demand      = [0] * len(self.trails)
+      for bid in self.bids:
+         hasherIndex = hasherIndexes.setdefault(bid.hasher,
+                                                len(hasherIndexes))
+         self.hasherOrder.append(hasherIndex)
+         self.trailOrder.append(trailIndexes[bid.trail])
+         self.demand[trailIndexes[bid.trail]] += 1
+      self.hasherCount = len(hasherIndexes)
+
+###########################################################################
+
+   def allocate(self, capacities = None):
+      """
+      use: Simulate runBid() allocation of the time slot
+      usage: capacities is a sequence of capacities in the order of our
+             trails; the current capacities by default
+      post: Return value is a (satisfied, fills) tuple of the number of
+            hashers awarded a trail, and a list of the seats filled on
+            each trail
+      """
+      if (capacities is None):
+         capacities = self.capacities
+      assigned   = bytearray(self.hasherCount)
+      fills      = [0] * len(capacities)
+      satisfied  = 0
+      openTrails = sum(1 for capacity in capacities if capacity > 0)
+      for (hasherIndex, trailIndex) in zip(self.hasherOrder,
+                                           self.trailOrder):
+         if (openTrails == 0):
+            break
+         if ((fills[trailIndex] < capacities[trailIndex]) and
+             (not assigned[hasherIndex])):
+            assigned[hasherIndex]  = 1
+            fills[trailIndex]     += 1
+            satisfied             += 1
+            if (fills[trailIndex] == capacities[trailIndex]):
+               openTrails -= 1
+      return((satisfied, fills))
+
+###################################
+
+   def satisfied(self, capacities = None):
+      """
+      use: Number of hashers awarded a trail under the passed capacities
+      """
+      return(self.allocate(capacities)[0])
+
+###########################################################################
+
+   def commit(self):
+      """
+      use: Allocate the time slot for real with its current capacities, as
+           TimeSlot.runBid() would
+      """
+      for bid in self.bids:
+         bid.runBid()
+
+###########################################################################
+
+   def marginalGains(self, capacities = None):
+      """
+      use: Additional hashers awarded a trail if one trail had one more
+           seat
+      post: Return value is a list of the gain for each of our trails
+      """
+      if (capacities is None):
+         capacities = self.capacities
+      baseline = self.satisfied(capacities)
+      gains    = []
+      for index in range(len(capacities)):
+         more         = list(capacities)
+         more[index] += 1
+         gains.append(self.satisfied(more) - baseline)
+      return(gains)
+
+###########################################################################
+
+   def requiredCapacity(self, trailIndex, target, capacities = None):
+      """
+      use: Least capacity of one trail, with other trails unchanged, for
+           at least target hashers of the time slot to be awarded a trail
+      post: Return value is None if no capacity of that trail alone
+            reaches the target
+      imp: Bisects between 0 and the trail's demand, since seats beyond the
+           trail's number of bids are never filled. Relies on an added seat
+           never reducing the number of hashers satisfied
+      """
+      if (capacities is None):
+         capacities = self.capacities
+      trial = list(capacities)
+      (low, high) = (0, self.demand[trailIndex])
+      trial[trailIndex] = high
+      if (self.satisfied(trial) < target):
+         return(None)
+      while (low < high):
+         trial[trailIndex] = (low + high) // 2
+         if (self.satisfied(trial) >= target):
+            high = trial[trailIndex]
+         else:
+            low  = trial[trailIndex] + 1
+      return(low)
+
+###########################################################################
+
+   def printPlan(self, targetPercent):
+      """
+      use: Print the planning report of the time slot
+      """
+      (satisfied, fills) = self.allocate()
+      target = -(-self.hasherCount * targetPercent // 100)
+      gains  = self.marginalGains()
+      print(self.timeSlot.pretty())
+      print(f"   {satisfied}/{self.hasherCount} "
+            f"{plural(self.hasherCount, 'hasher')} awarded a trail "
+            f"({percent(satisfied, self.hasherCount)}); "
+            f"{targetPercent}% is {target}")
+      print(f"   {'trail':<28} {'bids':>5} {'filled':>9} "
+            f"{'+1 seat':>7} {'needed':>6}")
+      for (index, trail) in enumerate(self.trails):
+         if (satisfied >= target):
+            needed = "-"
+         else:
+            needed = self.requiredCapacity(index, target)
+            needed = "n/a" if needed is None else str(needed)
+         print(f"   {trail.pretty():<28} {self.demand[index]:>5} "
+               f"{fills[index]:>4}/{trail.capacity:<4} "
+               f"{gains[index]:>7} {needed:>6}")
+
+###########################################################################
+###########################################################################
+###########################################################################
+
+def percent(count, total):
+   return(f"{100 * count / total:.1f}%" if total else "-")
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### m a i n
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+if ( __name__ == "__main__" ):
+   from trailBid import TrailBid
+
+   eventDirectory = None
+   targetPercent  = 95
+   opts, args     = getopt.getopt(sys.argv[1:], "t:h")
+
+   for opt in opts:
+      if (opt[0] == "-t"):
+         targetPercent = int(opt[1])
+      elif (opt[0] == "-h"):
+         print(f"usage: {selfName} [options] [directoryName]")
+         print( "where options are:")
+         print(f"   -tNumber target percentage of each time slot's hashers "
+                  f"to be awarded")
+         print(f"            a trail; if not provided, defaults to "
+                  f"{targetPercent}")
+         print( "   -h       help")
+         print( "If directory name is not provided, it defaults to 'event'")
+         exit(0)
+
+   for arg in args:
+      if (eventDirectory is None):
+         eventDirectory = arg
+      else:
+         sys.stderr.write(f"{selfName}: unwanted extra argument: {arg}\n")
+         exit(1)
+   if (eventDirectory is None):
+      eventDirectory = "event"
+
+   if (not os.path.isdir(eventDirectory)):
+      sys.stderr.write(f"{selfName}: no event directory: {eventDirectory}\n")
+      exit(1)
+
+   settings["eventDirectory"] = eventDirectory
+   settings.readFile(eventDirectory)
+   settings.setDefault("bidAllowance", 100)
+   pprint(settings.dict)
+
+   print()
+   trailBid = TrailBid(eventDirectory)
+   if ((trailBid.pools  is not None) or
+       (trailBid.groups is not None) or
+       any((trail.minimumAttendance > 0) for trail in trailBid.trails)):
+      sys.stderr.write(f"{selfName}: capacity pools, groups, and minimum "
+                       f"attendance are not supported by capacity "
+                       f"planning\n")
+      exit(1)
+   trailBid.hashers.sortByRandom()
+
+   print()
+   printHeading(f"/// capacity plan for {targetPercent}% ///", 0, 1)
+   for timeSlot in trailBid.timeSlots:
+      plan = TimeSlotPlan(timeSlot)
+      plan.printPlan(targetPercent)
+      plan.commit()
+
+###########################################################################
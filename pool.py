@@ -0,0 +1,211 @@
+# name: $Id: pool.py 1 22:31:15 19-Oct-2026 s01rz $
+"""
+use: Capacity pools shared by several trails, such as the seats of a bus
+     carrying the hashers of two trails, or an on-after venue shared by
+     every trail of a time slot. A trail is only at capacity when it is
+     full, or when any pool enclosing it is full
+usage: Pools are read from capacityPools.txt in the event directory, one
+       line per pool of "poolID, poolName, capacity, parentPoolID", where
+       parentPoolID, the pool enclosing this one, is optional, eg: a bus
+       within a venue. The trails in each pool are listed in
+       poolTrails.txt, one line of "poolID, trailID" per trail; a trail is
+       listed in its innermost pool, and is within every pool enclosing
+       that one
+imp: Each trail holds a tuple of the pools enclosing it, innermost first,
+     and each pool counts the successful bids of its trails as they are
+     added by Trail.addSuccessfulBid(). Checking or filling a seat
+     therefore costs one step per enclosing pool, and nothing for a trail
+     in no pool
+"""
+from ingest   import *
+from resource import *
+from setting  import *
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### p o o l
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class Pool:
+   """
+   use: Seats shared by the trails within this pool
+   imp: count is the number of successful bids of the trails within us,
+        and parent the pool enclosing us, or None
+   """
+   __slots__ = ("id", "name", "capacity", "parent", "count")
+
+   def __init__(self, id, name, capacity):
+      self.id       = int(id)
+      self.name     = name.strip()
+      self.capacity = int(capacity)
+     ###
+      self.parent   = None
+      self.count    = 0
+
+###################################
+
+   def __str__(self):
+      return(f"{self.id}: {self.name}")
+
+###################################
+
+   @property
+   def depth(self):
+      """
+      use: Number of pools enclosing this pool
+      """
+      depth = 0
+      pool  = self.parent
+      while (pool is not None):
+         depth += 1
+         pool   = pool.parent
+      return(depth)
+
+###################################
+
+   @property
+   def enclosing(self):
+      """
+      use: This pool and the pools enclosing it, innermost first
+      post: Return value is a tuple
+      """
+      pools = []
+      pool  = self
+      while (pool is not None):
+         pools.append(pool)
+         pool = pool.parent
+      return(tuple(pools))
+
+###########################################################################
+
+   def pretty(self):
+      """
+      use: A prettily formatted ID, name, and fill level
+      """
+      return(f"{'':{self.depth * 3}}"
+             f"{f'{self.id:>3}: {self.name}':<22} "
+             f"{self.count}/{self.capacity}")
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### p o o l s
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class Pools:
+   def __init__(self, eventDirectory = None, trails = None):
+      """
+      usage: Optionally pass an event directory name holding
+             capacityPools.txt and poolTrails.txt, and the trails to join
+             to the pools
+      """
+      self.list      = []
+      self.lookupIDs = {} # dict keyed on pool.id containing a pool
+
+      if (eventDirectory is not None):
+         parents = []
+         ingest  = Ingest(os.path.join(eventDirectory,
+                                       capacityPoolsSchema.filename),
+                          capacityPoolsSchema)
+         for (lineNumber, (poolId, name, capacity, parentId)) in ingest:
+            try:
+               self.add(Pool(poolId, name, capacity))
+               if (parentId is not None):
+                  parents.append((lineNumber, poolId, parentId))
+            except DuplicateError as exception:
+               exception = "duplicate pool ID"
+               writeFileReadError(ingest.filespec, lineNumber, exception,
+                                  f"{poolId}, {name}")
+               printFileReadError(lineNumber, f"{poolId}, {name}")
+         ingest.check()
+         for (lineNumber, poolId, parentId) in parents:
+            pool   = self.getById(poolId)
+            parent = self.getById(parentId)
+            if ((parent is None) or (pool in parent.enclosing)):
+               writeFileReadError(ingest.filespec, lineNumber,
+                                  "unknown or circular parent pool ID",
+                                  f"{poolId}, {parentId}")
+               printFileReadError(lineNumber, f"{poolId}, {parentId}")
+            else:
+               pool.parent = parent
+
+         ingest = Ingest(os.path.join(eventDirectory,
+                                      poolTrailsSchema.filename),
+                         poolTrailsSchema)
+         for (lineNumber, (poolId, trailId)) in ingest:
+            pool  = self.getById(poolId)
+            trail = trails.getById(trailId)
+            if ((pool is None) or (trail is None) or
+                (len(trail.pools) != 0)):
+               writeFileReadError(ingest.filespec, lineNumber,
+                                  "unknown pool or trail ID, or trail "
+                                  "already in a pool",
+                                  f"{poolId}, {trailId}")
+               printFileReadError(lineNumber, f"{poolId}, {trailId}")
+            else:
+               trail.pools = pool.enclosing
+         ingest.check()
+         print(f"{self.count} {plural(self.count, 'capacity pool')}")
+
+###################################
+
+   def __getitem__(self, index):
+      return(self.list[index])
+
+###################################
+
+   @property
+   def count(self):
+      """use: Number of pools belonging to us"""
+      return(len(self.list))
+
+###########################################################################
+
+   def add(self, pool):
+      """
+      use: Add a pool to us
+      post: A pool whose ID we already have raises a DuplicateError
+      """
+      if (pool.id in self.lookupIDs):
+         raise DuplicateError(f"\n"
+                  f"   duplicate pool ID\n"
+                  f"   >>> {str(pool)}")
+      self.list.append(pool)
+      self.lookupIDs[pool.id] = pool
+
+###########################################################################
+
+   def getById(self, id):
+      """
+      use: The pool corresponding to the passed ID
+      post: Return value is None if there is no such pool
+      """
+      return(self.lookupIDs.get(int(id)))
+
+###########################################################################
+
+   def printPools(self):
+      """
+      use: Print the fill level of each pool, each pool followed by the
+           pools within it
+      """
+      children = {}
+      for pool in self.list:
+         children.setdefault(pool.parent, []).append(pool)
+
+      def printTree(parent):
+         for pool in children.get(parent, []):
+            print(pool.pretty())
+            printTree(pool)
+      printTree(None)
+
+###########################################################################
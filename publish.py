@@ -0,0 +1,134 @@
+# name: $Id: publish.py 1 20:05:18 19-Oct-2026 s01rz $
+"""
+use: Publishing of each time slot's results as soon as the time slot is
+     allocated, while the following time slots are still being allocated,
+     so that the rosters of the first day are ready before the last day
+     is done
+usage: Typically:
+          publisher = Publisher(exportFormats)
+          trailBid.runBid(publisher.publish)
+          publisher.wait()
+          ... text output ...
+          publisher.close(trailBid.hashers)
+imp: A time slot's trail pages, rosters, and award and trail export rows
+     depend only on the awards of that time slot, so they are rendered on
+     a background thread as soon as TimeSlot.runBid() finishes, while the
+     next time slot is allocated. A single thread renders the time slots
+     one at a time and in order, so export files are appended to in time
+     slot order. The hashers export depends on the awards of every time
+     slot, and is written by close().
+     Rendering a trail sorts its successful bids by hasher name, so the
+     text output, which sorts them too, must wait() for rendering to
+     finish
+"""
+import concurrent.futures
+
+import export as export_module
+
+from resource import *
+from setting  import *
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### p u b l i s h e r
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class Publisher:
+   """
+   use: Background renderer of the result files of each time slot
+   imp: counts is a dictionary of the number of rows exported keyed on
+        (name, exportFormat); a file is created by the first time slot
+        exported to it, and appended to by the rest
+   """
+   def __init__(self, exportFormats = (), outputDirectory = None,
+                chunkSize = 1000):
+      """
+      usage: exportFormats are export.exportFormats to be written, and
+             outputDirectory and chunkSize are as for
+             TrailBid.exportResult()
+      """
+      self.exportFormats   = list(exportFormats)
+      self.outputDirectory = outputDirectory
+      self.chunkSize       = chunkSize
+      self.counts          = {}
+      self.futures         = []
+      self.executor        = concurrent.futures.ThreadPoolExecutor(
+                                max_workers = 1)
+
+###########################################################################
+
+   def close(self, hashers):
+      """
+      use: Finish publishing: wait for the time slots to be rendered, and
+           write the hashers export
+      """
+      self.wait()
+      self.executor.shutdown()
+      hashers.sortById()
+      for exportFormat in self.exportFormats:
+         self.export("hashers", export_module.hasherFields,
+                     export_module.hasherRows(hashers), exportFormat)
+         print()
+         for name in ("awards", "hashers", "trails"):
+            filespec = export_module.exportFilespec(name, exportFormat,
+                                                    self.outputDirectory)
+            count    = self.counts.get((name, exportFormat), 0)
+            print(f"{filespec}: {count} {plural(count, 'row')}")
+
+###########################################################################
+
+   def export(self, name, fields, rows, exportFormat):
+      """
+      use: Write rows into an export file, creating it the first time
+      """
+      key      = (name, exportFormat)
+      filespec = export_module.exportFilespec(name, exportFormat,
+                                              self.outputDirectory)
+      count    = export_module.exportRows(filespec, fields, rows,
+                                          exportFormat, self.chunkSize,
+                                          "a" if key in self.counts else "w")
+      self.counts[key] = self.counts.get(key, 0) + count
+
+###########################################################################
+
+   def publish(self, timeSlot):
+      """
+      use: Queue an allocated time slot to be rendered
+      usage: Passed to TimeSlots.runBid(), which calls it as each time
+             slot is allocated
+      """
+      self.futures.append(self.executor.submit(self.render, timeSlot))
+
+###################################
+
+   def render(self, timeSlot):
+      """
+      use: Render a time slot's trail pages and rosters, and append its
+           rows to the awards and trails exports
+      """
+      for outputFormat in ("html", "roster"):
+         timeSlot.printResultByTrail(hasherNameStyle = "unique",
+                                     outputFormat    = outputFormat)
+      for exportFormat in self.exportFormats:
+         self.export("awards", export_module.awardFields,
+                     export_module.awardRows([timeSlot]), exportFormat)
+         self.export("trails", export_module.trailFields,
+                     export_module.trailRows([timeSlot]), exportFormat)
+
+###########################################################################
+
+   def wait(self):
+      """
+      use: Wait for every queued time slot to be rendered
+      post: An exception raised while rendering is raised here
+      """
+      (futures, self.futures) = (self.futures, [])
+      for future in futures:
+         future.result()
+
+###########################################################################
@@ -16,6 +16,9 @@ class DuplicateError(Exception):
 class IncompleteObjectError(Exception):
    pass
 
+class IngestError(Exception):
+   pass
+
 ###########################################################################
 
 def printFileReadError(lineNumber, data):
@@ -0,0 +1,104 @@
+# name: $Id: secondChance.py 1 21:18:33 19-Oct-2026 s01rz $
+"""
+use: Second-chance pass for hashers who bid but won nothing. Once every
+     time slot is allocated, some trails may still have vacant seats while
+     some hashers who bid were awarded no trail at all. Rather than these
+     being matched up by hand, each such hasher is offered a vacant seat
+     in every time slot they bid in
+usage: Enabled by secondChance in settings.txt, which runs
+       awardSecondChances() from TimeSlots.runBid() once every time slot is
+       allocated
+imp: A hasher who bid on a trail that still has a vacancy would have been
+     awarded it, so a second-chance seat is always on a trail the hasher
+     did not bid on. Hashers in a group are left out, as their group could
+     not be seated together. Second-chance bids are made up with a bid
+     value of 0 and tagged with secondChanceTag, which the printers and the
+     awards export show alongside the hasher; they are not recorded in the
+     trail's price curve.
+     For each time slot, the hashers are sorted once, by their best losing
+     bid in the time slot, highest first, then by the same tie-breakers as
+     Bids.sortEquitably(), and dealt in that order round the time slot's
+     trails that have vacancies, so the seats left are shared out evenly.
+     The trails with vacancies are kept in a list, dropped as they fill,
+     and hashers still without a trail in a set, so whether a trail still
+     has room and whether a hasher is free are each a constant time check
+"""
+import bid as bid_module
+
+from resource import *
+from setting  import *
+
+secondChanceTag = "second chance" # Bid.tag of a second-chance award
+
+###########################################################################
+###########################################################################
+###########################################################################
+
+def awardSecondChances(timeSlots):
+   """
+   use: Award the vacant seats of each time slot to the hashers who bid
+        but won nothing
+   pre: runBid() processing must be completed for every time slot
+   post: Return value is the number of second-chance awards
+   """
+   unsatisfied = {bid.hasher
+                  for timeSlot in timeSlots
+                  for trail in timeSlot.trails if (trail.bidCount != 0)
+                  for bid in trail.bids
+                  if ((bid.hasher.successfulBidCount == 0) and
+                      (bid.hasher.group is None))}
+   count       = 0
+   for timeSlot in timeSlots:
+      count += awardTimeSlot(timeSlot, unsatisfied)
+   return(count)
+
+###########################################################################
+
+def awardTimeSlot(timeSlot, unsatisfied):
+   """
+   use: Award the vacant seats of a time slot
+   usage: unsatisfied is the set of hashers who won nothing in allocation
+   post: Return value is the number of second-chance awards
+   """
+   rooms = [trail for trail in sorted(timeSlot.trails,
+                                      key = lambda trail: trail.sequence)
+            if (trail.vacancies > 0)]
+   if (len(rooms) == 0):
+      return(0)
+
+   best = {}                    # best losing bid value keyed on hasher
+   for trail in timeSlot.trails:
+      if (trail.bidCount != 0):
+         for bid in trail.bids:
+            if ((bid.hasher in unsatisfied) and
+                (bid.value > best.get(bid.hasher, -1))):
+               best[bid.hasher] = bid.value
+
+   count    = 0
+   position = 0
+   for hasher in sorted(best,
+                        key = lambda hasher: (-best[hasher]    ,
+                                              hasher.bidCount  ,
+                                              hasher.rank      ,
+                                              hasher.id        )):
+      if (hasher.isConflicting(timeSlot)):
+                                # awarded a time slot conflicting with this
+                                # one; see conflict.py
+         continue
+      while ((len(rooms) != 0) and (rooms[position].vacancies == 0)):
+                                # filled, or its capacity pool filled
+         rooms.pop(position)
+         if (position == len(rooms)):
+            position = 0
+      if (len(rooms) == 0):
+         break
+      trail = rooms[position]
+      bid   = bid_module.Bid(hasher, trail, 0, secondChanceTag)
+      trail.addSuccessfulBid(bid)
+      hasher.addSuccessfulBid(bid)
+      print(f"{str(hasher)} ~ {secondChanceTag} -> {trail.id}")
+      count   += 1
+      position = (position + 1) % len(rooms)
+   return(count)
+
+###########################################################################
@@ -0,0 +1,207 @@
+# name: $Id: server.py 1 14:36:09 19-Oct-2026 s01rz $
+"""
+use: Local HTTP server answering result queries against an event that is
+     loaded and allocated once and then kept in memory, so that questions
+     at the registration desk are answered without re-running trailBid.py
+usage: Started by "python trailBid.py -s port eventDirectory" after the
+       bids are processed. Queries are:
+          /                      : list of queries
+          /hasher/<hasherID>     : JSON result of a hasher
+          /explain/<hasherID>    : text explanation of a hasher's bids, as
+                                   printed by explain()
+          /trail/<trailID>       : JSON roster of a trail
+          /trails                : JSON fill of every trail
+          /search?name=<text>    : JSON [[hasherName, hasherID], ...] of
+                                   hashers whose name starts with text
+imp: Every response is rendered when the server starts, so answering a
+     query is a dictionary lookup; a name search bisects a sorted list of
+     lowercased names. The event is not changed after the server starts,
+     so requests are answered from many threads without locking
+"""
+
+import bisect
+import http.server
+import json
+import urllib.parse
+
+from resource import *
+from setting  import *
+
+searchLimit = 20                # most hashers returned by a name search
+
+indexPage = """trailBid result server
+   /hasher/<hasherID>   JSON result of a hasher
+   /explain/<hasherID>  explanation of a hasher's bids
+   /trail/<trailID>     JSON roster of a trail
+   /trails              JSON fill of every trail
+   /search?name=<text>  hashers whose name starts with text
+"""
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### r e s u l t    i n d e x
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class ResultIndex:
+   """
+   use: Precomputed responses to result queries
+   imp: responses is a dictionary keyed on query path, of
+        (contentType, body) tuples with body already encoded. names is a
+        list of (lowercased name, name, hasherID) tuples sorted for
+        prefix search
+   """
+   def __init__(self, timeSlots, hashers):
+      """
+      pre: runBid() processing must be completed
+      """
+      self.responses = {"/": ("text/plain", indexPage.encode())}
+      self.names     = sorted((hasher.name.lower(), hasher.name, hasher.id)
+                              for hasher in hashers)
+
+      for hasher in hashers:
+         successfulBids = (sorted(hasher.successfulBids,
+                                  key = lambda bid: bid.timeSlot.sequence)
+                           if hasher.successfulBidCount != 0 else [])
+         self.responses[f"/hasher/{hasher.id}"] = jsonResponse(
+            {"id"     : hasher.id,
+             "name"   : hasher.name,
+             "outcome": hasher.outcome,
+             "trails" : [[bid.timeSlot.name, bid.trail.id, bid.trail.name]
+                         for bid in successfulBids]})
+         self.responses[f"/explain/{hasher.id}"] = (
+            "text/plain",
+            ("\n".join(hasher.explanation()) + "\n").encode())
+
+      trails = []
+      for timeSlot in timeSlots:
+         for trail in timeSlot.trails.sortBySequence():
+            self.responses[f"/trail/{trail.id}"] = jsonResponse(
+               {"id"       : trail.id,
+                "name"     : trail.name,
+                "timeSlot" : timeSlot.name,
+                "capacity" : trail.capacity,
+                "attendees": [[bid.hasher.id, bid.hasher.name]
+                              for bid in sorted(trail.successfulBids,
+                                                key = lambda bid:
+                                                   bid.hasher.name.lower())]})
+            trails.append([timeSlot.name, trail.id, trail.name,
+                           trail.successfulBidsCount, trail.capacity])
+      self.responses["/trails"] = jsonResponse(trails)
+
+###################################
+
+   def __len__(self):
+      return(len(self.responses))
+
+###########################################################################
+
+   def lookup(self, path):
+      """
+      use: Response to a query
+      post: Return value is a (status, contentType, body) tuple
+      """
+      url = urllib.parse.urlsplit(path)
+      if (url.path == "/search"):
+         text = urllib.parse.parse_qs(url.query).get("name", [""])[0]
+         return((200,) + jsonResponse(self.search(text)))
+      response = self.responses.get(url.path.rstrip("/") or "/")
+      if (response is None):
+         return((404, "text/plain", b"not found\n"))
+      return((200,) + response)
+
+###########################################################################
+
+   def search(self, text, limit = searchLimit):
+      """
+      use: Hashers whose name starts with text, ignoring case
+      post: Return value is a list of [hasherName, hasherID] of at most
+            limit hashers, sorted by name
+      """
+      text   = text.strip().lower()
+      result = []
+      for position in range(bisect.bisect_left(self.names, (text,)),
+                            len(self.names)):
+         (lowerName, name, hasherId) = self.names[position]
+         if ((not lowerName.startswith(text)) or (len(result) >= limit)):
+            break
+         result.append([name, hasherId])
+      return(result)
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### r e q u e s t    h a n d l e r
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class ResultRequestHandler(http.server.BaseHTTPRequestHandler):
+   """
+   use: Answer GET requests from the ResultIndex of our server
+   """
+   def do_GET(self):
+      (status, contentType, body) = self.server.resultIndex.lookup(self.path)
+      self.send_response(status)
+      self.send_header("Content-Type", f"{contentType}; charset=utf-8")
+      self.send_header("Content-Length", str(len(body)))
+      self.end_headers()
+      self.wfile.write(body)
+
+###################################
+
+   def log_message(self, format, *args):
+                                # requests are logged only when verbose
+      if (settings["verbosity"] >= 1):
+         super().log_message(format, *args)
+
+###########################################################################
+###########################################################################
+###########################################################################
+
+def jsonResponse(data):
+   """
+   use: A (contentType, body) tuple for JSON data
+   """
+   return(("application/json", json.dumps(data).encode()))
+
+###########################################################################
+
+def makeServer(timeSlots, hashers, port, host = "127.0.0.1"):
+   """
+   use: Build the result index and the HTTP server answering from it
+   usage: Pass port 0 for any free port; the port bound is in
+          server.server_address
+   pre: runBid() processing must be completed
+   """
+   server = http.server.ThreadingHTTPServer((host, port),
+                                            ResultRequestHandler)
+   server.resultIndex = ResultIndex(timeSlots, hashers)
+   return(server)
+
+###########################################################################
+
+def serve(timeSlots, hashers, port, host = "127.0.0.1"):
+   """
+   use: Answer result queries until interrupted
+   pre: runBid() processing must be completed
+   """
+   server = makeServer(timeSlots, hashers, port, host)
+   (host, port) = server.server_address[:2]
+   print(f"serving {len(server.resultIndex)} "
+         f"{plural(len(server.resultIndex), 'response')} "
+         f"on http://{host}:{port}/")
+   try:
+      server.serve_forever()
+   except KeyboardInterrupt:
+      print()
+   finally:
+      server.server_close()
+
+###########################################################################
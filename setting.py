@@ -9,11 +9,15 @@ from resource import *
 class Settings:
    """
    use: Class for preference settings
-   imp: Store key-value pairs based on case-insensitive keys
+   imp: Store key-value pairs based on case-insensitive keys. verbosity
+        and bidAllowance have defaults, for the loaders used outside of
+        trailBid.py, eg: interactively or by tests
    """
    def __init__(self, settingsFilespec = None):
       self.dict   = {} # dictionary of keys:values pairs
       self.lookup = {} # case-insensitive dictionary for the actual key
+      self["verbosity"   ] = 0
+      self["bidAllowance"] = 100
       if ((settingsFilespec is not None) and
           (settingsFilespec != ''      )):
          self.readFile(settingsFilespec)
@@ -30,6 +34,15 @@ class Settings:
       self.lookup[key.lower()] = key
       self.dict[key]           = value
 
+###########################################################################
+
+   def isSet(self, key):
+      """
+      use: Predicate indicating if a yes or no setting is set to yes
+      post: Return value is a boolean; a setting that is not set is no
+      """
+      return(str(self[key]).lower() in ("yes", "true", "1"))
+
 ###########################################################################
 
    def setDefault(self, key, value):
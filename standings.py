@@ -0,0 +1,308 @@
+# name: $Id: standings.py 1 16:03:27 19-Oct-2026 s01rz $
+"""
+use: Live provisional standings while bidding is open. For every trail,
+     the cut-off bound is the bid value a hasher needs to beat to be sure
+     of a place, and is kept up to date as each bid comes in without
+     re-running runBid() over all the bids. It is an upper bound on the
+     trail's clearing bid, the lowest bid that will win it, and not the
+     clearing bid itself: some of the hashers ahead may win a trail they
+     bid more on, leaving their places to lower bids. Finding the clearing
+     bids, or the provisional winners, takes a full runBid()
+imp: runBid() awards a time slot's trails in order of bid value, each
+     hasher taking the first trail with a vacancy. A bid higher than the
+     capacity-th highest bid for a trail is therefore processed before the
+     trail fills up, and so is successful unless the hasher has already
+     won a trail they bid more on in the same time slot. That capacity-th
+     highest bid is the trail's cut-off bound; a bid equal to it goes to
+     the tie-breakers of Bids.sortEquitably().
+     Bid values are held in an OrderStatistics, a Fenwick tree over the
+     range of bid values, per trail, so adding, replacing, or withdrawing
+     a bid and finding a cut-off are each O(log bidAllowance). Each time
+     slot also has an OrderStatistics of the best bid of each hasher in
+     the time slot, showing how contested the time slot is as a whole
+"""
+
+import asyncio
+import json
+
+from resource import *
+from setting  import *
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### o r d e r    s t a t i s t i c s
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class OrderStatistics:
+   """
+   use: Multiset of integer values from 0 to maxValue, answering how many
+        values are above a value, and the k-th highest value, in
+        logarithmic time
+   imp: A Fenwick (binary indexed) tree of counts per value; tree[i]
+        holds the count of values in a power-of-two span ending at value
+        i - 1
+   """
+   def __init__(self, maxValue):
+      self.maxValue = maxValue
+      self.count    = 0
+      self.tree     = [0] * (maxValue + 2)
+      self.topBit   = 1 << (len(self.tree) - 1).bit_length()
+
+###################################
+
+   def __len__(self):
+      return(self.count)
+
+###########################################################################
+
+   def add(self, value, count = 1):
+      """
+      use: Add count occurrences of value; a negative count removes them
+      """
+      if ((value < 0) or (value > self.maxValue)):
+         raise ValueError(f"value {value} not within 0..{self.maxValue}")
+      self.count += count
+      position    = value + 1
+      while (position < len(self.tree)):
+         self.tree[position] += count
+         position            += position & -position
+
+###################################
+
+   def remove(self, value):
+      """
+      use: Remove one occurrence of value
+      """
+      self.add(value, -1)
+
+###########################################################################
+
+   def countAbove(self, value):
+      """
+      use: Number of values greater than value
+      """
+      return(self.count - self.countUpTo(value))
+
+###################################
+
+   def countUpTo(self, value):
+      """
+      use: Number of values less than or equal to value
+      """
+      result   = 0
+      position = min(value, self.maxValue) + 1
+      while (position > 0):
+         result   += self.tree[position]
+         position -= position & -position
+      return(result)
+
+###########################################################################
+
+   def highest(self, k):
+      """
+      use: The k-th highest value, counting from 1
+      post: Return value is None if there are fewer than k values
+      imp: Searches down the tree for the lowest value with at least
+           count - k + 1 values at or below it
+      """
+      if ((k < 1) or (k > self.count)):
+         return(None)
+      rank     = self.count - k + 1
+      position = 0
+      bit      = self.topBit
+      while (bit > 0):
+         if ((position + bit < len(self.tree)) and
+             (self.tree[position + bit] < rank)):
+            position += bit
+            rank     -= self.tree[position]
+         bit >>= 1
+      return(position)
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### s t a n d i n g s
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class Standings:
+   """
+   use: Provisional cut-off bound of every trail and time slot, updated
+        one bid at a time
+   usage: update() has the signature of a BidIntake listener, so that
+          standings follow the bids taken by intake.py:
+             standings = Standings(bidAllowance)
+             intake    = BidIntake(eventDirectory, hashers, trails,
+                                   listeners = [standings.update])
+   imp: Trail and time slot objects are used as dictionary keys. Attributes:
+           trails    : dictionary of OrderStatistics of bid values keyed
+                       on trail
+           timeSlots : dictionary of OrderStatistics of each hasher's
+                       best bid keyed on time slot
+           hasherBids: dictionary of {trail: value} keyed on
+                       (hasherID, timeSlotID), from which the best bid of
+                       a hasher in a time slot is found
+   """
+   def __init__(self, maxValue = None):
+      """
+      usage: maxValue is the highest possible bid, the bidAllowance by
+             default
+      """
+      if (maxValue is None):
+         maxValue = int(settings["bidAllowance"])
+      self.maxValue   = maxValue
+      self.trails     = {}
+      self.timeSlots  = {}
+      self.hasherBids = {}
+      self.version    = 0 # number of updates, for noticing changes
+
+###########################################################################
+
+   def cutoffBound(self, trail):
+      """
+      use: Provisional cut-off bound of a trail: a bid above it is sure of
+           a place on the trail, or on one the hasher bid more on
+      post: Return value is the capacity-th highest bid for the trail, or
+            0 if the trail has fewer bids than its capacity, in which case
+            any bid gets a place. It is an upper bound on the trail's
+            clearing bid
+      """
+      values = self.trails.get(trail)
+      if ((values is None) or (len(values) < trail.capacity)):
+         return(0)
+      return(values.highest(trail.capacity))
+
+###################################
+
+   def timeSlotCutoffBound(self, timeSlot):
+      """
+      use: Provisional cut-off bound of a time slot as a whole
+      post: Return value is the capacity-th highest of the best bids of
+            the hashers bidding in the time slot, where capacity is the
+            total capacity of its trails, or 0 if there are fewer hashers
+            bidding than places in the time slot
+      """
+      values   = self.timeSlots.get(timeSlot)
+      capacity = sum(trail.capacity for trail in timeSlot.trails)
+      if ((values is None) or (len(values) < capacity)):
+         return(0)
+      return(values.highest(capacity))
+
+###########################################################################
+
+   def cutoffFeed(self, timeSlots):
+      """
+      use: Current cut-off bound of every trail, for publishing to the
+           event website
+      post: Return value is a list of dictionaries, one per trail, in time
+            slot and trail sequence. cutoffBound is an upper bound on the
+            trail's clearing bid; see cutoffBound()
+      """
+      feed = []
+      for timeSlot in sorted(timeSlots, key = lambda timeSlot:
+                                                 timeSlot.sequence):
+         for trail in sorted(timeSlot.trails, key = lambda trail:
+                                                       trail.sequence):
+            values = self.trails.get(trail)
+            feed.append({"timeSlotID" : timeSlot.id,
+                         "timeSlot"   : timeSlot.name,
+                         "trailID"    : trail.id,
+                         "trailName"  : trail.name,
+                         "capacity"   : trail.capacity,
+                         "bids"       : len(values) if values else 0,
+                         "cutoffBound": self.cutoffBound(trail)})
+      return(feed)
+
+###########################################################################
+
+   def standing(self, trail, value):
+      """
+      use: Provisional standing of a bid for a trail
+      usage: value is that of a bid already added for the trail
+      post: Return value is one of:
+               "in"   : among the capacity highest bids
+               "tied" : level with other bids at the cut-off bound, to be
+                        decided by the tie-breakers of
+                        Bids.sortEquitably()
+               "below": below the cut-off bound, and successful only if
+                        enough of the hashers ahead win other trails
+      """
+      values = self.trails.get(trail)
+      if ((values is None) or
+          (values.countAbove(value - 1) <= trail.capacity)):
+         return("in")
+      return("tied" if values.countAbove(value) < trail.capacity else
+             "below")
+
+###########################################################################
+
+   def update(self, hasher, trail, oldValue, value):
+      """
+      use: Replace a hasher's bid for a trail
+      usage: Pass oldValue 0 for a new bid, and value 0 to withdraw a bid
+      """
+      self.version += 1
+      values = self.trails.get(trail)
+      if (values is None):
+         values = self.trails[trail] = OrderStatistics(self.maxValue)
+      if (oldValue != 0):
+         values.remove(oldValue)
+      if (value != 0):
+         values.add(value)
+
+      timeSlot = trail.timeSlot
+      slotBest = self.timeSlots.get(timeSlot)
+      if (slotBest is None):
+         slotBest = self.timeSlots[timeSlot] = OrderStatistics(self.maxValue)
+      key       = (hasher.id, timeSlot.id)
+      bids      = self.hasherBids.setdefault(key, {})
+      oldBest   = max(bids.values(), default = 0)
+      if (value != 0):
+         bids[trail] = value
+      else:
+         bids.pop(trail, None)
+      best      = max(bids.values(), default = 0)
+      if (len(bids) == 0):
+         del self.hasherBids[key]
+      if (best != oldBest):
+         if (oldBest != 0):
+            slotBest.remove(oldBest)
+         if (best != 0):
+            slotBest.add(best)
+
+###########################################################################
+
+   def writeFeed(self, timeSlots, filespec):
+      """
+      use: Write the cut-off bound feed as a JSON file
+      imp: The feed is written to a temporary file which then replaces
+           filespec, so a reader never sees a partly written feed
+      """
+      temporaryFilespec = f"{filespec}.tmp"
+      with open(temporaryFilespec, "w") as feedFile:
+         json.dump(self.cutoffFeed(timeSlots), feedFile)
+      os.replace(temporaryFilespec, filespec)
+
+###################################
+
+   async def publishFeed(self, timeSlots, filespec, interval):
+      """
+      use: Rewrite the cut-off bound feed every interval seconds while there
+           have been updates, until cancelled
+      """
+      publishedVersion = None
+      while (True):
+         if (self.version != publishedVersion):
+            publishedVersion = self.version
+            self.writeFeed(timeSlots, filespec)
+         await asyncio.sleep(interval)
+
+###########################################################################
@@ -9,6 +9,28 @@ from trail import Trail, Trails
 import csv
 
 
+def add_bid(hasher, trail, value):
+    bid = Bid(hasher, trail, value)
+    hasher.addBid(bid)
+    trail.addBid(bid)
+    return bid
+
+
+def awards(time_slot):
+    return {trail.id: [bid.hasher.id for bid in trail.successfulBids]
+            for trail in time_slot.trails}
+
+
+def make_time_slot(capacities, id=1, minimums=None):
+    time_slot = TimeSlot(id, id, f'slot {id}', index=id - 1)
+    for (n, capacity) in enumerate(capacities):
+        trail = Trail(id * 10 + n, n, f'trail {id}.{n}', capacity,
+                      minimums[n] if minimums else 0)
+        trail.timeSlot = time_slot
+        time_slot.addTrail(trail)
+    return time_slot
+
+
 @fixture
 def bid(hasher, trail, score):
     bid = Bid(hasher, trail, score)
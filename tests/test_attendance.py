@@ -0,0 +1,64 @@
+from attendance import runBid
+from bid import Bids
+from hasher import Hasher
+from random import Random
+from server import ResultIndex
+from tests.conftest import add_bid, awards, make_time_slot
+from trail import Trails
+
+
+def make_random_time_slot(seed=11):
+    generator = Random(seed)
+    (capacities, minimums) = zip(*[(generator.randint(4, 9),
+                                    generator.choice((0, 5, 7)))
+                                   for n in range(6)])
+    time_slot = make_time_slot(capacities, minimums=minimums)
+    for n in range(40):
+        hasher = Hasher(n, n, f'hasher {n}')
+        for trail in generator.sample(time_slot.trails.list,
+                                      generator.randint(1, 3)):
+            add_bid(hasher, trail, generator.randint(1, 20))
+    return time_slot
+
+
+def test_cancel_matches_full_rerun():
+    incremental = make_random_time_slot()
+    bids = Bids()
+    for trail in incremental.trails:
+        bids.merge(trail.getBids())
+    cancelled = runBid(bids, incremental.trails)
+    assert len(cancelled) > 0
+    for trail in incremental.trails:
+        assert trail.cancelled or \
+            trail.successfulBidsCount >= trail.minimumAttendance
+
+    rerun = make_random_time_slot()
+    for trail in rerun.trails:
+        trail.cancelled = trail.id in {trail.id for trail in cancelled}
+        trail.minimumAttendance = 0
+    rerun.runBid()
+    assert awards(incremental) == awards(rerun)
+
+
+def test_explain_cancelled_trail():
+    time_slot = make_random_time_slot()
+    bids = Bids()
+    for trail in time_slot.trails:
+        bids.merge(trail.getBids())
+    cancelled = runBid(bids, time_slot.trails)
+    hashers = {bid.hasher for bid in cancelled[0].bids}
+    for hasher in hashers:
+        line = next(line for line in hasher.explanation()
+                    if cancelled[0].pretty() in line)
+        assert 'Cancelled (min)' in line
+    index = ResultIndex([time_slot], hashers)
+    hasher = next(iter(hashers))
+    assert index.lookup(f'/explain/{hasher.id}')[0] == 200
+
+
+def test_minimum_attendance_column(tmp_path):
+    (tmp_path / 'trails.txt').write_text(
+        'trailID, sequence, trailName, trailCapacity, minimumAttendance\n'
+        '51, 1, Fri trail 1, 100, 20\n52, 2, Fri trail 2, 100\n')
+    trails = Trails(str(tmp_path))
+    assert [trail.minimumAttendance for trail in trails] == [20, 0]
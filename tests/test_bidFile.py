@@ -0,0 +1,41 @@
+from bid import Bids
+from bidFile import BidFile, isBidFile, writeBidFile
+from hasher import Hashers
+from pytest import raises
+from resource import IngestError
+from timeSlot import TimeSlot
+from trail import Trails
+
+
+def test_write_read_round_trip(tmp_path):
+    filespec = tmp_path / 'bids.bin'
+    records = [(n % 7, n % 3, n * 10) for n in range(100)]
+    assert writeBidFile(filespec, records, 7, 3, chunkSize=16) == 100
+    assert isBidFile(filespec)
+    with BidFile(filespec) as bid_file:
+        assert (bid_file.hasherCount, bid_file.trailCount) == (7, 3)
+        assert len(bid_file) == 100
+        assert list(bid_file) == records
+        assert list(bid_file.records(10, 12)) == records[10:12]
+
+
+def test_bad_magic(tmp_path):
+    filespec = tmp_path / 'bids.bin'
+    filespec.write_bytes(b'hasherID, trailID, bidAmount\n')
+    assert not isBidFile(filespec)
+    with raises(IngestError):
+        BidFile(filespec)
+
+
+def test_bids_load_bid_file(tmp_path):
+    (tmp_path / 'hashers.txt').write_text('1, 1, Alpha\n2, 2, Bravo\n')
+    (tmp_path / 'trails.txt').write_text('51, 1, Trail A, 10\n52, 2, Trail B, 10\n')
+    writeBidFile(tmp_path / 'bids.bin', [(0, 1, 40), (1, 0, 60)], 2, 2)
+    hashers = Hashers(str(tmp_path))
+    trails = Trails(str(tmp_path))
+    for trail in trails.list:
+        trail.setTimeSlot(TimeSlot(5, 1, 'Saturday'))
+    bids = Bids(str(tmp_path), hashers, trails)
+    assert bids.count == 2
+    assert bids.getBidsByHasherId(2).list[0].trail.id == 51
+    assert bids.value == 100
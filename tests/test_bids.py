@@ -1,4 +1,10 @@
 from bid import Bids
+from bidFile import writeBidFile
+from hasher import Hashers
+from setting import settings
+from timeSlot import TimeSlot
+from trail import Trails
+import gzip
 
 
 def test_Bids_init(bid_file, hashers, trails):
@@ -56,3 +62,64 @@ def test_get_trails_by_time_slot_id(bids, time_slots):
 
 def test_get_hashers(bids, hashers):
     assert len(bids.getHashers().list) == 500
+
+
+def test_bids_from_sources(tmp_path):
+    (tmp_path / 'hashers.txt').write_text('1, 1, Alpha\n2, 2, Bravo\n')
+    (tmp_path / 'trails.txt').write_text('51, 1, Trail A, 10\n52, 2, Trail B, 10\n')
+    hashers = Hashers(str(tmp_path))
+    trails = Trails(str(tmp_path))
+    for trail in trails.list:
+        trail.setTimeSlot(TimeSlot(5, 1, 'Saturday'))
+    (tmp_path / 'early.csv').write_text('hasherID,trailID,bidAmount\n1, 51, 40\n2, 51, 30\n')
+    with gzip.open(tmp_path / 'paper.csv.gz', 'wt') as paper:
+        paper.write('1, 52, 20\n2, 51, 35\n')
+    writeBidFile(tmp_path / 'fixes.bin', [(0, 1, 0), (1, 1, 15)], 2, 2)
+    sources = [str(tmp_path / name) for name in ('early.csv', 'paper.csv.gz', 'fixes.bin')]
+    bids = Bids(sources, hashers, trails)
+    assert sorted((bid.hasher.id, bid.trail.id, bid.value) for bid in bids) == \
+        [(1, 51, 40), (2, 51, 35), (2, 52, 15)]
+
+
+def test_duplicate_bid_keeps_later(tmp_path):
+    (tmp_path / 'hashers.txt').write_text('1, 1, Alpha\n2, 2, Bravo\n')
+    (tmp_path / 'trails.txt').write_text('51, 1, Trail A, 10\n')
+    hashers = Hashers(str(tmp_path))
+    trails = Trails(str(tmp_path))
+    trails.list[0].setTimeSlot(TimeSlot(5, 1, 'Saturday'))
+    (tmp_path / 'bids.txt').write_text('hasherID,trailID,bidAmount\n1, 51, 40\n2, 51, 30\n1, 51, 45\n')
+    bids = Bids(str(tmp_path), hashers, trails)
+    assert sorted((bid.hasher.id, bid.value) for bid in bids) == [(1, 45), (2, 30)]
+    assert hashers.getById(1).bidCount == 1
+
+
+def test_duplicate_bid_counts_once_against_allowance(tmp_path):
+    (tmp_path / 'hashers.txt').write_text('1, 1, Alpha\n')
+    (tmp_path / 'trails.txt').write_text('51, 1, Trail A, 10\n52, 2, Trail B, 10\n')
+    hashers = Hashers(str(tmp_path))
+    trails = Trails(str(tmp_path))
+    time_slot = TimeSlot(5, 1, 'Saturday')
+    for trail in trails.list:
+        trail.setTimeSlot(time_slot)
+    (tmp_path / 'bids.txt').write_text('hasherID,trailID,bidAmount\n1, 51, 60\n1, 52, 30\n1, 51, 70\n')
+    saved = (settings['bidAllowance'], settings['bidAllowancePolicy'])
+    settings['bidAllowance'] = 100
+    settings['bidAllowancePolicy'] = 'reject'
+    try:
+        bids = Bids(str(tmp_path), hashers, trails)
+    finally:
+        (settings['bidAllowance'], settings['bidAllowancePolicy']) = saved
+    assert sorted((bid.trail.id, bid.value) for bid in bids) == [(51, 70), (52, 30)]
+
+
+def test_zero_bid_withdraws_on_every_path(tmp_path):
+    (tmp_path / 'hashers.txt').write_text('1, 1, Alpha\n2, 2, Bravo\n')
+    (tmp_path / 'trails.txt').write_text('51, 1, Trail A, 10\n52, 2, Trail B, 10\n')
+    (tmp_path / 'bids.txt').write_text('hasherID,trailID,bidAmount\n1, 51, 40\n2, 51, 0\n1, 51, 0\n2, 52, 30\n')
+    for source in (str(tmp_path), [str(tmp_path / 'bids.txt')]):
+        hashers = Hashers(str(tmp_path))
+        trails = Trails(str(tmp_path))
+        for trail in trails.list:
+            trail.setTimeSlot(TimeSlot(5, 1, 'Saturday'))
+        bids = Bids(source, hashers, trails)
+        assert [(bid.hasher.id, bid.trail.id, bid.value) for bid in bids] == [(2, 52, 30)]
@@ -0,0 +1,27 @@
+from bidFile import BidFile
+from compact import BidLog
+from ingest import bidsSchema
+
+
+def test_last_write_wins(tmp_path):
+    first = tmp_path / 'first.log'
+    second = tmp_path / 'second.log'
+    first.write_text('1, 51, 40\n1, 52, 60\n2, 51, 30\n1, 51, 45\n')
+    second.write_text('2, 51, 0\n1, 52, 55\n3, 52, 10\n')
+    bid_log = BidLog([str(first), str(second)])
+    assert bid_log.bids == {(1, 51): 45, (1, 52): 55, (3, 52): 10}
+    assert (bid_log.lines, bid_log.replaced) == (7, 3)
+
+
+def test_write_bids_and_bid_file(tmp_path):
+    (tmp_path / 'hashers.txt').write_text('1, 1, Alpha\n2, 2, Bravo\n')
+    (tmp_path / 'trails.txt').write_text('51, 1, Trail A, 10\n52, 2, Trail B, 10\n')
+    (tmp_path / 'bids.log').write_text('1, 52, 40\n2, 51, 60\n1, 52, 20\n9, 51, 5\n')
+    bid_log = BidLog([str(tmp_path)])
+    assert bid_log.writeBids(str(tmp_path / 'bids.txt')) == 3
+    bid_log = BidLog()
+    bid_log.read(str(tmp_path), bidsSchema)
+    assert bid_log.bids == {(1, 52): 20, (2, 51): 60, (9, 51): 5}
+    assert bid_log.writeBidFile(str(tmp_path / 'bids.bin'), str(tmp_path)) == 2
+    with BidFile(str(tmp_path / 'bids.bin')) as bid_file:
+        assert list(bid_file) == [(0, 1, 20), (1, 0, 60)]
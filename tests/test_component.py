@@ -0,0 +1,36 @@
+from component import ComponentAllocator, DisjointSets
+from hasher import Hasher
+from random import Random
+from tests.conftest import add_bid, awards, make_time_slot
+
+
+def make_random_time_slot(seed=7, clusters=3, hashers=90):
+    generator = Random(seed)
+    time_slot = make_time_slot([generator.randint(3, 8)
+                                for n in range(clusters * 2)])
+    trails = time_slot.trails.list
+    for n in range(hashers):
+        hasher = Hasher(n, n % 7, f'hasher {n}')
+        cluster = trails[(n % clusters) * 2:(n % clusters) * 2 + 2]
+        for trail in cluster[:generator.randint(1, 2)]:
+            add_bid(hasher, trail, generator.choice((10, 20, 30)))
+    return time_slot
+
+
+def test_disjoint_sets():
+    sets = DisjointSets(5)
+    sets.union(0, 3)
+    sets.union(3, 4)
+    assert sets.find(4) == sets.find(0)
+    assert sets.find(1) != sets.find(0)
+
+
+def test_components_match_run_bid():
+    serial = make_random_time_slot()
+    serial.runBid()
+    parallel = make_random_time_slot()
+    with ComponentAllocator(workers=2, minBidCount=0) as allocator:
+        parallel.runBid(allocator)
+        assert allocator.pool is not None
+    assert awards(parallel) == awards(serial)
+    assert sum(map(len, awards(serial).values())) > 0
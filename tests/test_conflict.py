@@ -0,0 +1,92 @@
+from bid import Bid
+from conflict import readConflicts
+from hasher import Hasher
+from timeSlot import TimeSlot, TimeSlots
+from trail import Trail
+import os
+import subprocess
+import sys
+
+
+def make_weekend(tmp_path):
+    time_slots = TimeSlots()
+    for (n, name) in enumerate(('morning', 'afternoon', 'all day')):
+        time_slot = TimeSlot(n + 1, n + 1, name, index=n)
+        trail = Trail(n + 51, n, f'{name} trail', 10)
+        trail.timeSlot = time_slot
+        time_slot.addTrail(trail)
+        time_slots.add(time_slot)
+    (tmp_path / 'conflicts.txt').write_text(
+        'conflictID, timeSlotID\n1, 1\n1, 3\n2, 2\n2, 3\n')
+    assert readConflicts(str(tmp_path), time_slots) == 2
+    return time_slots
+
+
+def test_conflicting_time_slots(tmp_path):
+    time_slots = make_weekend(tmp_path)
+    (morning, afternoon, all_day) = time_slots
+    assert not (morning.conflicts & afternoon.conflicts)
+    assert morning.conflicts & all_day.conflicts
+    assert afternoon.conflicts & all_day.conflicts
+
+    hashers = [Hasher(n, n, f'hasher {n}') for n in range(2)]
+    for time_slot in time_slots:
+        for hasher in hashers:
+            trail = time_slot.trails[0]
+            bid = Bid(hasher, trail, 10 if hasher.id else time_slot.id)
+            hasher.addBid(bid)
+            trail.addBid(bid)
+    time_slots.runBid()
+    assert [bid.trail.id for bid in hashers[0].successfulBids] == [51, 52]
+    assert [bid.trail.id for bid in hashers[1].successfulBids] == [51, 52]
+    assert all_day.trails[0].successfulBidsCount == 0
+    assert hashers[0].isConflicting(all_day)
+
+
+def test_conflict_bits_are_dense_per_event(tmp_path):
+    (tmp_path / 'timeSlots.txt').write_text('1, 1, morning\n2, 2, afternoon\n3, 3, all day\n')
+    (tmp_path / 'conflicts.txt').write_text('conflictID, timeSlotID\n1, 1\n1, 3\n2, 2\n2, 3\n')
+    for load in range(2):
+        time_slots = TimeSlots(str(tmp_path))
+        readConflicts(str(tmp_path), time_slots)
+        assert [time_slot.conflicts for time_slot in time_slots] == \
+            [0b01001, 0b10010, 0b11100]
+
+
+def test_remove_successful_bid_frees_conflicts(tmp_path):
+    (morning, afternoon, all_day) = make_weekend(tmp_path)
+    hasher = Hasher(1, 1, 'hasher')
+    bids = [Bid(hasher, time_slot.trails[0], 5)
+            for time_slot in (morning, afternoon)]
+    for bid in bids:
+        hasher.addBid(bid)
+        bid.trail.addSuccessfulBid(bid)
+        hasher.addSuccessfulBid(bid)
+    hasher.removeSuccessfulBid(bids[1])
+    assert hasher.isConflicting(all_day)
+    assert not hasher.isConflicting(afternoon)
+    bids[1].trail.removeSuccessfulBid(bids[1])
+    assert [bid.trail.id for bid in hasher.successfulBids] == [51]
+    assert bids[1].trail.successfulBidsCount == 0
+
+
+def test_remove_successful_bid_without_asserts():
+    script = '\n'.join((
+        'from bid import Bid',
+        'from hasher import Hasher',
+        'from timeSlot import TimeSlot',
+        'from trail import Trail',
+        'time_slot = TimeSlot(1, 1, "slot")',
+        'trail = Trail(51, 0, "trail", 10)',
+        'trail.timeSlot = time_slot',
+        'hasher = Hasher(1, 1, "hasher")',
+        'bid = Bid(hasher, trail, 5)',
+        'trail.addSuccessfulBid(bid)',
+        'hasher.addSuccessfulBid(bid)',
+        'trail.removeSuccessfulBid(bid)',
+        'hasher.removeSuccessfulBid(bid)',
+        'print(trail.successfulBidsCount, hasher.successfulBids.count)'))
+    result = subprocess.run([sys.executable, '-O', '-c', script],
+                            capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(__file__)))
+    assert result.stdout.split() == ['0', '0']
@@ -0,0 +1,32 @@
+from database import writeDatabase
+import sqlite3
+
+
+def test_write_database(bid, hasher, time_slot, tmp_path):
+    time_slot.addTrail(bid.trail)
+    bid.trail.addBid(bid)
+    bid.runBid()
+    filespec = str(tmp_path / 'result.sqlite')
+    counts = writeDatabase(filespec, [time_slot], [hasher])
+    assert counts == {'timeSlots': 1, 'trails': 1, 'hashers': 1, 'bids': 1, 'awards': 1,
+                      'priceCurves': 1}
+    connection = sqlite3.connect(filespec)
+    assert connection.execute('select hasherID, trailID, bidAmount from awards').fetchall() == \
+        [(hasher.id, bid.trail.id, bid.value)]
+
+
+def test_write_database_replaces_file(hasher, time_slot, tmp_path):
+    filespec = str(tmp_path / 'result.sqlite')
+    writeDatabase(filespec, [time_slot], [hasher])
+    counts = writeDatabase(filespec, [time_slot], [hasher])
+    assert counts['hashers'] == 1
+
+
+def test_write_database_price_curves(bid, hasher, time_slot, tmp_path):
+    time_slot.addTrail(bid.trail)
+    bid.runBid()
+    filespec = str(tmp_path / 'result.sqlite')
+    writeDatabase(filespec, [time_slot], [hasher])
+    connection = sqlite3.connect(filespec)
+    assert connection.execute('select trailID, fill100, lowestBid from priceCurves').fetchall() == \
+        [(bid.trail.id, None, bid.value)]
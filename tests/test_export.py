@@ -0,0 +1,53 @@
+from export import awardFields, awardRows, exportRows, hasherRows, trailRows
+from pool import Pool
+import json
+
+
+def test_hasher_rows_no_bid(hasher):
+    row = next(hasherRows([hasher]))
+    assert row[0] == hasher.id
+    assert row[5] == 'no bid'
+
+
+def test_award_rows(bid, time_slot):
+    time_slot.addTrail(bid.trail)
+    bid.runBid()
+    rows = list(awardRows([time_slot]))
+    assert rows == [(time_slot.id, time_slot.name, bid.trail.id, bid.trail.name,
+                     bid.hasher.id, bid.hasher.name, bid.value, '')]
+
+
+def test_trail_rows_vacancies(bid, time_slot):
+    time_slot.addTrail(bid.trail)
+    bid.runBid()
+    row = next(trailRows([time_slot]))
+    assert row[4] == 1
+    assert row[5] == bid.trail.capacity - 1
+
+
+def test_trail_rows_vacancies_pooled_and_cancelled(bid, time_slot):
+    time_slot.addTrail(bid.trail)
+    pool = Pool(1, 'bus', 3)
+    bid.trail.pools = pool.enclosing
+    bid.runBid()
+    assert next(trailRows([time_slot]))[5] == 2
+    bid.trail.cancelled = True
+    assert next(trailRows([time_slot]))[5] == 0
+
+
+def test_export_rows_csv_chunks(tmp_path):
+    filespec = tmp_path / 'awards.csv'
+    rows = ((n, 'slot', n, 'trail', n, 'hasher', n, '') for n in range(25))
+    assert exportRows(filespec, awardFields, rows, 'csv', chunkSize=10) == 25
+    lines = filespec.read_text().splitlines()
+    assert lines[0] == ','.join(awardFields)
+    assert len(lines) == 26
+
+
+def test_export_rows_jsonl(tmp_path):
+    filespec = tmp_path / 'awards.jsonl'
+    rows = [(5, 'slot', 51, 'trail', 1, 'hasher', 100)]
+    exportRows(filespec, awardFields, rows, 'jsonl')
+    record = json.loads(filespec.read_text())
+    assert record['trailID'] == 51
+    assert record['bidAmount'] == 100
@@ -0,0 +1,60 @@
+from bid import Bids
+from bidFile import BidFile, writeBidFile
+from conflict import readConflicts
+from external import ExternalAllocation
+from intake import loadEvent
+from random import Random
+
+
+def write_event(tmp_path, hashers=40):
+    generator = Random(11)
+    (tmp_path / 'timeSlots.txt').write_text('1, 1, Saturday\n2, 2, Sunday\n')
+    (tmp_path / 'trails.txt').write_text(''.join(f'{51 + n}, {n}, Trail {n}, {generator.randint(2, 6)}\n'
+                                                 for n in range(6)))
+    (tmp_path / 'trailTimes.txt').write_text(''.join(f'{1 + n // 3}, {51 + n}\n' for n in range(6)))
+    (tmp_path / 'hashers.txt').write_text(''.join(f'{n}, {n % 5}, Hasher {n}\n' for n in range(hashers)))
+    records = [(hasher, trail, generator.choice((10, 20, 30)))
+               for hasher in range(hashers) for trail in range(6) if generator.random() < 0.5]
+    writeBidFile(tmp_path / 'bids.bin', records, hashers, 6)
+
+
+def test_matches_run_bid(tmp_path):
+    write_event(tmp_path)
+    (time_slots, trails, hashers) = loadEvent(str(tmp_path))
+    Bids(str(tmp_path), hashers, trails)
+    hashers.sortByRandom()
+    time_slots.runBid()
+    expected = sorted((bid.hasher.index, bid.trail.index, bid.value)
+                      for trail in trails for bid in trail.successfulBids)
+
+    (time_slots, trails, hashers) = loadEvent(str(tmp_path))
+    hashers.sortByRandom()
+    allocation = ExternalAllocation(str(tmp_path / 'bids.bin'), time_slots, trails, hashers, runSize=7)
+    assert allocation.runBid(str(tmp_path / 'awards.bin')) == len(expected)
+    with BidFile(str(tmp_path / 'awards.bin')) as awards:
+        assert sorted(awards) == expected
+
+
+def test_matches_run_bid_with_conflicts(tmp_path):
+    write_event(tmp_path)
+    (tmp_path / 'conflicts.txt').write_text('1, 1\n1, 2\n')
+
+    def load():
+        (time_slots, trails, hashers) = loadEvent(str(tmp_path))
+        readConflicts(str(tmp_path), time_slots)
+        return (time_slots, trails, hashers)
+
+    (time_slots, trails, hashers) = load()
+    Bids(str(tmp_path), hashers, trails)
+    hashers.sortByRandom()
+    time_slots.runBid()
+    expected = sorted((bid.hasher.index, bid.trail.index, bid.value)
+                      for trail in trails for bid in trail.successfulBids)
+    assert max(hasher.successfulBidCount for hasher in hashers) == 1
+
+    (time_slots, trails, hashers) = load()
+    hashers.sortByRandom()
+    allocation = ExternalAllocation(str(tmp_path / 'bids.bin'), time_slots, trails, hashers, runSize=7)
+    assert allocation.runBid(str(tmp_path / 'awards.bin')) == len(expected)
+    with BidFile(str(tmp_path / 'awards.bin')) as awards:
+        assert sorted(awards) == expected
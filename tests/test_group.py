@@ -0,0 +1,50 @@
+from group import Group, Groups
+from hasher import Hasher, Hashers
+from tests.conftest import add_bid, make_time_slot
+
+
+def test_group_all_or_none():
+    time_slot = make_time_slot((2, 3))
+    (first, second) = time_slot.trails
+    alice, bob, carol, dave = (Hasher(n, n, name) for (n, name)
+                               in enumerate(('alice', 'bob', 'carol', 'dave')))
+    group = Group(1)
+    for hasher in (alice, bob, carol):
+        group.add(hasher)
+        add_bid(hasher, first, 50)
+        add_bid(hasher, second, 40)
+    add_bid(dave, first, 30)
+
+    time_slot.runBid()
+    assert [bid.hasher for bid in first.successfulBids] == [dave]
+    assert sorted(bid.hasher.name for bid in second.successfulBids) == \
+        ['alice', 'bob', 'carol']
+
+
+def test_group_common_trails_only():
+    time_slot = make_time_slot((5, 5))
+    (first, second) = time_slot.trails
+    alice, bob = Hasher(1, 1, 'alice'), Hasher(2, 2, 'bob')
+    group = Group(1)
+    group.add(alice)
+    group.add(bob)
+    add_bid(alice, first, 90)
+    add_bid(alice, second, 10)
+    add_bid(bob, second, 20)
+
+    time_slot.runBid()
+    assert first.successfulBidsCount == 0
+    assert [bid.hasher for bid in second.successfulBids] == [alice, bob]
+
+
+def test_groups_file(tmp_path, capsys):
+    hashers = Hashers()
+    for n in range(1, 4):
+        hashers.add(Hasher(n, n, f'hasher {n}'))
+    (tmp_path / 'groups.txt').write_text(
+        'groupID,hasherID\n7, 1\n7, 2\n8, 2\n8, 9\n8, 3\n')
+    groups = Groups(str(tmp_path / 'groups.txt'), hashers)
+    assert groups.count == 2
+    assert [hasher.id for hasher in groups.getById(7).hashers] == [1, 2]
+    assert [hasher.id for hasher in groups.getById(8).hashers] == [3]
+    assert hashers.getById(2).group is groups.getById(7)
@@ -1,3 +1,8 @@
+from bid import Bid
+from pytest import raises
+from resource import DuplicateError
+
+
 def test_init(hasher):
     assert hasher
 
@@ -20,3 +25,35 @@ def test_add_bid(bid, bid_allowance, hasher, mocker):
     hasher.addBid(bid)
     assert hasher.bids.list.pop() == bid
 
+
+def test_print_result_by_hasher_json_no_bid(hasher):
+    shard = {}
+    hasher.printResultByHasher(outputFormat='json', shard=shard)
+    assert shard[str(hasher.id)] == {'id': hasher.id, 'name': str(hasher), 'outcome': 'no bid'}
+
+
+def test_print_result_by_hasher_json_successful(bid, hasher):
+    hasher.bids.add(bid)
+    bid.runBid()
+    shard = {}
+    hasher.printResultByHasher(outputFormat='json', shard=shard)
+    result = shard[str(hasher.id)]
+    assert result['outcome'] == 'successful'
+    assert result['trails'] == [[bid.timeSlot.name, bid.trail.id, bid.trail.name]]
+
+
+def test_collections_created_lazily(hasher):
+    assert hasher.bidCount == 0
+    assert hasher.successfulBidCount == 0
+    assert hasher._bids is None
+    assert hasher._successfulBids is None
+
+
+def test_hashers_assigned_dense_index(hashers):
+    assert sorted(hasher.index for hasher in hashers) == list(range(hashers.count))
+
+
+def test_add_duplicate_bid(bid, hasher, trail, score):
+    hasher.addBid(bid)
+    with raises(DuplicateError):
+        hasher.addBid(Bid(hasher, trail, score + 1))
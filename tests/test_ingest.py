@@ -0,0 +1,48 @@
+from ingest import Field, Ingest, Schema, bidsSchema, parseFile
+from pytest import raises
+from resource import IngestError
+import pickle
+
+
+def write(tmp_path, content):
+    filespec = tmp_path / 'bids.txt'
+    filespec.write_text(content)
+    return str(filespec)
+
+
+def test_header_is_skipped(tmp_path):
+    filespec = write(tmp_path, 'hasherID, trailID, bidAmount\n1, 51, 100\n')
+    assert list(Ingest(filespec, bidsSchema)) == [(2, (1, 51, 100))]
+
+
+def test_no_header(tmp_path):
+    filespec = write(tmp_path, '1, 51, 100\n\n2, 52, 200\n')
+    assert list(Ingest(filespec, bidsSchema)) == [(1, (1, 51, 100)), (3, (2, 52, 200))]
+
+
+def test_directory_uses_schema_filename(tmp_path):
+    write(tmp_path, '1, 51, 100\n')
+    assert list(Ingest(str(tmp_path), bidsSchema)) == [(1, (1, 51, 100))]
+
+
+def test_all_errors_collected(tmp_path):
+    filespec = write(tmp_path, 'hasherID, trailID, bidAmount\n1, x, 100\n2, 52\n3, 53, y\n4, 54, 400\n')
+    ingest = Ingest(filespec, bidsSchema, batchSize=2)
+    assert list(ingest) == [(5, (4, 54, 400))]
+    assert [error[0] for error in sorted(ingest.errors)] == [2, 3, 4]
+    with raises(IngestError):
+        ingest.check()
+
+
+def test_optional_field(tmp_path):
+    schema = Schema('bids.txt', Field('hasherID'), Field('name', str), Field('minimum', required=False, default=0))
+    filespec = write(tmp_path, '1, one\n2, two, 5\n')
+    assert [row for (_, row) in Ingest(filespec, schema)] == [(1, 'one', 0), (2, 'two', 5)]
+
+
+def test_parse_file_survives_pickling(tmp_path):
+    filespec = write(tmp_path, 'hasherID, trailID, bidAmount\n1, 51, 100\n2, x, 1\n3, 53, 300\n')
+    ingest = pickle.loads(pickle.dumps(parseFile(filespec, bidsSchema)))
+    assert len(ingest) == 2
+    assert list(ingest) == [(2, (1, 51, 100)), (4, (3, 53, 300))]
+    assert [error[0] for error in ingest.errors] == [3]
@@ -0,0 +1,78 @@
+from hasher import Hashers
+from intake import BidIntake
+from setting import settings
+from trail import Trails
+import asyncio
+
+
+def make_intake(tmp_path, hashers, trails):
+    return BidIntake(str(tmp_path), hashers, trails)
+
+
+def test_accept_and_allowance(tmp_path, hasher_list, trail, time_slot):
+    hashers = Hashers()
+    for hasher in hasher_list[:2]:
+        hashers.add(hasher)
+    trails = Trails()
+    trails.add(trail)
+    intake = make_intake(tmp_path, hashers, trails)
+    allowance = int(settings['bidAllowance'])
+    assert intake.accept(hasher_list[0].id, trail.id, allowance) is None
+    assert intake.accept(hasher_list[0].id, trail.id, allowance + 1) is not None
+    assert intake.accept(hasher_list[0].id, trail.id, 1) is None
+    assert intake.totals[(hasher_list[0].id, time_slot.id)] == 1
+    assert intake.accept(99999, trail.id, 1) == 'no hasher 99999'
+    assert intake.accept(hasher_list[1].id, trail.id, -1) is not None
+
+
+def test_submit_logs_and_replays(tmp_path, hasher_list, trail):
+    hashers = Hashers()
+    hashers.add(hasher_list[0])
+    trails = Trails()
+    trails.add(trail)
+    hasher_id = hasher_list[0].id
+
+    async def submit_all():
+        intake = make_intake(tmp_path, hashers, trails)
+        messages = await asyncio.gather(*(intake.submit(hasher_id, trail.id, value)
+                                          for value in (10, 20, 30)))
+        await intake.close()
+        return messages
+
+    assert asyncio.run(submit_all()) == [None, None, None]
+    assert len((tmp_path / 'bids.log').read_text().splitlines()) == 3
+
+    intake = make_intake(tmp_path, hashers, trails)
+    assert intake.bids == {(hasher_id, trail.id): 30}
+    assert intake.exportBids() == 1
+    assert (tmp_path / 'bids.txt').read_text().splitlines()[1] == f'{hasher_id}, {trail.id}, 30'
+
+
+def test_failed_log_write_reverts_bids(tmp_path, hasher_list, trail, time_slot):
+    hashers = Hashers()
+    hashers.add(hasher_list[0])
+    trails = Trails()
+    trails.add(trail)
+    hasher_id = hasher_list[0].id
+    changes = []
+
+    def failing_write(lines):
+        raise OSError('disk full')
+
+    async def submit_all():
+        intake = BidIntake(str(tmp_path), hashers, trails,
+                           listeners=[lambda *change: changes.append(change[2:])])
+        assert intake.accept(hasher_id, trail.id, 5) is None
+        intake.writeBatch = failing_write
+        results = await asyncio.gather(*(intake.submit(hasher_id, trail.id, value)
+                                         for value in (10, 20)),
+                                       return_exceptions=True)
+        await intake.close()
+        return (intake, results)
+
+    (intake, results) = asyncio.run(submit_all())
+    assert all(isinstance(result, OSError) for result in results)
+    assert intake.bids == {(hasher_id, trail.id): 5}
+    assert intake.totals[(hasher_id, time_slot.id)] == 5
+    assert changes[-2:] == [(20, 10), (10, 5)]
+    assert (tmp_path / 'bids.log').read_text() == ''
@@ -0,0 +1,58 @@
+from bid import Bids
+from hasher import Hasher
+from joint import runBid
+from random import Random
+from setting import settings
+from tests.conftest import add_bid, make_time_slot
+from timeSlot import TimeSlots
+
+
+def test_fewer_wins_first_across_time_slots():
+    friday = make_time_slot([1])
+    saturday = make_time_slot([1], id=2)
+    (a, b, c) = [Hasher(n, n, name) for (n, name) in enumerate('abc')]
+    add_bid(a, friday.trails[0], 10)
+    add_bid(a, saturday.trails[0], 10)
+    add_bid(b, friday.trails[0], 9)
+    add_bid(c, saturday.trails[0], 5)
+
+    assert runBid([friday, saturday]) == 2
+    assert [bid.hasher for bid in friday.trails[0].successfulBids] == [a]
+    assert [bid.hasher for bid in saturday.trails[0].successfulBids] == [c]
+
+
+def test_single_time_slot_matches_bids_run_bid():
+    def allocate(joint):
+        generator = Random(5)
+        time_slot = make_time_slot([3, 5, 4])
+        for n in range(20):
+            hasher = Hasher(n, n, f'hasher {n}')
+            for trail in generator.sample(list(time_slot.trails), 2):
+                add_bid(hasher, trail, generator.randint(1, 9))
+        if (joint):
+            runBid([time_slot])
+        else:
+            bids = Bids()
+            for trail in time_slot.trails:
+                bids.merge(trail.getBids())
+            bids.runBid()
+        return [[bid.hasher.id for bid in trail.successfulBids]
+                for trail in time_slot.trails]
+
+    assert allocate(True) == allocate(False)
+
+
+def test_minimum_attendance_ignores_joint_allocation(capsys):
+    time_slots = TimeSlots()
+    time_slots.add(make_time_slot([2], minimums=[1]))
+    add_bid(Hasher(1, 1, 'hasher'), time_slots[0].trails[0], 10)
+    saved = settings['jointAllocation']
+    settings['jointAllocation'] = 'yes'
+    try:
+        time_slots.runBid()
+    finally:
+        settings['jointAllocation'] = saved
+    captured = capsys.readouterr()
+    assert 'jointAllocation ignored' in captured.err
+    assert 'joint allocation' not in captured.out
+    assert time_slots[0].trails[0].successfulBidsCount == 1
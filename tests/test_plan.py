@@ -0,0 +1,66 @@
+from hasher import Hasher
+from plan import TimeSlotPlan
+from random import Random
+from tests.conftest import add_bid, make_time_slot
+
+
+def make_random_time_slot(seed=5, hashers=60):
+    generator = Random(seed)
+    time_slot = make_time_slot([generator.randint(3, 8) for n in range(5)])
+    for n in range(hashers):
+        hasher = Hasher(n, n, f'hasher {n}')
+        for trail in generator.sample(time_slot.trails.list, 2):
+            add_bid(hasher, trail, generator.randint(1, 50))
+    return time_slot
+
+
+def test_allocate_matches_run_bid():
+    time_slot = make_random_time_slot()
+    plan = TimeSlotPlan(time_slot)
+    (satisfied, fills) = plan.allocate()
+    plan.commit()
+    assert fills == [trail.successfulBidsCount for trail in plan.trails]
+    assert satisfied == sum(fills)
+
+
+def test_allocate_other_capacities_without_resorting():
+    plan = TimeSlotPlan(make_random_time_slot())
+    unlimited = plan.demand
+    assert plan.satisfied(unlimited) == plan.hasherCount
+    assert plan.satisfied([0] * len(plan.trails)) == 0
+
+
+def test_required_capacity_reaches_target():
+    plan = TimeSlotPlan(make_random_time_slot())
+    target = plan.satisfied() + 3
+    needed = plan.requiredCapacity(0, target)
+    capacities = list(plan.capacities)
+    capacities[0] = needed
+    assert plan.satisfied(capacities) >= target
+    capacities[0] = needed - 1
+    assert plan.satisfied(capacities) < target
+    assert plan.requiredCapacity(0, plan.hasherCount + 1) is None
+
+
+def test_marginal_gains():
+    plan = TimeSlotPlan(make_random_time_slot())
+    gains = plan.marginalGains()
+    assert len(gains) == len(plan.trails)
+    assert all(gain in (0, 1) for gain in gains)
+
+
+def test_allocate_skips_hashers_of_conflicting_time_slot():
+    first = make_random_time_slot()
+    TimeSlotPlan(first).commit()
+    hashers = {bid.hasher for trail in first.trails for bid in trail.bids}
+    second = make_time_slot([len(hashers)], id=2)
+    second.conflicts |= first.conflicts
+    trail = second.trails[0]
+    for hasher in sorted(hashers, key=lambda hasher: hasher.id):
+        add_bid(hasher, trail, 10)
+    plan = TimeSlotPlan(second)
+    (satisfied, fills) = plan.allocate()
+    plan.commit()
+    assert fills == [trail.successfulBidsCount]
+    assert satisfied == sum(1 for hasher in hashers if hasher.successfulBidCount == 1
+                            and hasher.successfulBids.list[0].trail is trail)
@@ -0,0 +1,40 @@
+from hasher import Hasher
+from pool import Pool, Pools
+from tests.conftest import add_bid, make_time_slot
+from trail import Trail, Trails
+
+
+def test_nested_pools_cap_trails():
+    time_slot = make_time_slot((10, 10, 10))
+    trails = time_slot.trails.list
+    venue = Pool(1, 'venue', 6)
+    bus = Pool(2, 'bus', 3)
+    bus.parent = venue
+    trails[0].pools = trails[1].pools = bus.enclosing
+    trails[2].pools = venue.enclosing
+    for n in range(12):
+        hasher = Hasher(n, n, f'hasher {n}')
+        add_bid(hasher, trails[n % 3], 100 - n)
+
+    time_slot.runBid()
+    assert (bus.count, venue.count) == (3, 6)
+    assert trails[0].successfulBidsCount + trails[1].successfulBidsCount == 3
+    assert trails[2].successfulBidsCount == 3
+    assert trails[2].isAtCapacity()
+    assert trails[2].vacancies == 0
+
+
+def test_pools_files(tmp_path):
+    trails = Trails()
+    for n in (51, 52, 53):
+        trails.add(Trail(n, n, f'trail {n}', 10))
+    (tmp_path / 'capacityPools.txt').write_text(
+        'poolID,poolName,capacity,parentPoolID\n1, bus, 12, 2\n2, venue, 30\n')
+    (tmp_path / 'poolTrails.txt').write_text(
+        'poolID,trailID\n1, 51\n1, 52\n2, 53\n')
+    pools = Pools(str(tmp_path), trails)
+    assert pools.count == 2
+    assert pools.getById(1).parent is pools.getById(2)
+    assert [pool.id for pool in trails.getById(52).pools] == [1, 2]
+    assert [pool.id for pool in trails.getById(53).pools] == [2]
+    assert trails.getById(51).vacancies == 10
@@ -0,0 +1,41 @@
+from bid import Bid
+from hasher import Hasher, Hashers
+from publish import Publisher
+from setting import settings
+from timeSlot import TimeSlot, TimeSlots
+from trail import Trail
+
+
+def make_time_slots():
+    time_slots = TimeSlots()
+    hashers = Hashers()
+    for n in range(4):
+        hashers.add(Hasher(n, n, f'hasher {n}'))
+    for slot in range(2):
+        time_slot = TimeSlot(slot + 1, slot + 1, f'slot {slot}', index=slot)
+        time_slots.add(time_slot)
+        trail = Trail(51 + slot, slot, f'trail {slot}', 3)
+        trail.timeSlot = time_slot
+        time_slot.addTrail(trail)
+        for hasher in hashers:
+            bid = Bid(hasher, trail, 10 + hasher.id)
+            hasher.addBid(bid)
+            trail.addBid(bid)
+    return (time_slots, hashers)
+
+
+def test_publish_each_time_slot(tmp_path, mocker):
+    mocker.patch.dict(settings.dict)
+    mocker.patch.dict(settings.lookup)
+    settings['eventDirectory'] = str(tmp_path)
+    (time_slots, hashers) = make_time_slots()
+    publisher = Publisher(['csv'])
+    time_slots.runBid(publisher.publish)
+    publisher.wait()
+    assert sorted(path.name for path in (tmp_path / 'html').iterdir()) == \
+        ['51-Trail0-roster.html', '51-Trail0.html', '52-Trail1-roster.html', '52-Trail1.html']
+    publisher.close(hashers)
+    awards = (tmp_path / 'export' / 'awards.csv').read_text().splitlines()
+    assert len(awards) == 1 + 6
+    assert [line.split(',')[2] for line in awards[1:]] == ['51'] * 3 + ['52'] * 3
+    assert len((tmp_path / 'export' / 'hashers.csv').read_text().splitlines()) == 5
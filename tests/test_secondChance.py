@@ -0,0 +1,22 @@
+from export import awardRows
+from hasher import Hasher
+from secondChance import awardSecondChances, secondChanceTag
+from tests.conftest import add_bid, make_time_slot
+
+
+def test_second_chance():
+    time_slot = make_time_slot((1, 2, 1))
+    trails = time_slot.trails.list
+    hashers = [Hasher(n, n, f'hasher {n}') for n in range(5)]
+    for (hasher, value) in zip(hashers, (50, 40, 30, 20, 10)):
+        add_bid(hasher, trails[0], value)
+    time_slot.runBid()
+
+    assert awardSecondChances([time_slot]) == 3
+    assert [bid.hasher for bid in trails[1].successfulBids] == hashers[1:4:2]
+    assert [bid.hasher for bid in trails[2].successfulBids] == [hashers[2]]
+    assert hashers[4].successfulBidCount == 0
+    assert hashers[1].successfulBids[0].tag == secondChanceTag
+    assert trails[1].priceCurve[-2:] == (None, None)
+    assert [row[-1] for row in awardRows([time_slot])] == \
+        [''] + [secondChanceTag] * 3
@@ -0,0 +1,70 @@
+from bid import Bid
+from server import ResultIndex, makeServer
+from threading import Thread
+from trail import Trail
+from urllib.request import urlopen
+import json
+
+
+def test_hasher_and_explain(bid, time_slot):
+    time_slot.addTrail(bid.trail)
+    bid.hasher.addBid(bid)
+    bid.runBid()
+    index = ResultIndex([time_slot], [bid.hasher])
+    (status, content_type, body) = index.lookup(f'/hasher/{bid.hasher.id}')
+    assert status == 200
+    result = json.loads(body)
+    assert result['outcome'] == 'successful'
+    assert result['trails'] == [[time_slot.name, bid.trail.id, bid.trail.name]]
+    (status, content_type, body) = index.lookup(f'/explain/{bid.hasher.id}')
+    assert body.decode().splitlines() == bid.hasher.explanation()
+
+
+def test_trail_roster_and_missing(bid, time_slot):
+    time_slot.addTrail(bid.trail)
+    bid.runBid()
+    index = ResultIndex([time_slot], [bid.hasher])
+    roster = json.loads(index.lookup(f'/trail/{bid.trail.id}')[2])
+    assert roster['attendees'] == [[bid.hasher.id, bid.hasher.name]]
+    assert index.lookup('/trail/999999')[0] == 404
+
+
+def test_search_by_name_prefix(hasher_list):
+    index = ResultIndex([], hasher_list)
+    name = hasher_list[0].name
+    (status, content_type, body) = index.lookup(f'/search?name={name[:3].lower()}')
+    assert [name, hasher_list[0].id] in json.loads(body)
+    assert all(found.lower().startswith(name[:3].lower())
+               for (found, _) in json.loads(body))
+
+
+def test_server_answers_over_http(bid, time_slot):
+    time_slot.addTrail(bid.trail)
+    bid.runBid()
+    server = makeServer([time_slot], [bid.hasher], 0)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        port = server.server_address[1]
+        with urlopen(f'http://127.0.0.1:{port}/hasher/{bid.hasher.id}') as response:
+            assert json.loads(response.read())['id'] == bid.hasher.id
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_explain_trail_without_winners(bid, time_slot):
+    full = Trail(202, 1, 'full trail', 0)
+    full.timeSlot = time_slot
+    for trail in (bid.trail, full):
+        time_slot.addTrail(trail)
+    for each in (bid, Bid(bid.hasher, full, bid.value + 1)):
+        each.hasher.addBid(each)
+        each.trail.addBid(each)
+    time_slot.runBid()
+    assert bid.hasher.outcome == 'successful'
+    index = ResultIndex([time_slot], [bid.hasher])
+    lines = index.lookup(f'/explain/{bid.hasher.id}')[2].decode().splitlines()
+    line = next(line for line in lines if full.pretty() in line)
+    assert '    -~-     ' in line
+    assert 'No winners' in line
@@ -0,0 +1,63 @@
+from bid import Bids
+from hasher import Hasher
+from random import Random
+from standings import OrderStatistics, Standings
+from tests.conftest import add_bid, make_time_slot
+from trail import Trail
+
+
+def test_order_statistics_match_sorted():
+    generator = Random(7)
+    values = OrderStatistics(100)
+    expected = []
+    for _ in range(500):
+        if expected and generator.random() < 0.3:
+            value = expected.pop(generator.randrange(len(expected)))
+            values.remove(value)
+        else:
+            value = generator.randint(0, 100)
+            expected.append(value)
+            values.add(value)
+        ordered = sorted(expected, reverse=True)
+        k = generator.randint(1, len(ordered)) if ordered else 1
+        assert values.highest(k) == (ordered[k - 1] if ordered else None)
+        assert values.countAbove(50) == sum(1 for value in expected if value > 50)
+
+
+def test_cutoff_bound_and_standing(time_slot):
+    trail = Trail(51, 0, 'trail', 2)
+    trail.timeSlot = time_slot
+    hashers = [Hasher(n, n, f'hasher {n}') for n in range(4)]
+    standings = Standings(100)
+    for (hasher, value) in zip(hashers, (90, 50, 50, 10)):
+        standings.update(hasher, trail, 0, value)
+    assert standings.cutoffBound(trail) == 50
+    assert [standings.standing(trail, value) for value in (90, 50, 10)] == ['in', 'tied', 'below']
+    standings.update(hashers[2], trail, 50, 0)
+    assert standings.standing(trail, 50) == 'in'
+    assert standings.cutoffBound(trail) == 50
+
+
+def test_cutoff_bound_bounds_clearing_bid():
+    generator = Random(11)
+    time_slot = make_time_slot([generator.randint(2, 6) for n in range(4)])
+    trails = time_slot.trails.list
+    standings = Standings(100)
+    bids = Bids()
+    for n in range(40):
+        hasher = Hasher(n, n, f'hasher {n}')
+        for trail in generator.sample(trails, 2):
+            bid = add_bid(hasher, trail, generator.randint(1, 50))
+            bids.add(bid)
+            standings.update(hasher, trail, 0, bid.value)
+    time_slot.runBid()
+    for bid in bids:
+        if bid.value > standings.cutoffBound(bid.trail):
+            won = bid.hasher.successfulBids.list
+            assert len(won) == 1
+            assert won[0].trail is bid.trail or won[0].value >= bid.value
+    for trail in trails:
+        if trail.successfulBidsCount == trail.capacity:
+            assert min(trail.fillValues) <= standings.cutoffBound(trail)
+    assert [row['cutoffBound'] for row in standings.cutoffFeed([time_slot])] == \
+        [standings.cutoffBound(trail) for trail in trails]
@@ -0,0 +1,71 @@
+from hasher import Hasher
+from tests.conftest import add_bid, make_time_slot
+from trade import tradeSeats
+
+
+def award(bid):
+    bid.trail.addSuccessfulBid(bid)
+    bid.hasher.addSuccessfulBid(bid)
+
+
+def test_trade_cycle():
+    time_slot = make_time_slot((1, 1, 1))
+    (first, second, third) = time_slot.trails
+    alice, bob, carol = (Hasher(n, n, name)
+                         for (n, name) in enumerate(('alice', 'bob', 'carol')))
+    award(add_bid(alice, first, 10))
+    add_bid(alice, second, 30)
+    award(add_bid(bob, second, 10))
+    add_bid(bob, third, 20)
+    award(add_bid(carol, third, 10))
+    add_bid(carol, first, 40)
+
+    trade = tradeSeats(time_slot)
+    assert (len(trade.moves), trade.cycles, trade.gained) == (3, 1, 60)
+    assert [bid.hasher for bid in first.successfulBids] == [carol]
+    assert [bid.hasher for bid in second.successfulBids] == [alice]
+    assert [bid.hasher for bid in third.successfulBids] == [bob]
+    assert list(second.fillValues) == [30]
+    assert [bid.trail for bid in alice.successfulBids] == [second]
+    assert alice.successfulBidCount == 1
+
+
+def test_trade_keeps_capacity():
+    time_slot = make_time_slot((2, 1))
+    (first, second) = time_slot.trails
+    alice, bob, carol = (Hasher(n, n, name)
+                         for (n, name) in enumerate(('alice', 'bob', 'carol')))
+    award(add_bid(alice, first, 10))
+    add_bid(alice, second, 20)
+    award(add_bid(bob, first, 10))
+    award(add_bid(carol, second, 30))
+    add_bid(carol, first, 5)
+
+    trade = tradeSeats(time_slot)
+    assert (len(trade.moves), trade.gained) == (0, 0)
+    assert first.successfulBidsCount == 2
+    assert second.successfulBidsCount == 1
+
+
+def test_trade_into_vacancy():
+    time_slot = make_time_slot((1, 2))
+    (first, second) = time_slot.trails
+    alice, bob = Hasher(1, 1, 'alice'), Hasher(2, 2, 'bob')
+    award(add_bid(alice, first, 10))
+    add_bid(alice, second, 20)
+    award(add_bid(bob, second, 10))
+
+    trade = tradeSeats(time_slot)
+    assert trade.gained == 10
+    assert first.successfulBidsCount == 0
+    assert [bid.hasher for bid in second.successfulBids] == [bob, alice]
+
+
+def test_allocation_has_no_trades():
+    time_slot = make_time_slot((1, 2, 1))
+    for n in range(6):
+        hasher = Hasher(n, n, f'hasher {n}')
+        for (m, trail) in enumerate(time_slot.trails):
+            add_bid(hasher, trail, (n * 7 + m * 3) % 10 + 1)
+    time_slot.runBid()
+    assert tradeSeats(time_slot).gained == 0
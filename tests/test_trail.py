@@ -1,3 +1,5 @@
+from bid import Bid
+from hasher import Hasher
 from pytest import fixture
 from trail import Trail
 
@@ -57,3 +59,17 @@ def test_get_hashers(bid, trail):
     trail.addBid(bid)
     assert trail.getHashers().list.pop() == bid.hasher
 
+
+
+def test_trails_assigned_dense_index(trails):
+    assert [trail.index for trail in trails.list] == list(range(trails.count))
+
+
+def test_price_curve(time_slot, trail_id, trail_name):
+    trail = Trail(trail_id, 0, trail_name, 4)
+    trail.timeSlot = time_slot
+    assert trail.priceCurve == (None, None, None, None, None)
+    for (n, value) in enumerate((90, 70, 60)):
+        trail.addSuccessfulBid(Bid(Hasher(n, n, f'hasher {n}'), trail, value))
+    assert trail.priceCurve == (70, 60, None, 60, 90)
+    assert trail.successfulBookendValues == (60, 90)
@@ -0,0 +1,57 @@
+from hasher import Hasher
+from timeSlot import TimeSlot
+from trail import Trail
+from validate import AllowanceCheck, violationsFilename
+import csv
+
+
+def make_bids():
+    time_slot = TimeSlot(1, 0, 'slot')
+    trails = []
+    for n in range(2):
+        trail = Trail(n, n, f'trail {n}', 10)
+        trail.timeSlot = time_slot
+        trails.append(trail)
+    over = Hasher(1, 1, 'over')
+    under = Hasher(2, 2, 'under')
+    return [(over, trails[0], 80), (over, trails[1], 70),
+            (under, trails[0], 60), (under, trails[1], 40)]
+
+
+def run_check(policy):
+    bids = make_bids()
+    check = AllowanceCheck(100, policy)
+    for bid in bids:
+        check.add(*bid)
+    return (check, [check.adjust(*bid) for bid in bids])
+
+
+def test_warn_keeps_bids():
+    (check, values) = run_check('warn')
+    assert values == [80, 70, 60, 40]
+    assert len(check.violations) == 1
+
+
+def test_reject_drops_hasher_time_slot():
+    (check, values) = run_check('reject')
+    assert values == [None, None, 60, 40]
+
+
+def test_scale_to_allowance():
+    (check, values) = run_check('scale')
+    assert values == [53, 46, 60, 40]
+    assert sum(values[:2]) <= 100
+
+
+def test_report(tmp_path):
+    (check, values) = run_check('scale')
+    assert check.report(str(tmp_path)) == 1
+    with open(tmp_path / violationsFilename) as report:
+        rows = list(csv.DictReader(report))
+    assert rows[0]['hasherID'] == '1'
+    assert rows[0]['bidAmount'] == '150'
+    assert rows[0]['action'] == 'scaled'
+    (check, values) = run_check('warn')
+    check.violations = {}
+    assert check.report(str(tmp_path)) == 0
+    assert not (tmp_path / violationsFilename).exists()
@@ -1,12 +1,17 @@
 # name: $Id: timeSlot.py 11 16:58:29 04-Mar-2022 s01rz $
 
-import csv
 import sys
 
-import bid    as bid_module
-import hasher as hasher_module
-import trail  as trail_module
+import attendance as attendance_module
+import bid       as bid_module
+import component as component_module
+import hasher    as hasher_module
+import joint     as joint_module
+import secondChance as secondChance_module
+import trade     as trade_module
+import trail     as trail_module
 
+from ingest   import *
 from param    import *
 from resource import *
 from setting  import *
@@ -32,14 +37,24 @@ class TimeSlot:
         no more than one success per time slot
    imp: A time slot specifies when it and its trails are scheduled to occur.
         A trail supplies additional details for the run, such as the trail
-        name, and capacity of how many hashers can attend the trail
+        name, and capacity of how many hashers can attend the trail.
+        index is a dense 0..N-1 index assigned in load order by the
+        TimeSlots() constructor during file read from timeSlots.txt.
+        conflicts is the bitset of the conflict groups the time slot is
+        in: its own, whose bit is its index, and those of any conflicts
+        with other time slots; see conflict.py. A time slot created
+        without an index is taken as the only one of its event
    """
-   def __init__(self, id, sequence, name):
-      self.id       = int(id)
-      self.sequence = int(sequence)
-      self.name     = name.strip()
+   __slots__ = ("id", "sequence", "name", "index", "trails", "conflicts")
+
+   def __init__(self, id, sequence, name, index = None):
+      self.id        = int(id)
+      self.sequence  = int(sequence)
+      self.name      = name.strip()
      ###
-      self.trails   = trail_module.Trails() # trails within this timeSlot
+      self.index     = index
+      self.trails    = trail_module.Trails() # trails within this timeSlot
+      self.conflicts = 1 << (index or 0)
 
 ###################################
 
@@ -182,9 +197,17 @@ class TimeSlot:
 
 ###########################################################################
 
-   def runBid(self):
+   def runBid(self, allocator = None):
       """
       use: Process the bids submitted for trails within this time slot
+      usage: Optionally pass a ComponentAllocator to allocate the time
+             slot's independent components in worker processes; see
+             component.py
+      imp: A time slot with a trail having a minimum attendance is
+           allocated in this process, cancelling trails that fall short;
+           see attendance.py.
+           With seatTrading set in settings.txt, hashers then trade seats
+           where that gets them trails they bid more on; see trade.py
       """
       print(self.pretty())
       bids = bid_module.Bids()
@@ -193,7 +216,28 @@ class TimeSlot:
                                 # attend only one trail per time slot
       for trail in self.trails:
          bids.merge(trail.getBids())
-      bids.runBid()
+      if (any((trail.minimumAttendance > 0) for trail in self.trails)):
+         attendance_module.runBid(bids, self.trails)
+      elif (allocator is None):
+         bids.runBid()
+      else:
+         allocator.runBid(bids)
+      self.tradeSeats()
+
+###########################################################################
+
+   def tradeSeats(self):
+      """
+      use: With seatTrading set in settings.txt, let hashers trade seats
+           where that gets them trails they bid more on; see trade.py
+      pre: The time slot must be allocated
+      """
+      if (settings.isSet("seatTrading")):
+         trade  = trade_module.tradeSeats(self)
+         traded = len(trade.moves)
+         print(f"   {traded} {plural(traded, 'hasher')} traded seats in "
+               f"{trade.cycles} {plural(trade.cycles, 'cycle')}; bid value "
+               f"gained {trade.gained}")
 
 ###########################################################################
 ###########################################################################
@@ -211,33 +255,24 @@ class TimeSlots:
       self.lookupIDs = {} # dict keyed on lookup.id containing a timeSlot
 
       if (filespec is not None):
-         if (os.path.isdir(filespec)):
-            filespec = os.path.join(filespec, "timeSlots.txt")
-
-         with open(filespec, "r") as csvfile:
-            lineNumber = 0
-            csvReader = csv.reader(csvfile)
-            if (csv.Sniffer().has_header(open(csvfile.name).read(1024))):
-               lineNumber += 1
-               next(csvReader)
-            for row in csvReader:
-               lineNumber += 1
-               if (len(row) != 0):
-                  try:
-                     timeSlot          = TimeSlot(row[0], row[1], row[2])
-                     timeSlot.sequence = self.count + 1
-                     self.add(timeSlot)
-                     if (settings["verbosity"] != 0):
-                        print(str(timeSlot))
-                  except DuplicateError as exception:
-                     if isinstance(exception, DuplicateError):
-                        exception = "duplicate time slot ID"
-                     writeFileReadError(filespec, lineNumber, exception,
-                                        f"{row[0]}, {row[1]}, {row[2]}")
-                     printFileReadError(lineNumber,
-                                        f"{row[0]}, {row[1]}, {row[2]}")
-            if (settings["verbosity"] == 0):
-               print(f"{self.count} {plural(self.count, 'time slot')}")
+         ingest = Ingest(filespec, timeSlotsSchema)
+         for (lineNumber, row) in ingest:
+            try:
+               timeSlot          = TimeSlot(*row, index = self.count)
+               timeSlot.sequence = self.count + 1
+               self.add(timeSlot)
+               if (settings["verbosity"] != 0):
+                  print(str(timeSlot))
+            except DuplicateError as exception:
+               if isinstance(exception, DuplicateError):
+                  exception = "duplicate time slot ID"
+               writeFileReadError(ingest.filespec, lineNumber, exception,
+                                  f"{row[0]}, {row[1]}, {row[2]}")
+               printFileReadError(lineNumber,
+                                  f"{row[0]}, {row[1]}, {row[2]}")
+         ingest.check()
+         if (settings["verbosity"] == 0):
+            print(f"{self.count} {plural(self.count, 'time slot')}")
 
 ###################################
 
@@ -380,12 +415,54 @@ class TimeSlots:
 
 ###########################################################################
 
-   def runBid(self):
+   def runBid(self, publish = None):
       """
       use: Process the bids submitted for all our time slots
-      """
-      for timeSlot in self.list:
-         timeSlot.runBid()
+      usage: Optionally pass publish, a callable that is passed each time
+             slot as soon as it is allocated; see publish.py
+      imp: Large time slots are split into independent components that are
+           allocated in worker processes when there is more than one
+           processor; see component.py.
+           With secondChance set in settings.txt, hashers who won nothing
+           are given the vacant seats once every time slot is allocated;
+           see secondChance.py. Time slots are then only published after
+           that.
+           With jointAllocation set in settings.txt, the bids of every
+           time slot are allocated together, in rounds by hashers' wins so
+           far; see joint.py. If a trail has a minimum attendance, the
+           setting is reported as ignored, and the time slots are
+           allocated one at a time
+      """
+      secondChanceP = settings.isSet("secondChance")
+      jointP        = settings.isSet("jointAllocation")
+      if (jointP and any((trail.minimumAttendance > 0)
+                         for timeSlot in self.list
+                         for trail in timeSlot.trails)):
+         sys.stderr.write(f"{selfName}: jointAllocation ignored, as a trail "
+                          f"has a minimum attendance; time slots are "
+                          f"allocated one at a time\n")
+         jointP = False
+      if (jointP):
+         rounds = joint_module.runBid(self.list)
+         print(f"joint allocation in {rounds} {plural(rounds, 'round')}")
+         for timeSlot in self.list:
+            print(timeSlot.pretty())
+            timeSlot.tradeSeats()
+            if ((publish is not None) and (not secondChanceP)):
+               publish(timeSlot)
+      else:
+         with component_module.ComponentAllocator() as allocator:
+            for timeSlot in self.list:
+               timeSlot.runBid(allocator)
+               if ((publish is not None) and (not secondChanceP)):
+                  publish(timeSlot)
+      if (secondChanceP):
+         printHeading("/// second chance ///", 0, 1)
+         count = secondChance_module.awardSecondChances(self)
+         print(f"{count} second-chance {plural(count, 'award')}")
+         if (publish is not None):
+            for timeSlot in self.list:
+               publish(timeSlot)
 
 ###########################################################################
 
@@ -0,0 +1,244 @@
+# name: $Id: trade.py 1 20:41:07 19-Oct-2026 s01rz $
+"""
+use: Post-allocation improvement of a time slot by seat trading. After a
+     time slot is allocated, two or more hashers may each hold a seat on a
+     trail that another of them bid more on. Trading seats around such a
+     cycle leaves every trail with the same number of hashers, and every
+     hasher with one trail in the time slot, while each hasher in the
+     cycle gets a trail they bid more on
+usage: Enabled by seatTrading in settings.txt, which runs tradeSeats()
+       for each time slot after it is allocated; see TimeSlot.runBid()
+imp: Top trading cycles. Each hasher holding a seat points to the trail
+     they bid most on, among the trails they bid more on than their own,
+     that still has a seat held by a hasher who has not finished trading,
+     or a vacant seat. Following the pointers from hasher to the holder of
+     the trail pointed to must end in a cycle, a vacant seat, or a hasher
+     pointing nowhere. The hashers in a cycle each take the seat of the
+     hasher they point to, a hasher pointing to a vacant seat moves into
+     it, vacating their own, and a hasher pointing nowhere keeps their
+     seat; all of them are then finished. The pointers are walked as a
+     path from each hasher in turn, so every hasher is pushed onto the
+     path once, and each hasher's list of preferred trails is stepped
+     through once, making the pass linear in the number of bids after
+     their sort.
+     Allocation by Bids.runBid() in order of bid value leaves no such
+     cycle on its own, so trading only gains on allocations that were not
+     made purely in order of bid value
+"""
+from resource import *
+from setting  import *
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### s e a t    t r a d e
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class SeatTrade:
+   """
+   use: The seats of a time slot, and the trades among its hashers
+   usage: Typically:
+             trade = SeatTrade(timeSlot)
+             trade.run()
+             trade.apply()
+   imp: Attributes:
+           seats       : list of the successful bids on each trail keyed on
+                         trail, in the order of the trail's successful
+                         bids, with None for a seat vacated by trading
+           vacancies   : number of vacant seats keyed on trail
+           seatOf      : (trail, position) of the seat held by each hasher
+                         keyed on hasher
+           holders     : hashers holding a seat on each trail keyed on
+                         trail; finished hashers are dropped as they are
+                         met
+           preferences : a hasher's bids in the time slot for trails they
+                         bid more on than their own seat, highest first,
+                         keyed on hasher
+           next        : position in preferences of the next bid to
+                         consider, keyed on hasher
+           finished    : hashers who have finished trading
+           moves       : the bid each trading hasher finishes with, keyed
+                         on their original successful bid
+           cycles      : number of trading cycles found
+           gained      : total bid value gained by trading
+   """
+   def __init__(self, timeSlot):
+      self.timeSlot    = timeSlot
+      self.seats       = {}
+      self.vacancies   = {}
+      self.seatOf      = {}
+      self.holders     = {}
+      self.preferences = {}
+      self.next        = {}
+      self.finished    = set()
+      self.moves       = {}
+      self.cycles      = 0
+      self.gained      = 0
+
+      for trail in timeSlot.trails:
+         seats = list(trail.successfulBids) if trail.successfulBidsCount \
+                 else []
+         self.seats[trail]     = seats
+                                # moving into a pooled trail would change
+                                # the fill of its pools, so only trades
+                                # around cycles are made there
+         self.vacancies[trail] = trail.vacancies if not trail.pools else 0
+         self.holders[trail]   = [bid.hasher for bid in seats]
+         for (position, bid) in enumerate(seats):
+            self.seatOf[bid.hasher] = (trail, position)
+      for (hasher, (trail, position)) in self.seatOf.items():
+         if (hasher.group is not None):
+                                # a group's members keep their trail
+            self.finished.add(hasher)
+            self.preferences[hasher] = []
+            self.next[hasher]        = 0
+            continue
+         value = self.seats[trail][position].value
+         self.preferences[hasher] = sorted(
+            (bid
+             for bid in hasher.bids.timeSlotBids.get(timeSlot.id, ())
+             if (bid.value > value)),
+            key = lambda bid: (-bid.value, bid.trail.id))
+         self.next[hasher] = 0
+
+###########################################################################
+
+   def apply(self):
+      """
+      use: Replace the successful bids of the hashers who traded, on their
+           trails and with the hashers
+      post: A trail's seats keep their order, with a traded seat holding
+            its new hasher's bid and vacated seats dropped
+      """
+      trails = set()
+      for (old, new) in self.moves.items():
+         trails.update((old.trail, new.trail))
+         new.hasher.successfulBids.replace({old: new})
+      for trail in trails:
+         trail.replaceSuccessfulBids([bid for bid in self.seats[trail]
+                                      if bid is not None])
+
+###########################################################################
+
+   def holder(self, trail):
+      """
+      use: A hasher still trading who holds a seat on trail
+      post: Return value is None if there is none
+      """
+      holders = self.holders[trail]
+      while ((len(holders) != 0) and (holders[-1] in self.finished)):
+         holders.pop()
+      return(holders[-1] if len(holders) != 0 else None)
+
+###########################################################################
+
+   def move(self, hasher, bid, seat):
+      """
+      use: Move hasher to seat, vacating their current seat, as the
+           holder of bid
+      usage: The caller fills seat with bid once every hasher moving at
+             the same time has vacated their seat
+      """
+      (trail, position)           = self.seatOf[hasher]
+      old                         = self.seats[trail][position]
+      self.seats[trail][position] = None
+      self.seatOf[hasher]         = seat
+      self.moves[old]             = bid
+      self.gained                += bid.value - old.value
+      self.finished.add(hasher)
+
+###########################################################################
+
+   def run(self):
+      """
+      use: Find and make the trades
+      post: Return value is the number of hashers who traded
+      """
+      for start in list(self.seatOf):
+         if (start in self.finished):
+            continue
+         path   = [start]
+         onPath = {start: 0}
+         while (len(path) != 0):
+            hasher = path[-1]
+            bid    = self.target(hasher)
+            if (bid is None):
+               self.finished.add(hasher)
+               del onPath[path.pop()]
+            elif (self.vacancies[bid.trail] > 0):
+               self.vacancies[bid.trail] -= 1
+               (trail, position)          = self.seatOf[hasher]
+               self.vacancies[trail]     += 1
+               self.seats[bid.trail].append(None)
+               self.move(hasher, bid,
+                         (bid.trail, len(self.seats[bid.trail]) - 1))
+               self.seats[bid.trail][-1]  = bid
+               del onPath[path.pop()]
+            else:
+               holder = self.holder(bid.trail)
+               if (holder in onPath):
+                  self.trade(path[onPath[holder]:])
+                  for hasher in path[onPath[holder]:]:
+                     del onPath[hasher]
+                  del path[len(onPath):]
+               else:
+                  onPath[holder] = len(path)
+                  path.append(holder)
+      return(len(self.moves))
+
+###########################################################################
+
+   def target(self, hasher):
+      """
+      use: The bid of hasher for the trail they prefer most that they can
+           still move to
+      post: Return value is None if there is no such trail
+      """
+      preferences = self.preferences[hasher]
+      position    = self.next[hasher]
+      while (position < len(preferences)):
+         trail = preferences[position].trail
+         if ((self.vacancies[trail] > 0) or
+             (self.holder(trail) is not None)):
+            break
+         position += 1
+      self.next[hasher] = position
+      return(preferences[position] if position < len(preferences) else
+             None)
+
+###########################################################################
+
+   def trade(self, cycle):
+      """
+      use: Trade seats around a cycle of hashers, each taking the seat of
+           the next, and the last the seat of the first
+      """
+      bids  = [self.target(hasher) for hasher in cycle]
+      seats = [self.seatOf[hasher] for hasher in cycle]
+      for (position, hasher) in enumerate(cycle):
+         self.move(hasher, bids[position], seats[(position + 1) %
+                                                 len(cycle)])
+      for (position, bid) in enumerate(bids):
+         (trail, seat) = seats[(position + 1) % len(cycle)]
+         self.seats[trail][seat] = bid
+      self.cycles += 1
+
+###########################################################################
+###########################################################################
+###########################################################################
+
+def tradeSeats(timeSlot):
+   """
+   use: Improve the allocation of an allocated time slot by trading seats
+   post: Return value is the SeatTrade, with its trades applied
+   """
+   trade = SeatTrade(timeSlot)
+   trade.run()
+   trade.apply()
+   return(trade)
+
+###########################################################################
@@ -1,15 +1,21 @@
 # name: $Id: trail.py 18 16:58:29 04-Mar-2022 s01rz $
 
-import csv
+import array
 import sys
 
 import bid    as bid_module
 import hasher as hasher_module
 
+from ingest   import *
 from param    import *
 from resource import *
 from setting  import *
 
+                                # percentages of capacity filled at which
+                                # the cut-offs of a price curve are taken
+priceCurveFills  = (50, 75, 100)
+priceCurveFields = ("fill50", "fill75", "fill100", "lowestBid", "highestBid")
+
 ###########################################################################
 ###########################################################################
 ###########################################################################
@@ -27,17 +33,35 @@ class Trail:
    imp: Trails belong to a time slot, which specifies when its trails are
         scheduled to occur. A trail supplies additional details for the run,
         such as the trail name, and capacity of how many hashers can attend
-        the trail
+        the trail.
+        index is a dense 0..N-1 index assigned in load order by the
+        Trails() constructor during file read from trails.txt. bids and
+        successfulBids are created on first use.
+        fillValues records the value of each successful bid in the order
+        seats were filled, for the trail's price curve.
+        pools is a tuple of the capacity pools enclosing this trail,
+        innermost first; see pool.py.
+        A trail with a minimumAttendance that is not reached is cancelled;
+        see attendance.py
    """
-   def __init__(self, id, sequence, name, capacity):
-       self.id             = int(id)
-       self.sequence       = int(sequence)
-       self.name           = name.strip()
-       self.capacity       = int(capacity)
+   __slots__ = ("id", "sequence", "name", "capacity", "minimumAttendance",
+                "index", "_timeSlot", "_bids", "_successfulBids",
+                "fillValues", "pools", "cancelled")
+
+   def __init__(self, id, sequence, name, capacity, minimumAttendance = 0):
+       self.id                = int(id)
+       self.sequence          = int(sequence)
+       self.name              = name.strip()
+       self.capacity          = int(capacity)
+       self.minimumAttendance = int(minimumAttendance or 0)
       ###
-       self.timeSlot       = None
-       self.bids           = bid_module.Bids()
-       self.successfulBids = bid_module.Bids()
+       self.index             = None
+       self._timeSlot         = None
+       self._bids             = None
+       self._successfulBids   = None
+       self.fillValues        = None
+       self.pools             = ()
+       self.cancelled         = False
 
 ###################################
 
@@ -46,13 +70,37 @@ class Trail:
 
 ###########################################################################
 
+   @property
+   def bids(self):
+      """
+      use: Bids submitted for this trail
+      """
+      if (self._bids is None):
+         self._bids = bid_module.Bids()
+      return(self._bids)
+
+###################################
+
+   @property
+   def successfulBids(self):
+      """
+      use: Winning bids from hashers who will be participating in this
+           trail
+      """
+      if (self._successfulBids is None):
+         self._successfulBids = bid_module.Bids()
+      return(self._successfulBids)
+
+###################################
+
    @property
    def successfulBidsCount(self):
       """
       use: Number of winning bids from hashers who will participating in
            this trail
       """
-      return(self.successfulBids.count)
+      return(self._successfulBids.count
+             if self._successfulBids is not None else 0)
 
 ###################################
 
@@ -62,7 +110,46 @@ class Trail:
       use: Lowest and highest values of successful bids belonging to us
       post: Return value is a tuple of two element
       """
-      return(self.successfulBids.bookendValues)
+      return(self.priceCurve[-2:])
+
+###################################
+
+   @property
+   def priceCurve(self):
+      """
+      use: Clearing-price curve of this trail: the bid values that filled
+           the seats at 50%, 75%, and 100% of capacity, and the lowest and
+           highest winning bids
+      post: Return value is a tuple ordered as priceCurveFields. A cut-off
+            is None if the trail was not filled that far, and the lowest
+            and highest bids are None if there were no winning bids
+      imp: Taken from fillValues as recorded by addSuccessfulBid(), so
+           successfulBids is not scanned
+      """
+      values = self.fillValues or ()
+      curve  = []
+      for fill in priceCurveFills:
+         seat = max(-(-self.capacity * fill // 100), 1)
+         curve.append(values[seat - 1] if seat <= len(values) else None)
+      if (len(values) == 0):
+         return(tuple(curve) + (None, None))
+      return(tuple(curve) + (min(values), max(values)))
+
+###################################
+
+   @property
+   def vacancies(self):
+      """
+      use: Number of hashers who can still be added to this trail, within
+           its capacity and the capacity of every pool enclosing it
+      post: A cancelled trail has no vacancies
+      """
+      if (self.cancelled):
+         return(0)
+      vacancies = self.capacity - self.successfulBidsCount
+      for pool in self.pools:
+         vacancies = min(vacancies, pool.capacity - pool.count)
+      return(max(vacancies, 0))
 
 ###################################
 
@@ -72,7 +159,7 @@ class Trail:
       use: Number of bids for this trail submitted by hashers wanting to
            participate in this trail
       """
-      return(len(self.bids.list))
+      return(self._bids.count if self._bids is not None else 0)
 
 ###################################
 
@@ -81,8 +168,7 @@ class Trail:
       """
       use: Sum of values for all bids submitted for this trail
       """
-      return(sum(bid.value for bid in self.bids.list)
-             if self.bidCount > 0 else 0)
+      return(self._bids.value if self._bids is not None else 0)
 
 ###################################
 
@@ -105,8 +191,7 @@ class Trail:
       post: Timeslot for this trail will be set, or an exception will be
             raised that the time slot has already been set
       """
-      if (('_timeSlot' not in self.__dict__) or
-          (self._timeSlot is None) or
+      if ((self._timeSlot is None) or
           (timeSlot       is None)):
          self._timeSlot = timeSlot
       else:
@@ -129,8 +214,33 @@ class Trail:
       """
       use: Usually called by runBid() method to add a hasher's winning bid
            for this trail
+      imp: The bid's value is recorded in fillValues, unless the bid is
+           tagged as not submitted by the hasher. The bid is counted in
+           every pool enclosing us
       """
       self.successfulBids.add(bid)
+      for pool in self.pools:
+         pool.count += 1
+      if (self.fillValues is None):
+         self.fillValues = array.array("l")
+      if (bid.tag is None):
+         self.fillValues.append(bid.value)
+
+###########################################################################
+
+   def removeSuccessfulBid(self, bid):
+      """
+      use: Remove a winning bid, as when hashers are allocated again after
+           a trail is cancelled; see attendance.py
+      pre: bid must be our most recent winning bid
+      """
+      last = self.successfulBids.pop()
+      assert (last is bid), \
+         "Trail.removeSuccessfulBid() requires the most recent winning bid"
+      if (bid.tag is None):
+         self.fillValues.pop()
+      for pool in self.pools:
+         pool.count -= 1
 
 ###########################################################################
 
@@ -145,8 +255,11 @@ class Trail:
       use: Predicate indicating if this trail is already at capacity and no
            more additional hashers should be allowed to be added to this
            trail
+      imp: A trail is also at capacity when any pool enclosing it is, or
+           when it is cancelled
       """
-      return(self.successfulBids.count >= self.capacity)
+      return((self.successfulBidsCount >= self.capacity) or self.cancelled or
+             ((len(self.pools) != 0) and (self.vacancies == 0)))
 
 ###########################################################################
 
@@ -204,23 +317,23 @@ class Trail:
                               detail    =  0)
       params[self.__class__.__name__] = self
 
+      bid = params["Bid"]
+      tag = f" ({bid.tag})" if ((bid is not None) and bid.tag) else ""
       if (params["outputFormat"] == "html"):
          nbsp = "&nbsp;" * (params["indent"] or 0)
-         params["outputFile"].write(f"    {nbsp}{str(self)}<br/>\n")
+         params["outputFile"].write(f"    {nbsp}{str(self)}{tag}<br/>\n")
       elif (params["outputFormat"] is None):
          if (params["detail"] >= 2):
             print(f"{'':>{max(params['indent'], 0)}}{self.pretty()}"
                   f" [{self.bidCount:>5d}/{self.capacity:<5d}"
                   f" ~{self.bidValue:<7d}]")
          else:
-            bid = None
-            if (params["detail"] > 0):
-               bid = params["Bid"]
-            if (bid is None):
-               print(f"{'':>{max(params['indent'], 0)}}{self.pretty()}")
+            if ((bid is None) or (params["detail"] <= 0)):
+               print(f"{'':>{max(params['indent'], 0)}}{self.pretty()}"
+                     f"{tag}")
             else:
                print(f"{'':>{max(params['indent'], 0)}}"
-                     f"{self.pretty()} ~ {bid.value:4d}")
+                     f"{self.pretty()} ~ {bid.value:4d}{tag}")
       else:
          sys.stderr.write(f"{selfName}: Trail.printTrail(): "
                           f" unknown output format: "
@@ -247,7 +360,7 @@ class Trail:
                               detail    =  0)
       params[self.__class__.__name__] = self
 
-      (lowest, highest) = self.successfulBids.bookendValues
+      (lowest, highest) = self.successfulBookendValues
       if (params["outputFormat"] in ("roster", "html")):
          outputDirectory = os.path.join(settings["eventDirectory"], "html")
          if (not os.path.isdir(outputDirectory)):
@@ -292,8 +405,13 @@ class Trail:
               "<p class=timeslot>" + self.timeSlot.name + "</p>\n"          ,
               "<p class=trail><b>" + str(self)          + "</b></p>\n"      ,
               "<b>Attendees: "     + str(self.successfulBidsCount) + "/" +
-                                     str(self.capacity) + "</b><br/><br/>\n",
-              ' <table cellpadding=5pt style="width: 7.5in">\n'])
+                                     str(self.capacity) + "</b><br/><br/>\n"])
+         if (self.cancelled):
+            params["outputFile"].write(f"<b>Cancelled: minimum attendance "
+                                       f"of {self.minimumAttendance} not "
+                                       f"reached</b><br/><br/>\n")
+         params["outputFile"].write(
+            ' <table cellpadding=5pt style="width: 7.5in">\n')
          self.successfulBids.sortByHasherName()
          self.successfulBids.printHashers(**params())
          params["outputFile"].writelines(
@@ -308,6 +426,10 @@ class Trail:
                       f"{self.successfulBidsCount}/{self.capacity}; "
                       f"bid range = {highest}~{lowest}",
                       params["indent"], params["headLevel"])
+         if (self.cancelled):
+            printHeading(f"- Cancelled: minimum attendance of "
+                         f"{self.minimumAttendance} not reached",
+                         params["indent"], params["headLevel"])
          self.successfulBids.sortByHasherName()
 
          if (params["indent"   ] >= 0):
@@ -329,6 +451,21 @@ class Trail:
       """
       return(f"{f'{self.id:>3}: {self.name}':<22}")
 
+###########################################################################
+
+   def replaceSuccessfulBids(self, bids):
+      """
+      use: Replace our successful bids, as when hashers trade seats; see
+           trade.py
+      post: fillValues is recorded afresh from bids, in their order, and
+            the pools enclosing us are counted afresh
+      """
+      for pool in self.pools:
+         pool.count += len(bids) - self.successfulBidsCount
+      self._successfulBids = bid_module.Bids().merge(bids)
+      self.fillValues      = array.array("l", [bid.value for bid in bids
+                                               if bid.tag is None])
+
 #    def setTimeSlot(self, timeSlot):
 #       if (self.timeSlot is None):
 #          self.timeSlot = timeSlot
@@ -351,17 +488,17 @@ class Trail:
       """
       print(str(self))
       for bid in self.bids.sortEquitably():
-         if (self.successfulBidsCount < self.capacity):
+         if (not self.isAtCapacity()):
             if (self.successfulBids.getByHasherId(bid.hasher.id) is None):
                hasherTrails = bid.hasher.successfulBids.getTrailsByTimeSlotId(
                                  self.timeSlot.id)
                if (hasherTrails.count == 0):
                   print(f"{str(bid.hasher)} ~ {bid.value}")
-                  self.successfulBids.add(bid)
-                  bid.hasher.successfulBids.add(bid)
+                  self.addSuccessfulBid(bid)
+                  bid.hasher.addSuccessfulBid(bid)
                else:
                   print(f"   {str(bid.hasher)} -> {hasherTrails[0].id}")
-         if (self.successfulBidsCount >= self.capacity):
+         if (self.isAtCapacity()):
             print(f"trail {str(self)} reached capacity")
             break
 
@@ -385,35 +522,26 @@ class Trails:
       self.lookupIDs = {}
 
       if (filespec is not None):
-         if (os.path.isdir(filespec)):
-            filespec = os.path.join(filespec, "trails.txt")
-
-         with open(filespec, "r") as csvfile:
-            lineNumber = 0
-            csvReader  = csv.reader(csvfile)
-            if (csv.Sniffer().has_header(open(csvfile.name).read(1024))):
-               lineNumber += 1
-               next(csvReader)
-            for row in csvReader:
-               lineNumber += 1
-               if (len(row) != 0):
-                  try:
-                     trail = Trail(row[0], row[1], row[2], row[3])
-                     self.add(trail)
-                     if (settings["verbosity"] != 0):
-                        print(str(trail))
-#                   except (ValueError, DuplicateError) as exception:
-                  except DuplicateError as exception:
-                     if isinstance(exception, DuplicateError):
-                        exception = "duplicate trail ID"
-                     writeFileReadError(
-                        filespec, lineNumber, exception,
-                        f"{row[0]}, {row[1]}, {row[2]}, {row[2]}")
-                     printFileReadError(
-                        lineNumber,
-                        f"{row[0]}, {row[1]}, {row[2]}, {row[2]}")
-            if (settings["verbosity"] == 0):
-               print(f"{self.count} {plural(self.count, 'trail')}")
+         ingest = Ingest(filespec, trailsSchema)
+         for (lineNumber, row) in ingest:
+            try:
+               trail       = Trail(*row)
+               trail.index = self.count
+               self.add(trail)
+               if (settings["verbosity"] != 0):
+                  print(str(trail))
+            except DuplicateError as exception:
+               if isinstance(exception, DuplicateError):
+                  exception = "duplicate trail ID"
+               writeFileReadError(
+                  ingest.filespec, lineNumber, exception,
+                  f"{row[0]}, {row[1]}, {row[2]}, {row[3]}")
+               printFileReadError(
+                  lineNumber,
+                  f"{row[0]}, {row[1]}, {row[2]}, {row[3]}")
+         ingest.check()
+         if (settings["verbosity"] == 0):
+            print(f"{self.count} {plural(self.count, 'trail')}")
 
 ###################################
 
@@ -9,22 +9,37 @@ pre: If trails, hashers, or bids have changed, the 00-orderOfHashers.txt
      file in the event directory should be removed prior to the next
      call to runBid()
 """
+import concurrent.futures
 import getopt
 import posixpath
 import sys
 
 from pprint import pprint
 
+import database as database_module
+import export   as export_module
+import publish  as publish_module
+import server   as server_module
+
+from ingest    import *
 from param     import *
 from resource  import *
 from setting   import *
 
 from trail     import *
 from timeSlot  import *
+from conflict  import *
 from trailTime import *
 from hasher    import *
+from group     import *
+from pool      import *
 from bid       import *
 
+                                # combined size in bytes of hashers.txt and
+                                # bids.txt from which they are parsed in
+                                # worker processes on a multicore machine
+concurrentLoadSize = 4 * 1024 * 1024
+
 ###########################################################################
 ###########################################################################
 ###########################################################################
@@ -53,35 +68,115 @@ class TrailBid():
            trailTimes.txt: timeSlotID, trailID
            hashers.tx t  : hasherID, hasherName
            bids.txt      : hasherID, trailID, bidAmount
+           groups.txt    : groupID, hasherID; optional, see group.py
+           capacityPools.txt: poolID, poolName, capacity, parentPoolID
+           poolTrails.txt: poolID, trailID; both optional, see pool.py
+           conflicts.txt : conflictID, timeSlotID; optional, see
+                           conflict.py
+        Bids can be supplied in binary as bids.bin instead of bids.txt;
+        see bidFile.py. Bids can also be merged from several files listed
+        in the bidSources setting; see Bids.readSources()
    """
    def __init__(self, eventDirectory = None):
       """
       usage: Optionally pass an event directory name in which all the
              needed data files are stored
+      imp: Loading is split into a parse stage and a linking stage. When
+           hashers.txt and bids.txt are large, they are parsed in a
+           process pool while the time slots, trails, and trail times are
+           loaded here; the parsed rows are then linked to Hasher and
+           Trail objects in this process
       """
-      printHeading("/// time slots ///", 0, 1)
-      self.timeSlots = TimeSlots(eventDirectory)
+      hashersFilespec = os.path.join(eventDirectory, "hashers.txt")
+      bidsFilespec    = os.path.join(eventDirectory, "bids.txt")
+      textBidsP       = os.path.isfile(bidsFilespec)
+      if (not textBidsP):
+                                # bids.bin is read only if there is no
+                                # bids.txt
+         bidsFilespec = os.path.join(eventDirectory, "bids.bin")
+      bidsP           = os.path.isfile(bidsFilespec)
+      if (settings["bidSources"]):
+                                # bidSources, when set, replaces bids.txt
+                                # and bids.bin
+         bidsFilespec = [os.path.join(eventDirectory, name.strip())
+                         for name in settings["bidSources"].split(",")]
+         textBidsP    = False
+         bidsP        = True
+      loadSize        = (os.path.getsize(hashersFilespec) +
+                         (os.path.getsize(bidsFilespec) if textBidsP else 0))
+
+      pool = None
+      if ((loadSize >= concurrentLoadSize) and
+          ((os.cpu_count() or 1) > 1)):
+         pool = concurrent.futures.ProcessPoolExecutor(max_workers = 2)
+         hashersFilespec = pool.submit(parseFile, hashersFilespec,
+                                       hashersSchema)
+         if (textBidsP):
+            bidsFilespec = pool.submit(parseFile, bidsFilespec, bidsSchema)
+
+      try:
+         printHeading("/// time slots ///", 0, 1)
+         self.timeSlots = TimeSlots(eventDirectory)
 
-      print()
-      printHeading("/// trails ///", 0, 1)
-      self.trails = Trails(eventDirectory)
+         print()
+         printHeading("/// trails ///", 0, 1)
+         self.trails = Trails(eventDirectory)
 
-      print()
-      printHeading("/// trail times ///", 0, 1)
+         print()
+         printHeading("/// trail times ///", 0, 1)
                                    # trailTime is not a class. it joins
                                    # trails to timeSlots
-      trailTime(eventDirectory, self.timeSlots, self.trails)
+         trailTime(eventDirectory, self.timeSlots, self.trails)
+
+         if (os.path.isfile(os.path.join(eventDirectory,
+                                         conflictsSchema.filename))):
+            print()
+            printHeading("/// conflicts ///", 0, 1)
+            readConflicts(eventDirectory, self.timeSlots)
+
+         self.pools = None
+         if (os.path.isfile(os.path.join(eventDirectory,
+                                         capacityPoolsSchema.filename))):
+            print()
+            printHeading("/// capacity pools ///", 0, 1)
+            self.pools = Pools(eventDirectory, self.trails)
+
+         if (pool is not None):
+            hashersFilespec = hashersFilespec.result()
+            if (textBidsP):
+               bidsFilespec = bidsFilespec.result()
+      finally:
+         if (pool is not None):
+            pool.shutdown()
 
       print()
       printHeading("/// hashers ///", 0, 1)
-      self.hashers = Hashers(eventDirectory)
+      self.hashers = Hashers(hashersFilespec)
+
+      self.groups    = None
+      groupsFilespec = os.path.join(eventDirectory, groupsSchema.filename)
+      if (os.path.isfile(groupsFilespec)):
+         print()
+         printHeading("/// groups ///", 0, 1)
+         self.groups = Groups(groupsFilespec, self.hashers)
 
-      bidsFilespec = os.path.join(eventDirectory, "bids.txt")
-      if (os.path.isfile(bidsFilespec)):
+      if (bidsP):
          print()
          printHeading("/// bids ///", 0, 1)
          self.bids = Bids(bidsFilespec, self.hashers, self.trails)
 
+###########################################################################
+
+   def printPools(self):
+      """
+      use: Print the fill level of each capacity pool, if there are any
+      pre: runBid() processing must be completed
+      """
+      if (self.pools is not None):
+         printHeading("/// capacity pools ///", 0, 1)
+         self.pools.printPools()
+         print()
+
 ###########################################################################
 
    def printRelations(self):
@@ -123,14 +218,62 @@ class TrailBid():
 
 ###########################################################################
 
-   def runBid(self):
+   def runBid(self, publish = None):
       """
       use: Process bid data, awarding trails to hashers who have submitted
            bids to attend trails
+      usage: See TimeSlots.runBid() for publish
       """
       printHeading("/// run bid ///", 0, 1)
       self.hashers.sortByRandom()
-      self.timeSlots.runBid()
+      self.timeSlots.runBid(publish)
+
+###########################################################################
+
+   def exportResult(self, exportFormat, **kwargs):
+      """
+      use: Write awards, hasher outcomes, and trail fill statistics as
+           machine-readable files for downstream systems
+      usage: exportFormat is one of export.exportFormats. Optionally pass
+             outputDirectory, and chunkSize as the number of rows written
+             per flush
+      pre: runBid() processing must be completed
+      """
+      params = Params(kwargs, outputDirectory = None,
+                              chunkSize       = 1000)
+
+      if (exportFormat in export_module.exportFormats):
+         export_module.exportResult(self.timeSlots, self.hashers,
+                                    exportFormat,
+                                    params["outputDirectory"],
+                                    params["chunkSize"])
+      else:
+         sys.stderr.write(f"{selfName}: TrailBid.exportResult(): "
+                          f"unknown export format: {exportFormat}\n")
+
+###########################################################################
+
+   def writeDatabase(self, filespec):
+      """
+      use: Write the loaded event and the outcome of processing its bids
+           into a SQLite database file
+      pre: runBid() processing must be completed
+      """
+      counts = database_module.writeDatabase(filespec, self.timeSlots,
+                                             self.hashers)
+      print(f"{filespec}: " +
+            ", ".join(f"{count} {table}" for (table, count) in counts.items()))
+
+###########################################################################
+
+   def serve(self, port, host = "127.0.0.1"):
+      """
+      use: Keep the event in memory and answer explain, trail roster, and
+           hasher result queries over HTTP until interrupted
+      usage: See server.py for the queries answered
+      pre: runBid() processing must be completed
+      """
+      server_module.serve(self.timeSlots, self.hashers, port, host)
 
 ###########################################################################
 
@@ -158,7 +301,7 @@ class TrailBid():
       params = Params(kwargs, detail =  0)
       params[self.__class__.__name__] = self
 
-      if (params["outputFormat"] == "html"):
+      if (params["outputFormat"] in ("html", "json")):
          params["indent"] = 0
          self.hashers.printResultByHasher(**params())
       elif (params["outputFormat"] is None):
@@ -286,17 +429,44 @@ def help(verbosity = 0):
 
 if ( __name__ == "__main__" ):
    eventDirectory = None
+   databaseFile   = None
+   exportFormats  = []
+   jsonResultsP   = False
+   serverPort     = None
    verbosity      = 0
-   opts, args     = getopt.getopt(sys.argv[1:], "vh")
+   opts, args     = getopt.getopt(sys.argv[1:], "vhjd:s:x:")
 
    for opt in opts:
       pprint(opt)
       if (opt[0] == "-v"):
          verbosity += 1
+      elif (opt[0] == "-j"):
+         jsonResultsP = True
+      elif (opt[0] == "-d"):
+         databaseFile = opt[1]
+      elif (opt[0] == "-s"):
+         if (not opt[1].isdigit()):
+            sys.stderr.write(f"{selfName}: bad server port: {opt[1]}\n")
+            exit(1)
+         serverPort = int(opt[1])
+      elif (opt[0] == "-x"):
+         if (opt[1] not in export_module.exportFormats):
+            sys.stderr.write(f"{selfName}: unknown export format: "
+                             f"{opt[1]}\n")
+            exit(1)
+         exportFormats.append(opt[1])
       elif (opt[0] == "-h"):
          print(f"usage: {selfName} [options] directoryName")
          print( "where options are:")
          print( "   -v verbose; more v for more verbosity")
+         print( "   -j        publish results by hasher as JSON shards for "
+                "hasher-lookup.html")
+         print( "   -d file   write event and results into SQLite database "
+                "file")
+         print( "   -s port   serve result queries on localhost port until "
+                "interrupted")
+         print(f"   -x format export results; format is one of: "
+               f"{', '.join(export_module.exportFormats)}")
          print( "   -h help")
          exit()
 
@@ -326,7 +496,11 @@ if ( __name__ == "__main__" ):
    trailBid.printRelations()
 
    print()
-   trailBid.runBid()
+                                # each time slot's pages, rosters, and
+                                # exports are rendered in the background as
+                                # soon as it is allocated
+   publisher = publish_module.Publisher(exportFormats)
+   trailBid.runBid(publisher.publish)
 
    if (settings["verbosity"] >= 1):
       print()
@@ -339,18 +513,19 @@ if ( __name__ == "__main__" ):
 
 ###########################################################################
 
+   publisher.wait()
    print()
+   trailBid.printPools()
                                 # pass detail=1 to show hasher bid value
    trailBid.printResultByTrail()
-   trailBid.printResultByTrail(hasherNameStyle = "unique",
-                               outputFormat    = "html"  )
-   trailBid.printResultByTrail(hasherNameStyle = "unique",
-                               outputFormat    = "roster")
 
    print()
    trailBid.printResultByHasher(detail          = 1     )
    trailBid.printResultByHasher(hasherNameStyle = "unique",
                                 outputFormat    = "html")
+   if (jsonResultsP):
+      trailBid.printResultByHasher(hasherNameStyle = "unique",
+                                   outputFormat    = "json")
 
 #    print()
 #    trailBid.printResultBySuccessfulHasher()
@@ -361,4 +536,14 @@ if ( __name__ == "__main__" ):
    print()
    trailBid.printResultByNoBidHasher()
 
+   publisher.close(trailBid.hashers)
+
+   if (databaseFile is not None):
+      print()
+      trailBid.writeDatabase(databaseFile)
+
+   if (serverPort is not None):
+      print()
+      trailBid.serve(serverPort)
+
 ###########################################################################
@@ -5,12 +5,12 @@ use: trailTime is a procedure, not a class. trailTime reads a trailTimes
      input file and joins trails to time slots
 """
 
-import csv
 import sys
 
 import timeSlot
 import trail
 
+from ingest   import *
 from resource import *
 from setting  import *
 
@@ -22,48 +22,33 @@ def trailTime(filespec, timeSlots, trails):
    slots. A time slot is when one or more trails occur; a trail can belong
    to exactly one time slot
    """
-   if (os.path.isdir(filespec)):
-      filespec = os.path.join(filespec, "trailTimes.txt")
-
-   with open(filespec, "r") as csvfile:
-      events     = 0
-      lineNumber = 0
-      csvReader  = csv.reader(csvfile)
-      if (csv.Sniffer().has_header(open(csvfile.name).read(1024))):
-         lineNumber += 1
-         next(csvReader)
-      for row in csvReader:
-         events     += 1
-         lineNumber += 1
-         if (len(row) != 0):
-            timeSlot    = timeSlots.getById(row[0])
-            trail       = trails.getById   (row[1])
-            if ((timeSlot is None) or
-                (trail    is None)):
-                                # carve out for lineNumber 1 where timeSlot
-                                # and trail are both None is probably a
-                                # header that the csv.Sniffer failed to detect
-               if (not ((lineNumber == 1 ) and
-                        (timeSlot is None) and
-                        (trail    is None))):
-                  printFileReadError(lineNumber,
-                                     str(timeSlot) + " -> " + str(trail))
-            else:
-               if (settings["verbosity"] != 0):
-                  print(str(timeSlot) + " -> " + str(trail))
-               try:
-                  timeSlot.addTrail(trail)
-                  trail.timeSlot= timeSlot
-               except Exception as exception:
-                  writeFileReadError(filename  ,
-                                     lineNumber,
-                                     exception ,
-                                     str(timeSlot)   + " -> " + str(trail))
-                  print("*** Line " + str(lineNumber) + " *** " +
-                        row[0] + ", " + row[1])
-                  raise
-      if (settings["verbosity"] == 0):
-         print(str(events)             + " " +
-               plural(events, "event") + " " +
-               "connected to time "          +
-               plural(events, "slot"))
+   events = 0
+   ingest = Ingest(filespec, trailTimesSchema)
+   for (lineNumber, (timeSlotId, trailId)) in ingest:
+      events  += 1
+      timeSlot = timeSlots.getById(timeSlotId)
+      trail    = trails.getById   (trailId)
+      if ((timeSlot is None) or
+          (trail    is None)):
+         printFileReadError(lineNumber,
+                            str(timeSlot) + " -> " + str(trail))
+      else:
+         if (settings["verbosity"] != 0):
+            print(str(timeSlot) + " -> " + str(trail))
+         try:
+            timeSlot.addTrail(trail)
+            trail.timeSlot= timeSlot
+         except Exception as exception:
+            writeFileReadError(ingest.filespec,
+                               lineNumber     ,
+                               exception      ,
+                               str(timeSlot)   + " -> " + str(trail))
+            print("*** Line " + str(lineNumber) + " *** " +
+                  str(timeSlotId) + ", " + str(trailId))
+            raise
+   ingest.check()
+   if (settings["verbosity"] == 0):
+      print(str(events)             + " " +
+            plural(events, "event") + " " +
+            "connected to time "          +
+            plural(events, "slot"))
@@ -0,0 +1,165 @@
+# name: $Id: validate.py 1 17:21:36 19-Oct-2026 s01rz $
+"""
+use: Bid allowance validation of bids as they are loaded. The bids of
+     every hasher in every time slot are totalled in one grouped pass,
+     and hashers who have bid more than the bidAllowance in a time slot
+     are dealt with according to the bidAllowancePolicy setting:
+        warn  : keep the bids as they are; the default
+        reject: drop all of the hasher's bids in the time slot
+        scale : scale the hasher's bids in the time slot down in
+                proportion so that they total no more than the
+                bidAllowance; bids scaled down to 0 are dropped
+     Violations are listed in bidAllowanceViolations.csv next to the bid
+     file
+usage: Typically, by Bids() while loading:
+          check = AllowanceCheck()
+          for (hasher, trail, value) in bids:
+             check.add(hasher, trail, value)
+          for (hasher, trail, value) in bids:
+             value = check.adjust(hasher, trail, value)
+             if (value is not None):
+                ... link bid ...
+          check.report(directory)
+"""
+
+import csv
+import sys
+
+from resource import *
+from setting  import *
+
+bidAllowancePolicies = ("warn", "reject", "scale")
+violationFields      = ("hasherID"    , "hasherName"  ,
+                        "timeSlotID"  , "timeSlotName",
+                        "bidCount"    , "bidAmount"   ,
+                        "bidAllowance", "action")
+violationsFilename   = "bidAllowanceViolations.csv"
+
+###########################################################################
+###########################################################################
+###########################################################################
+###
+### a l l o w a n c e    c h e c k
+###
+###########################################################################
+###########################################################################
+###########################################################################
+
+class AllowanceCheck:
+   """
+   use: Totals of bids per hasher per time slot, checked against the
+        bidAllowance
+   imp: totals is a dictionary of [bidCount, bidAmount] keyed on
+        (hasher, timeSlot). Once all bids are added, the scale factor of
+        each violating hasher and time slot is fixed, so adjust() is a
+        single dictionary lookup per bid
+   """
+   def __init__(self, bidAllowance = None, policy = None):
+      """
+      usage: bidAllowance and policy default to the bidAllowance and
+             bidAllowancePolicy settings
+      """
+      if (bidAllowance is None):
+         bidAllowance = int(settings["bidAllowance"])
+      if (policy is None):
+         policy = (settings["bidAllowancePolicy"] or "warn").lower()
+      if (policy not in bidAllowancePolicies):
+         sys.stderr.write(f"{selfName}: unknown bidAllowancePolicy: "
+                          f"{policy}; using warn\n")
+         policy = "warn"
+      self.bidAllowance = bidAllowance
+      self.policy       = policy
+      self.totals       = {}
+      self.violations   = None # {(hasher, timeSlot): (count, amount)}
+
+###########################################################################
+
+   def add(self, hasher, trail, value):
+      """
+      use: Count a bid into its hasher's total for the trail's time slot
+      usage: Bids whose hasher or trail were not found are passed with
+             None, and are not counted
+      """
+      if ((hasher is None) or (trail is None)):
+         return
+      key   = (hasher, trail.timeSlot)
+      total = self.totals.get(key)
+      if (total is None):
+         self.totals[key] = [1, value]
+      else:
+         total[0] += 1
+         total[1] += value
+
+###########################################################################
+
+   def adjust(self, hasher, trail, value):
+      """
+      use: A bid's value after applying the policy
+      post: Return value is the value to be bid, or None if the bid is to
+            be dropped
+      """
+      if (self.violations is None):
+         self.findViolations()
+      if ((hasher is None) or (trail is None) or
+          (self.policy == "warn")):
+         return(value)
+      violation = self.violations.get((hasher, trail.timeSlot))
+      if (violation is None):
+         return(value)
+      if (self.policy == "reject"):
+         return(None)
+      value = value * self.bidAllowance // violation[1]
+      return(value if value > 0 else None)
+
+###########################################################################
+
+   def findViolations(self):
+      """
+      use: Collect the totals over the bidAllowance
+      post: Return value is our violations dictionary
+      """
+      self.violations = {key: tuple(total)
+                         for (key, total) in self.totals.items()
+                         if total[1] > self.bidAllowance}
+      return(self.violations)
+
+###########################################################################
+
+   def report(self, directory):
+      """
+      use: Report violations, writing them into bidAllowanceViolations.csv
+           in directory
+      usage: A report left over from an earlier load is removed if there
+             are now no violations
+      post: Return value is the number of violations
+      """
+      if (self.violations is None):
+         self.findViolations()
+      filespec = os.path.join(directory, violationsFilename)
+      if (len(self.violations) == 0):
+         if (os.path.isfile(filespec)):
+            os.remove(filespec)
+         return(0)
+
+      action = {"warn"  : "kept",
+                "reject": "rejected",
+                "scale" : "scaled"}[self.policy]
+      rows   = sorted(((hasher.id   , hasher.name  ,
+                        timeSlot.id , timeSlot.name,
+                        count       , amount       ,
+                        self.bidAllowance, action)
+                       for ((hasher, timeSlot), (count, amount))
+                       in self.violations.items()),
+                      key = lambda row: (row[0], row[2]))
+      for row in rows:
+         print(f"*** {row[0]}: {row[1]}: {row[3]}: bid {row[5]} exceeds "
+               f"bid allowance of {self.bidAllowance}; {action}")
+      with open(filespec, "w", newline = "") as outputFile:
+         csvWriter = csv.writer(outputFile)
+         csvWriter.writerow(violationFields)
+         csvWriter.writerows(rows)
+      print(f"{filespec}: {len(rows)} "
+            f"{plural(len(rows), 'violation')}")
+      return(len(rows))
+
+###########################################################################